@@ -0,0 +1,50 @@
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+from courses.async_views import json_response, make_view, not_found, respond, wants_async
+from university.db_router import replica_reads
+from .serializers import DepartmentSerializer
+from .views import DepartmentViewSet
+
+"""
+Async department reads for ASGI deployments, mounted when settings.ASYNC_READ_VIEWS is on
+(see courses/async_views.py). GET is served on the event loop with the async ORM, with the
+viewset's ETags and 304s; writes and the browsable API go to the regular DepartmentViewSet.
+"""
+
+SYNC_ONLY_PARAMS = {'format'}
+
+department_list_view = DepartmentViewSet.as_view({'get': 'list', 'post': 'create'})
+department_detail_view = DepartmentViewSet.as_view({
+    'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'
+})
+
+
+@csrf_exempt
+async def department_collection(request):
+    negotiated = await wants_async(request, DepartmentViewSet, SYNC_ONLY_PARAMS)
+    if negotiated is None:
+        return await sync_to_async(department_list_view)(request)
+
+    async def build():
+        departments = [department async for department in DepartmentViewSet.queryset.all()]
+        return json_response(DepartmentSerializer(departments, many=True).data, negotiated)  # Unpaginated, like the viewset
+
+    with replica_reads(request):
+        return await respond(request, make_view(DepartmentViewSet, request, 'list'), negotiated, build)
+
+
+@csrf_exempt
+async def department_member(request, pk):
+    negotiated = await wants_async(request, DepartmentViewSet, SYNC_ONLY_PARAMS)
+    if negotiated is None:
+        return await sync_to_async(department_detail_view)(request, pk=pk)
+
+    async def build():
+        try:
+            department = await DepartmentViewSet.queryset.aget(pk=pk)
+        except DepartmentViewSet.queryset.model.DoesNotExist:
+            return not_found(DepartmentViewSet.queryset.model, negotiated)
+        return json_response(DepartmentSerializer(department).data, negotiated)
+
+    with replica_reads(request):
+        return await respond(request, make_view(DepartmentViewSet, request, 'retrieve', pk=pk), negotiated, build)
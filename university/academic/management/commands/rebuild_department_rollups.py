@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from academic import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the department rollups behind /api/academic/rollups/ from the courses."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to rebuild.')
+
+    def handle(self, *args, **options):
+        cells = rollups.rebuild(using=options['database'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {cells} rollup cells."))
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_rollups(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    DepartmentRollup = apps.get_model('academic', 'DepartmentRollup')
+    db = schema_editor.connection.alias
+    DepartmentRollup.objects.using(db).bulk_create([
+        DepartmentRollup(department_id=row['DISCIPLINE'], course_type=row['TYPE'], cbcs_category=row['CBCS_CATEGORY'],
+                         courses=row['courses'], credits=row['credits'] or 0, covered=row['covered'])
+        for row in (Course.objects.using(db).order_by().values('DISCIPLINE', 'TYPE', 'CBCS_CATEGORY')
+                    .annotate(courses=Count('pk'), credits=Sum('MAXIMUM_CREDIT'), covered=Count('current_syllabus')))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0001_initial'),
+        ('courses', '0009_model_versions'),  # CurrentSyllabus, for the initial coverage counts
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course_type', models.CharField(max_length=20)),
+                ('cbcs_category', models.CharField(max_length=6)),
+                ('courses', models.IntegerField(default=0)),
+                ('credits', models.IntegerField(default=0)),
+                ('covered', models.IntegerField(default=0)),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='academic.department')),
+            ],
+            options={
+                'unique_together': {('department', 'course_type', 'cbcs_category')},
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
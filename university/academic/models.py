@@ -19,4 +19,23 @@ class Department(models.Model):
         unique_together = ('name', 'faculty')
 
     def __str__(self):
-        return f"{self.name} ({self.get_faculty_display()})"
\ No newline at end of file
+        return f"{self.name} ({self.get_faculty_display()})"
+
+class DepartmentRollup(models.Model):
+    """
+    Running course totals for one department, split by course TYPE and CBCS_CATEGORY.
+    academic/rollups.py keeps them up to date on Course and CurrentSyllabus writes, and
+    department and faculty totals are sums over these few cells, never over the courses.
+    """
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='rollups')
+    course_type = models.CharField(max_length=20)
+    cbcs_category = models.CharField(max_length=6)
+    courses = models.IntegerField(default=0)
+    credits = models.IntegerField(default=0)  # Sum of MAXIMUM_CREDIT
+    covered = models.IntegerField(default=0)  # Courses with a current (active) syllabus
+
+    class Meta:
+        unique_together = ('department', 'course_type', 'cbcs_category')
+
+    def __str__(self):
+        return f"{self.department_id} {self.course_type}/{self.cbcs_category}: {self.courses}"
@@ -0,0 +1,176 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, F, Sum
+from courses.models import Course, CurrentSyllabus
+from .models import Department, DepartmentRollup
+
+"""
+Department and faculty rollups: course counts by TYPE and CBCS_CATEGORY, total
+MAXIMUM_CREDIT and syllabus coverage (courses with a current, i.e. active, syllabus).
+
+DepartmentRollup holds one cell per (department, TYPE, CBCS_CATEGORY) in use, and writes
+adjust cells by deltas inside the writer's transaction (receivers in academic/signals.py):
+
+    Course saved / deleted              +-1 course and its credits on its cell; an edit that
+                                        changes the department, TYPE, CBCS_CATEGORY or credits
+                                        moves the course, coverage included, between cells
+    CurrentSyllabus created / deleted   +-1 covered on the course's cell
+    courses_bulk_changed                the same for each course of a bulk upsert
+
+Reads add up the cells, a handful per department however many courses it has. Bulk writes
+that skip the signals (seed_catalog, CurrentSyllabus.rebuild) are followed by rebuild(),
+also run by `manage.py rebuild_department_rollups`, which recomputes the cells with one
+GROUP BY over the courses.
+"""
+
+COURSE_FIELDS = ('DISCIPLINE_id', 'TYPE', 'CBCS_CATEGORY', 'MAXIMUM_CREDIT')
+
+
+def course_state(course):
+    """(department id, TYPE, CBCS_CATEGORY, credits): a cell key plus the credits it contributes."""
+    return course.DISCIPLINE_id, course.TYPE, course.CBCS_CATEGORY, course.MAXIMUM_CREDIT or 0
+
+
+def previous_state(pk, using=DEFAULT_DB_ALIAS):
+    if pk is None:
+        return None
+    row = Course.objects.using(using).filter(pk=pk).values_list(*COURSE_FIELDS).first()
+    return None if row is None else (*row[:3], row[3] or 0)
+
+
+def add(deltas, key, courses=0, credits=0, covered=0):
+    delta = deltas.setdefault(key, [0, 0, 0])
+    delta[0] += courses
+    delta[1] += credits
+    delta[2] += covered
+
+
+def apply(deltas, using=DEFAULT_DB_ALIAS):
+    """Add {(department id, TYPE, CBCS_CATEGORY): [courses, credits, covered]} to the cells."""
+    with transaction.atomic(using=using):
+        for (department_id, course_type, cbcs_category), (courses, credits, covered) in deltas.items():
+            if not (courses or credits or covered):
+                continue
+            rows = DepartmentRollup.objects.using(using).filter(
+                department_id=department_id, course_type=course_type, cbcs_category=cbcs_category)
+            changes = {'courses': F('courses') + courses, 'credits': F('credits') + credits,
+                       'covered': F('covered') + covered}
+            # A missing cell only gets created for a course arriving in it. Subtracting from a
+            # missing one happens while a department is deleted and its cells cascade away.
+            if not rows.update(**changes) and courses > 0:
+                DepartmentRollup.objects.using(using).bulk_create([DepartmentRollup(
+                    department_id=department_id, course_type=course_type, cbcs_category=cbcs_category,
+                )], ignore_conflicts=True)
+                rows.update(**changes)
+
+
+def move(deltas, previous, current, covered):
+    """Record a course going from state `previous` (None: new) to `current` (None: deleted)."""
+    if previous == current:
+        return
+    if previous is not None:
+        add(deltas, previous[:3], -1, -previous[3], -covered)
+    if current is not None:
+        add(deltas, current[:3], 1, current[3], covered)
+
+
+def course_saved(course, previous, using=DEFAULT_DB_ALIAS, update_fields=None):
+    current = course_state(course)
+    if update_fields is not None and previous is not None:
+        # Fields left out of save(update_fields=...) keep their stored values
+        written = {'DISCIPLINE_id' if name == 'DISCIPLINE' else name for name in update_fields}
+        current = tuple(new if field in written else old for field, new, old in zip(COURSE_FIELDS, current, previous))
+    if previous == current:
+        return
+    covered = previous is not None and CurrentSyllabus.objects.using(using).filter(course_id=course.pk).exists()
+    deltas = {}
+    move(deltas, previous, current, int(covered))
+    apply(deltas, using)
+
+
+def course_deleted(previous, using=DEFAULT_DB_ALIAS):
+    """`previous` is the state read just before the delete: the instance may be out of date."""
+    # Its CurrentSyllabus row is deleted first in the same cascade, and uncounts its coverage
+    deltas = {}
+    move(deltas, previous, None, 0)
+    apply(deltas, using)
+
+
+def coverage_changed(course_id, covered, using=DEFAULT_DB_ALIAS):
+    """covered is +1 when the course gains a current syllabus, -1 when it loses it."""
+    row = Course.objects.using(using).filter(pk=course_id).values_list(*COURSE_FIELDS[:3]).first()
+    if row is not None:
+        apply({row: [0, 0, covered]}, using)
+
+
+def courses_changed(courses, previous, using=DEFAULT_DB_ALIAS):
+    """Bulk upsert: `previous` maps the pk of each updated course to its state before."""
+    updated = [course.pk for course in courses if course.pk in previous and previous[course.pk] != course_state(course)]
+    covered = set(CurrentSyllabus.objects.using(using).filter(course_id__in=updated)
+                  .values_list('course_id', flat=True)) if updated else set()
+    deltas = {}
+    for course in courses:
+        move(deltas, previous.get(course.pk), course_state(course), int(course.pk in covered))
+    apply(deltas, using)
+
+
+def rebuild(using=DEFAULT_DB_ALIAS):
+    """Recompute every cell from the courses. Returns the number of cells."""
+    cells = [
+        DepartmentRollup(department_id=row['DISCIPLINE'], course_type=row['TYPE'], cbcs_category=row['CBCS_CATEGORY'],
+                         courses=row['courses'], credits=row['credits'] or 0, covered=row['covered'])
+        for row in (Course.objects.using(using).order_by().values('DISCIPLINE', 'TYPE', 'CBCS_CATEGORY')
+                    .annotate(courses=Count('pk'), credits=Sum('MAXIMUM_CREDIT'), covered=Count('current_syllabus')))
+    ]
+    with transaction.atomic(using=using):
+        DepartmentRollup.objects.using(using).all().delete()
+        DepartmentRollup.objects.using(using).bulk_create(cells)
+    return len(cells)
+
+
+def empty_totals():
+    return {'courses': 0, 'credits': 0, 'covered_courses': 0, 'coverage': None, 'by_type': {}, 'by_cbcs_category': {}}
+
+
+def add_totals(totals, courses, credits, covered, course_type, cbcs_category):
+    totals['courses'] += courses
+    totals['credits'] += credits
+    totals['covered_courses'] += covered
+    if courses:
+        totals['by_type'][course_type] = totals['by_type'].get(course_type, 0) + courses
+        totals['by_cbcs_category'][cbcs_category] = totals['by_cbcs_category'].get(cbcs_category, 0) + courses
+    if totals['courses']:
+        totals['coverage'] = round(totals['covered_courses'] / totals['courses'], 4)
+
+
+def department_rollups(department_ids=None, using=None):
+    """Totals per department (every department, including those without courses), by id."""
+    departments = Department.objects.using(using).order_by('id')
+    cells = DepartmentRollup.objects.using(using)
+    if department_ids is not None:
+        departments = departments.filter(pk__in=department_ids)
+        cells = cells.filter(department_id__in=department_ids)
+    results = {
+        pk: {'id': pk, 'name': name, 'faculty': faculty, **empty_totals()}
+        for pk, name, faculty in departments.values_list('pk', 'name', 'faculty')
+    }
+    for department_id, *values in cells.values_list('department_id', 'courses', 'credits', 'covered',
+                                                    'course_type', 'cbcs_category'):
+        if department_id in results:
+            add_totals(results[department_id], *values)
+    return results
+
+
+def faculty_rollups(faculties=None, using=None):
+    """Totals per faculty (every FACULTY_CHOICES entry), by code."""
+    results = {
+        code: {'faculty': code, 'label': label, 'departments': 0, **empty_totals()}
+        for code, label in Department.FACULTY_CHOICES if faculties is None or code in faculties
+    }
+    for faculty, count in (Department.objects.using(using).filter(faculty__in=list(results)).order_by()
+                           .values_list('faculty').annotate(Count('pk'))):
+        results[faculty]['departments'] = count
+    cells = DepartmentRollup.objects.using(using).filter(department__faculty__in=list(results))
+    for faculty, *values in cells.values_list('department__faculty', 'courses', 'credits', 'covered',
+                                              'course_type', 'cbcs_category'):
+        add_totals(results[faculty], *values)
+    return results
@@ -0,0 +1,39 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from courses.models import Course, CurrentSyllabus
+from courses.signals import courses_bulk_changed
+from . import rollups
+
+"""
+Keeps the department rollups (academic/rollups.py) in step with Course and CurrentSyllabus
+writes, in the same transaction as the write.
+"""
+
+# What the row holds before the write: the instance may have been loaded before other edits
+@receiver(pre_save, sender=Course)
+@receiver(pre_delete, sender=Course)
+def remember_course_state(sender, instance, using, **kwargs):
+    instance._rollup_previous = rollups.previous_state(instance.pk, using=using)
+
+@receiver(post_save, sender=Course)
+def count_course(sender, instance, using, update_fields=None, **kwargs):
+    rollups.course_saved(instance, getattr(instance, '_rollup_previous', None), using=using, update_fields=update_fields)
+
+@receiver(post_delete, sender=Course)
+def uncount_course(sender, instance, using, **kwargs):
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous is not None:
+        rollups.course_deleted(previous, using=using)
+
+@receiver(post_save, sender=CurrentSyllabus)
+def count_coverage(sender, instance, created, using, **kwargs):
+    if created:  # Otherwise the course already had a current syllabus
+        rollups.coverage_changed(instance.course_id, 1, using=using)
+
+@receiver(post_delete, sender=CurrentSyllabus)
+def uncount_coverage(sender, instance, using, **kwargs):
+    rollups.coverage_changed(instance.course_id, -1, using=using)
+
+@receiver(courses_bulk_changed)
+def count_bulk_courses(sender, courses, using, previous=None, **kwargs):
+    rollups.courses_changed(courses, previous or {}, using=using)
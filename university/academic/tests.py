@@ -1,3 +1,80 @@
 from django.test import TestCase
+from courses.bulk import BulkUpsert
+from courses.models import Course, Syllabus
+from .models import Department, DepartmentRollup
+from . import rollups
 
-# Create your tests here.
+
+class RollupTests(TestCase):
+    """Incrementally maintained rollups must always equal a rebuild from scratch."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.physics = Department.objects.create(name='Physics', faculty='SC')
+        cls.history = Department.objects.create(name='History', faculty='LAMS')
+
+    def course(self, code, department, **fields):
+        return Course.objects.create(**{
+            'COURSE_CODE': code, 'COURSE_NAME': code, 'CATEGORY': 'CBCS', 'COURSE_CATEGORY': 'COMPULSORY',
+            'TYPE': 'THEORY', 'CREDIT_SCHEME': 'NEP', 'CBCS_CATEGORY': 'CORE', 'DISCIPLINE': department,
+            'MAXIMUM_CREDIT': 4, **fields,
+        })
+
+    def cells(self):
+        return sorted((cell.department_id, cell.course_type, cell.cbcs_category, cell.courses, cell.credits, cell.covered)
+                      for cell in DepartmentRollup.objects.all() if cell.courses or cell.credits or cell.covered)
+
+    def assertMatchesRebuild(self):
+        incremental = self.cells()
+        rollups.rebuild()
+        self.assertEqual(incremental, self.cells())
+
+    def test_writes_keep_rollups_exact(self):
+        mechanics = self.course('PH101', self.physics)
+        self.course('PH102', self.physics, TYPE='PRACTICAL', MAXIMUM_CREDIT=2)
+        self.course('HI101', self.history, CBCS_CATEGORY='GE')
+        syllabus = Syllabus.objects.create(course=mechanics)
+        self.assertMatchesRebuild()
+
+        mechanics.TYPE, mechanics.MAXIMUM_CREDIT = 'TUTORIAL', 6
+        mechanics.save()
+        self.assertMatchesRebuild()
+        mechanics.TYPE, mechanics.MAXIMUM_CREDIT = 'PROJECT', 5  # Only the credits are written
+        mechanics.save(update_fields=['MAXIMUM_CREDIT'])
+        mechanics.refresh_from_db()
+        self.assertMatchesRebuild()
+        syllabus.is_active = False
+        syllabus.save()
+        self.assertMatchesRebuild()
+        syllabus.is_active = True
+        syllabus.save()
+
+        BulkUpsert().run(iter([
+            (1, {'COURSE_CODE': 'PH101', 'COURSE_NAME': 'Mechanics', 'CATEGORY': 'CBCS', 'COURSE_CATEGORY': 'COMPULSORY',
+                 'TYPE': 'THEORY', 'CREDIT_SCHEME': 'NEP', 'CBCS_CATEGORY': 'CORE', 'DISCIPLINE': self.history.pk,
+                 'MAXIMUM_CREDIT': 3}),
+            (2, {'COURSE_CODE': 'HI102', 'COURSE_NAME': 'Empires', 'CATEGORY': 'CBCS', 'COURSE_CATEGORY': 'ELECTIVE',
+                 'TYPE': 'THEORY', 'CREDIT_SCHEME': 'NEP', 'CBCS_CATEGORY': 'GE', 'DISCIPLINE': self.history.pk}),
+        ]))
+        self.assertMatchesRebuild()
+        mechanics.delete()
+        self.assertMatchesRebuild()
+
+    def test_endpoints(self):
+        mechanics = self.course('PH101', self.physics)
+        self.course('PH102', self.physics, TYPE='PRACTICAL', MAXIMUM_CREDIT=2)
+        Syllabus.objects.create(course=mechanics)
+
+        with self.assertNumQueries(2):
+            data = self.client.get(f'/api/academic/rollups/departments/{self.physics.pk}/').json()
+        self.assertEqual(data['courses'], 2)
+        self.assertEqual(data['credits'], 6)
+        self.assertEqual(data['covered_courses'], 1)
+        self.assertEqual(data['coverage'], 0.5)
+        self.assertEqual(data['by_type'], {'THEORY': 1, 'PRACTICAL': 1})
+
+        faculties = {row['faculty']: row for row in self.client.get('/api/academic/rollups/faculties/').json()}
+        self.assertEqual(faculties['SC']['courses'], 2)
+        self.assertEqual(faculties['LAMS']['departments'], 1)
+        self.assertIsNone(faculties['LAMS']['coverage'])
+        self.assertEqual(self.client.get('/api/academic/rollups/faculties/XX/').status_code, 404)
@@ -1,6 +1,8 @@
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
-from .views import DepartmentViewSet, faculty_choices
+from .views import (DepartmentViewSet, faculty_choices, department_rollups, department_rollup,
+                    faculty_rollups, faculty_rollup)
 
 router = DefaultRouter()
 router.register(r'departments', DepartmentViewSet)
@@ -8,4 +10,22 @@ router.register(r'departments', DepartmentViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('faculty-choices/', faculty_choices, name='faculty_choices'),
-]
\ No newline at end of file
+    path('rollups/departments/', department_rollups, name='department_rollups'),
+    path('rollups/departments/<int:pk>/', department_rollup, name='department_rollup'),
+    path('rollups/faculties/', faculty_rollups, name='faculty_rollups'),
+    path('rollups/faculties/<str:faculty>/', faculty_rollup, name='faculty_rollup'),
+]
+
+
+def async_read_urlpatterns():
+    """Async GET handlers shadowing the router's list/detail routes (see courses.urls.async_read_urlpatterns)."""
+    from . import async_views
+
+    return [
+        re_path(r'^departments/$', async_views.department_collection, name='department-list'),
+        re_path(r'^departments/(?P<pk>\d+)/$', async_views.department_member, name='department-detail'),
+    ]
+
+
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = async_read_urlpatterns() + urlpatterns
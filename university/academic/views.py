@@ -1,13 +1,19 @@
 from rest_framework import viewsets,  permissions
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from .models import Department
+from . import rollups
 from .serializers import DepartmentSerializer
+from university.fastlist import FastListMixin
+from university.db_router import ReplicaReadMixin, replica_reads
+from courses.versions import ConditionalGetMixin
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(ConditionalGetMixin, ReplicaReadMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
+    version_models = (Department,)
     pagination_class = None  # Disable pagination
     
     def get_permissions(self):
@@ -20,4 +26,37 @@ class DepartmentViewSet(viewsets.ModelViewSet):
 @permission_classes([permissions.AllowAny])  # Ensure GET is open for choices
 def faculty_choices(request):
     choices = [{'value': key, 'label': value} for key, value in Department.FACULTY_CHOICES]
-    return Response(choices)
\ No newline at end of file
+    return Response(choices)
+
+
+# Rollups for dashboards: totals per department or faculty, read from the DepartmentRollup
+# cells (academic/rollups.py), so the cost does not grow with the number of courses.
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def department_rollups(request):
+    with replica_reads(request):
+        return Response(list(rollups.department_rollups().values()))
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def department_rollup(request, pk):
+    with replica_reads(request):
+        results = rollups.department_rollups(department_ids=[pk])
+    if pk not in results:
+        raise NotFound('No Department matches the given query.')
+    return Response(results[pk])
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def faculty_rollups(request):
+    with replica_reads(request):
+        return Response(list(rollups.faculty_rollups().values()))
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def faculty_rollup(request, faculty):
+    with replica_reads(request):
+        results = rollups.faculty_rollups(faculties=[faculty])
+    if faculty not in results:
+        raise NotFound('Unknown faculty.')
+    return Response(results[faculty])
@@ -1,12 +1,100 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework.exceptions import AuthenticationFailed
+from .revocation import is_revoked
+from courses import versions
 
 """
-Since SimpleJWT expects the token in the Authorization header by default, we need a 
+Since SimpleJWT expects the token in the Authorization header by default, we need a
 custom authentication class to look for the accessToken in the cookie.
 """
+
+"""
+Resolving the user behind a token is a CustomUser primary-key query on every authenticated
+request. UserCache keeps recently resolved users in process memory, keyed by (user id, token
+id), bounded in size (least recently used entries go first) and expiring after a TTL or when
+the token itself expires, whichever comes first.
+
+Saving or deleting a CustomUser (e.g. deactivating it) drops that user's entries in the
+saving process at once, and bumps the CustomUser change counter (account/signals.py,
+courses/versions.py). Every process reads that counter at most every
+AUTH_USER_CACHE_SYNC_INTERVAL seconds and empties its cache when it moved, so elsewhere a
+changed user is served stale for at most that long. A queryset .update() on users sends no
+signals: it bumps nothing, and its change shows once the entries expire (AUTH_USER_CACHE_TTL),
+unless the caller bumps the counter itself with versions.bump(CustomUser).
+"""
+class UserCache:
+    def __init__(self, max_size, ttl, sync_interval):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self._entries = OrderedDict()  # (user_id, jti) -> (expires_at, user)
+        self._lock = threading.Lock()
+        self._version = None  # versions.fingerprint([CustomUser]) at the last sync
+        self._next_sync = 0.0
+
+    def maybe_sync(self):
+        """Empty the cache when the CustomUser counter moved: a user was saved or deleted in some process."""
+        if time.monotonic() < self._next_sync:
+            return
+        self._next_sync = time.monotonic() + self.sync_interval
+        version = versions.fingerprint([get_user_model()])
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+
+    def get(self, key):
+        self.maybe_sync()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, user, token_exp=None):
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        self.maybe_sync()  # So an entry is never stored under a counter value not read yet
+        with self._lock:
+            self._entries[key] = (expires_at, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserCache(
+    max_size=getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 60),
+    sync_interval=getattr(settings, 'AUTH_USER_CACHE_SYNC_INTERVAL', 5),
+)
+
 """
-This class overrides the default JWT authentication to check the accessToken cookie instead 
+This class overrides the default JWT authentication to check the accessToken cookie instead
 of the Authorization header.
 If no token is found, it returns None (unauthenticated), and if the token is invalid, it raises an error.
 """
@@ -17,7 +105,36 @@ class CookieJWTAuthentication(JWTAuthentication):
             return None  # No token, let other auth methods try or fail gracefully
         try:
             validated_token = self.get_validated_token(raw_token)
+            if is_revoked(validated_token):  # Logged out; in-memory check, see account/revocation.py
+                raise AuthenticationFailed("Token is revoked")
             user = self.get_user(validated_token)
             return (user, validated_token)
         except Exception as e:
-            raise AuthenticationFailed(f"Invalid token: {str(e)}")
\ No newline at end of file
+            raise AuthenticationFailed(f"Invalid token: {str(e)}")
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        jti = validated_token.get(jwt_settings.JTI_CLAIM)
+        if user_id is None or jti is None or not user_cache.max_size:
+            return super().get_user(validated_token)
+        key = (str(user_id), jti)
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)  # Also rejects inactive users
+            user_cache.set(key, user, token_exp=validated_token.get('exp'))
+        return copy.copy(user)  # Views must not mutate the shared cached instance
+
+
+"""
+Claims-only mode for read-heavy endpoints - no per-request database access. request.user is a
+simplejwt TokenUser built from the token claims (id, is_staff, is_superuser...), so it suits
+views that only need to know *who* is calling. Opt in per view:
+    authentication_classes = [CookieJWTClaimsAuthentication]
+A deactivated user keeps passing until their access token expires; a logged-out token is
+still rejected (the revocation check is in memory).
+"""
+class CookieJWTClaimsAuthentication(CookieJWTAuthentication):
+    def get_user(self, validated_token):
+        if jwt_settings.USER_ID_CLAIM not in validated_token:
+            raise AuthenticationFailed("Token contained no recognizable user identification")
+        return jwt_settings.TOKEN_USER_CLASS(validated_token)
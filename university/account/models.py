@@ -43,4 +43,18 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     REQUIRED_FIELDS = ['first_name', 'last_name']   # Ensures these fields are prompted when creating a superuser.
 
     def __str__(self):
-        return self.email
\ No newline at end of file
+        return self.email
+
+"""
+A logged-out token, identified by its jti claim. Rows are only needed until the token would
+have expired anyway; account/revocation.py prunes them after that. Lookups go through the
+in-process filter there rather than straight to this table.
+"""
+class RevokedToken(models.Model):
+    jti = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, null=True, blank=True, related_name='revoked_tokens')
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,155 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .models import RevokedToken
+
+"""
+Revocation of logged-out tokens without a database query per check.
+
+Every process keeps a bloom filter of the jti claims in RevokedToken. A token whose jti is
+not in the filter is certainly not revoked, so the common path (refreshing or using a live
+token) only hashes the jti. A filter hit is confirmed against the table, since a bloom
+filter has false positives (TOKEN_REVOCATION_ERROR_RATE, for up to
+TOKEN_REVOCATION_CAPACITY entries).
+
+The filter is kept current from the table:
+  - sync, at most every TOKEN_REVOCATION_SYNC_INTERVAL seconds: adds the rows revoked since
+    the last sync (re-reading a minute of overlap, for rows committed late or written by a
+    server with a slightly different clock);
+  - rebuild, every TOKEN_REVOCATION_REBUILD_INTERVAL seconds: deletes the rows whose token
+    has expired (an expired token fails validation on its own) and builds a fresh filter
+    from the rest. Bloom filters cannot remove entries, so this is what prunes them.
+A token revoked in this process is added to its filter at once. Other processes see it after
+their next sync, so a logged-out token can stay usable elsewhere for up to the sync interval.
+Syncing happens inside whichever request finds it due; the other threads keep checking
+against the current filter meanwhile.
+"""
+
+CAPACITY = getattr(settings, 'TOKEN_REVOCATION_CAPACITY', 100000)
+ERROR_RATE = getattr(settings, 'TOKEN_REVOCATION_ERROR_RATE', 0.01)
+SYNC_INTERVAL = getattr(settings, 'TOKEN_REVOCATION_SYNC_INTERVAL', 10)
+REBUILD_INTERVAL = getattr(settings, 'TOKEN_REVOCATION_REBUILD_INTERVAL', 3600)
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        # Optimal bit count and hash count for `capacity` entries at `error_rate`
+        self.size = max(64, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, key):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        if key in self:
+            return
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self.positions(key))
+
+    def __len__(self):
+        return self.count
+
+
+class RevocationList:
+    def __init__(self, capacity, error_rate, sync_interval, rebuild_interval):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.filter = None  # Built on first use
+        self._lock = threading.Lock()
+        self._synced_at = None  # Database-side watermark: rows revoked from here on are not in the filter yet
+        self._next_sync = 0.0
+        self._next_rebuild = 0.0
+
+    def is_revoked(self, jti):
+        self.maybe_sync()
+        if jti not in self.filter:
+            return False
+        return RevokedToken.objects.filter(jti=jti, expires_at__gt=timezone.now()).exists()
+
+    def revoke(self, jti, expires_at, user_id=None):
+        RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': expires_at, 'user_id': user_id})
+        if self.filter is None:
+            self.maybe_sync()  # The first build reads the row just written
+        else:
+            self.filter.add(jti)
+
+    def maybe_sync(self):
+        now = time.monotonic()
+        if now < self._next_sync and self.filter is not None:
+            return
+        # Without a filter every caller has to wait for the first build
+        if not self._lock.acquire(blocking=self.filter is None):
+            return  # Another thread is syncing
+        try:
+            now = time.monotonic()
+            if self.filter is None or now >= self._next_rebuild:
+                self.rebuild()
+            elif now >= self._next_sync:
+                self.sync()
+        finally:
+            self._lock.release()
+
+    def sync(self):
+        now = timezone.now()
+        for jti in RevokedToken.objects.filter(revoked_at__gte=self._synced_at - SYNC_OVERLAP, expires_at__gt=now) \
+                .values_list('jti', flat=True):
+            self.filter.add(jti)
+        self._synced_at = now
+        self._next_sync = time.monotonic() + self.sync_interval
+        if len(self.filter) > self.filter.capacity:
+            self._next_rebuild = 0.0  # Past capacity the error rate climbs; size up on the next check
+
+    def rebuild(self):
+        now = timezone.now()
+        RevokedToken.objects.filter(expires_at__lte=now).delete()
+        jtis = list(RevokedToken.objects.filter(expires_at__gt=now).values_list('jti', flat=True))
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        self.filter = bloom
+        self._synced_at = now
+        started = time.monotonic()
+        self._next_sync = started + self.sync_interval
+        self._next_rebuild = started + self.rebuild_interval
+
+    def clear(self):
+        """Drop the filter; the next check rebuilds it from the table."""
+        with self._lock:
+            self.filter = None
+
+
+revocation_list = RevocationList(CAPACITY, ERROR_RATE, SYNC_INTERVAL, REBUILD_INTERVAL)
+
+
+def is_revoked(token):
+    jti = token.get(jwt_settings.JTI_CLAIM)
+    return jti is not None and revocation_list.is_revoked(jti)
+
+
+def revoke(token):
+    """Revoke a validated simplejwt token (access or refresh) until it expires."""
+    jti, exp = token.get(jwt_settings.JTI_CLAIM), token.get('exp')
+    if jti is None or exp is None:
+        return
+    expires_at = datetime.fromtimestamp(exp, tz=dt_timezone.utc)
+    revocation_list.revoke(jti, expires_at, user_id=token.get(jwt_settings.USER_ID_CLAIM))
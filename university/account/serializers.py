@@ -1,5 +1,10 @@
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer, TokenVerifySerializer
+from rest_framework_simplejwt.tokens import UntypedToken
 from account.models import CustomUser
+from account.revocation import is_revoked
 
 # Handles user creation with password confirmation (re_password).
 class CustomUserCreateSerializer(serializers.ModelSerializer):
@@ -29,4 +34,18 @@ class CustomUserCreateSerializer(serializers.ModelSerializer):
 class CustomUserSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
-        fields = ('id', 'email', 'first_name', 'last_name')
\ No newline at end of file
+        fields = ('id', 'email', 'first_name', 'last_name')
+
+# SimpleJWT's refresh and verify, plus a revocation check (SIMPLE_JWT points at these).
+class RevocationCheckingTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        if is_revoked(self.token_class(attrs['refresh'])):
+            raise InvalidToken(_('Token is revoked'))
+        return super().validate(attrs)
+
+class RevocationCheckingTokenVerifySerializer(TokenVerifySerializer):
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if is_revoked(UntypedToken(attrs['token'])):
+            raise serializers.ValidationError(_('Token is revoked'))
+        return data
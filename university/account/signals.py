@@ -0,0 +1,16 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from courses import versions
+from .auth import user_cache
+
+CustomUser = get_user_model()
+
+# A cached user must never outlive a change to the row it was loaded from (deactivation,
+# permission changes, deletion): dropped here at once, in other processes at their next
+# sync of the counter (account/auth.py).
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, using, **kwargs):
+    versions.bump(CustomUser, using=using)
+    user_cache.invalidate_user(instance.pk)
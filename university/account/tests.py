@@ -1,3 +1,104 @@
+import time
 from django.test import TestCase
+from rest_framework.test import APIClient
+from account.auth import UserCache, user_cache
+from account.models import CustomUser, RevokedToken
+from account.revocation import BloomFilter, revocation_list
+from courses import versions
 
-# Create your tests here.
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        revocation_list.clear()
+        CustomUser.objects.create_user('student@example.com', 'Test', 'Student', password='pass-1234')
+        self.client = APIClient()
+        self.client.post('/api/auth/jwt/create/', {'email': 'student@example.com', 'password': 'pass-1234'})
+        self.refresh_cookie = self.client.cookies['refreshToken'].value
+
+    def test_refresh_checks_revocation_in_memory(self):
+        revocation_list.maybe_sync()
+        # Only simplejwt's own active-user lookup; the revocation check does not query
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/auth/jwt/refresh/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_logout_revokes_both_tokens(self):
+        access_cookie = self.client.cookies['accessToken'].value
+        self.assertEqual(self.client.post('/api/auth/logout/').status_code, 200)
+        self.assertEqual(RevokedToken.objects.count(), 2)
+
+        replay = APIClient()
+        replay.cookies['refreshToken'] = self.refresh_cookie
+        self.assertEqual(replay.post('/api/auth/jwt/refresh/').status_code, 401)
+        replay.cookies['accessToken'] = access_cookie
+        self.assertEqual(replay.get('/api/auth/users/me/').status_code, 401)
+
+    def test_other_process_sees_revocation_after_sync(self):
+        self.client.post('/api/auth/logout/')
+        revocation_list.clear()  # As a process that did not handle the logout
+        replay = APIClient()
+        replay.cookies['refreshToken'] = self.refresh_cookie
+        self.assertEqual(replay.post('/api/auth/jwt/refresh/').status_code, 401)
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, 0.01)
+        keys = [f'jti-{i}' for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        revocation_list.clear()
+        self.user = CustomUser.objects.create_user('student@example.com', 'Test', 'Student', password='pass-1234')
+        self.client = APIClient()
+        self.client.post('/api/auth/jwt/create/', {'email': 'student@example.com', 'password': 'pass-1234'})
+        revocation_list.maybe_sync()
+
+    def test_user_is_resolved_once(self):
+        self.assertEqual(self.client.get('/api/auth/users/me/').json()['email'], 'student@example.com')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/users/me/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_saving_or_deleting_the_user_drops_it(self):
+        self.client.get('/api/auth/users/me/')
+        self.assertEqual(len(user_cache), 1)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(len(user_cache), 0)
+        self.assertEqual(self.client.get('/api/auth/users/me/').status_code, 401)
+
+        self.user.is_active = True
+        self.user.save()
+        self.client.get('/api/auth/users/me/')
+        self.user.delete()
+        self.assertEqual(len(user_cache), 0)
+        self.assertEqual(self.client.get('/api/auth/users/me/').status_code, 401)
+
+    def test_saves_in_other_processes_drop_it(self):
+        self.client.get('/api/auth/users/me/')
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        versions.bump(CustomUser)  # What the post_save receiver does in the process that saved it
+        self.assertEqual(self.client.get('/api/auth/users/me/').status_code, 200)  # Until the next sync
+        user_cache._next_sync = 0
+        self.assertEqual(self.client.get('/api/auth/users/me/').status_code, 401)
+
+    def test_bounds(self):
+        cache = UserCache(max_size=2, ttl=60, sync_interval=60)
+        cache.set(('1', 'a'), 'first')
+        cache.set(('2', 'b'), 'second')
+        cache.get(('1', 'a'))  # Now the most recently used
+        cache.set(('3', 'c'), 'third')
+        self.assertIsNone(cache.get(('2', 'b')))
+        self.assertEqual(cache.get(('1', 'a')), 'first')
+
+        cache.set(('4', 'd'), 'expired', token_exp=time.time() - 1)  # An entry never outlives its token
+        self.assertIsNone(cache.get(('4', 'd')))
+        cache.ttl = -1
+        cache.set(('5', 'e'), 'stale')
+        self.assertIsNone(cache.get(('5', 'e')))
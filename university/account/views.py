@@ -1,7 +1,10 @@
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from .revocation import revoke
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     def post(self, request, *args, **kwargs):
@@ -16,28 +19,35 @@ class CustomTokenObtainPairView(TokenObtainPairView):
 class CustomTokenRefreshView(TokenRefreshView):
     def post(self, request, *args, **kwargs):
         refresh_token = request.COOKIES.get('refreshToken')
-        print(f"Refresh token from cookie: {refresh_token}")
         if not refresh_token:
             return Response({"error": "No refresh token provided"}, status=400)
         
-        # Create a new data dict and pass it to the serializer directly
+        # Create a new data dict and pass it to the serializer directly; it also rejects revoked tokens
         serializer = self.get_serializer(data={'refresh': refresh_token})
-        serializer.is_valid(raise_exception=True)
-        data = serializer.validated_data
-        
-        # Generate new access token manually
-        from rest_framework_simplejwt.tokens import RefreshToken
-        refresh = RefreshToken(refresh_token)
-        access_token = str(refresh.access_token)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        access_token = serializer.validated_data['access']
         
         # Set the new access token in the cookie
         response = Response({"message": "Token refreshed"})
         response.set_cookie('accessToken', access_token, httponly=True, secure=False, samesite='Lax', max_age=60 * 60)
         return response
 
+# Revokes both tokens (account/revocation.py) as well as deleting the cookies, so copies of
+# them stop working too.
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
     def post(self, request):
+        if request.auth is not None:
+            revoke(request.auth)
+        refresh_token = request.COOKIES.get('refreshToken')
+        if refresh_token:
+            try:
+                revoke(RefreshToken(refresh_token))
+            except TokenError:
+                pass  # Already invalid or expired: nothing to revoke
         response = Response({"message": "Logout successful"})
         response.delete_cookie('accessToken')
         response.delete_cookie('refreshToken')
@@ -0,0 +1,213 @@
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed, NotAcceptable, ValidationError
+from rest_framework.request import Request
+from .pagecache import PageCacheMixin, STATS_NAME, get_cache, page_key
+from .versions import aget_versions, set_validators, validators
+from .views import CourseViewSet, SyllabusViewSet
+from account.auth import CookieJWTAuthentication
+from university.db_router import replica_reads
+from university.metrics import registry
+
+"""
+Async read path for ASGI deployments. Under ASGI every DRF view is pushed through
+sync_to_async, and sync views share one thread per connection scope. These views serve the
+common reads natively on the event loop with Django's async ORM (acount, async iteration,
+aget), so a few workers can hold many slow clients:
+
+    GET courses/ and courses/<pk>/   - CourseFilter filters, ?search=, page-number pagination
+    GET syllabi/ and syllabi/<pk>/   - ?course=, ?search=, page-number pagination
+
+The querysets are the viewsets' own: get_queryset() narrowed by their filter backends, built
+in a worker thread since validating a filter can query (?course= must name a course). Only
+the change counters, the count, the page and the object are read on the event loop. The
+responses are what the DRF viewsets return, byte for byte (courses/tests.py checks): same
+content negotiation and renderer, same ETag and Last-Modified with 304s
+(courses/versions.py), same page cache entries for the course list (courses/pagecache.py).
+Anything else goes to the regular sync viewset: writes, cursor pagination, ?fields= /
+?expand=, the browsable API, and requests whose access token cookie does not authenticate
+(so they get DRF's exact 401).
+Like the viewsets, the async reads go to the read replica when one is configured
+(university/db_router.py).
+The routes are only mounted when settings.ASYNC_READ_VIEWS is on, which university/asgi.py
+does. WSGI workers never pay for an event loop per request.
+"""
+
+# Read options the async path does not implement; requests using them go to the sync view
+SYNC_ONLY_PARAMS = {'cursor', 'pagination', 'fields', 'expand', 'format'}
+
+course_list_view = CourseViewSet.as_view({'get': 'list', 'post': 'create'})
+course_detail_view = CourseViewSet.as_view({
+    'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'
+})
+syllabus_list_view = SyllabusViewSet.as_view({'get': 'list', 'post': 'create'})
+syllabus_detail_view = SyllabusViewSet.as_view({
+    'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'
+})
+
+
+def authenticates(request):
+    """The reads are AllowAny, but DRF still rejects a request carrying a bad token."""
+    if 'accessToken' not in request.COOKIES:
+        return True
+    try:
+        CookieJWTAuthentication().authenticate(request)  # Served from the user cache when warm
+    except AuthenticationFailed:
+        return False
+    return True
+
+
+def make_view(view_class, request, action, **kwargs):
+    """A `view_class` instance set up for `action`, as DRF's dispatch would, without running it."""
+    return view_class(request=Request(request), action=action, args=(), kwargs=kwargs, format_kwarg=None)
+
+
+async def wants_async(request, view_class, sync_only_params=SYNC_ONLY_PARAMS):
+    """
+    (renderer, media type) from the viewset's content negotiation when the async path can
+    answer, else None: the request is a GET without sync-only parameters, negotiates JSON
+    (not the browsable API, not a 406) and, if it carries a token, the token authenticates.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    if sync_only_params.intersection(request.GET):
+        return None
+    try:
+        renderer, media_type = make_view(view_class, request, 'list').perform_content_negotiation(Request(request))
+    except NotAcceptable:
+        return None
+    if renderer.format != 'json':
+        return None
+    if not await sync_to_async(authenticates)(request):
+        return None
+    return renderer, media_type
+
+
+def json_response(data, negotiated, status=200):
+    renderer, media_type = negotiated
+    return HttpResponse(renderer.render(data, media_type, {}), status=status, content_type=renderer.media_type)
+
+
+def not_found(model, negotiated):
+    return json_response({'detail': f'No {model._meta.object_name} matches the given query.'}, negotiated, status=404)
+
+
+def view_queryset(view_class, request, action, **kwargs):
+    """The queryset `view_class` reads for `action`: get_queryset() narrowed by its filter backends."""
+    view = make_view(view_class, request, action, **kwargs)
+    return view.filter_queryset(view.get_queryset())
+
+
+async def respond(request, view, negotiated, build):
+    """
+    The viewset's conditional GET and page cache around `build()`, a coroutine function
+    making the response: a 304 while the client's copy is current, else the cached page (a
+    PageCacheMixin list), else build(). The change counters are read once for both.
+    """
+    versions = await aget_versions(view.get_version_models())
+    etag, last_modified = validators(request.get_full_path(), negotiated[1], versions)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        cache = get_cache() if view.action == 'list' and isinstance(view, PageCacheMixin) else None
+        if cache is None:
+            response = await build()
+        else:
+            key = page_key(request.build_absolute_uri(request.path), negotiated[1], versions, request.GET)
+            cached = await cache.aget(key)
+            registry.record_cache(STATS_NAME, hit=cached is not None)
+            if cached is not None:
+                body, content_type = cached
+                response = HttpResponse(body, content_type=content_type)
+            else:
+                response = await build()
+                if response.status_code == 200:
+                    await cache.aset(key, (response.content, response['Content-Type']))
+    if response.status_code in (200, 304):
+        set_validators(response, etag, last_modified)
+    patch_vary_headers(response, ['Accept'])  # As DRF sets after content negotiation
+    return response
+
+
+async def paginate(request, queryset, negotiated, pagination_class, serializer_class):
+    """Page-number pagination with the same page size rules, links and errors as DRF's."""
+    pagination = pagination_class()
+    drf_request = Request(request)
+    page_size = pagination.get_page_size(drf_request)
+    paginator = Paginator(queryset, page_size)
+    paginator.__dict__['count'] = await queryset.acount()  # Paginator.count is a cached_property
+    page_number = pagination.get_page_number(drf_request, paginator)
+    try:
+        number = paginator.validate_number(page_number)
+    except InvalidPage:
+        return json_response({'detail': 'Invalid page.'}, negotiated, status=404)
+    bottom = (number - 1) * page_size
+    objects = [obj async for obj in queryset[bottom:bottom + page_size]]
+    pagination.request = drf_request
+    pagination.page = Page(objects, number, paginator)
+    serializer = serializer_class(objects, many=True, context={'request': request})
+    return json_response(pagination.get_paginated_response(serializer.data).data, negotiated)
+
+
+async def list_view(request, view_class, negotiated):
+    async def build():
+        try:
+            queryset = await sync_to_async(view_queryset)(view_class, request, 'list')
+        except ValidationError as exc:  # An invalid filter value, as DRF renders it
+            return json_response(exc.detail, negotiated, status=400)
+        return await paginate(request, queryset, negotiated, view_class.pagination_class, view_class.serializer_class)
+
+    return await respond(request, make_view(view_class, request, 'list'), negotiated, build)
+
+
+async def retrieve(request, view_class, negotiated, pk):
+    async def build():
+        try:
+            queryset = await sync_to_async(view_queryset)(view_class, request, 'retrieve', pk=pk)
+        except ValidationError as exc:  # get_object() filters too
+            return json_response(exc.detail, negotiated, status=400)
+        try:
+            obj = await queryset.aget(pk=pk)
+        except queryset.model.DoesNotExist:
+            return not_found(queryset.model, negotiated)
+        return json_response(view_class.serializer_class(obj, context={'request': request}).data, negotiated)
+
+    return await respond(request, make_view(view_class, request, 'retrieve', pk=pk), negotiated, build)
+
+
+@csrf_exempt  # As DRF views are; the sync fallback does its own authentication
+async def course_collection(request):
+    negotiated = await wants_async(request, CourseViewSet)
+    if negotiated is None:
+        return await sync_to_async(course_list_view)(request)
+    with replica_reads(request):
+        return await list_view(request, CourseViewSet, negotiated)
+
+
+@csrf_exempt
+async def course_member(request, pk):
+    negotiated = await wants_async(request, CourseViewSet)
+    if negotiated is None:
+        return await sync_to_async(course_detail_view)(request, pk=pk)
+    with replica_reads(request):
+        return await retrieve(request, CourseViewSet, negotiated, pk)
+
+
+@csrf_exempt
+async def syllabus_collection(request):
+    negotiated = await wants_async(request, SyllabusViewSet)
+    if negotiated is None:
+        return await sync_to_async(syllabus_list_view)(request)
+    with replica_reads(request):
+        return await list_view(request, SyllabusViewSet, negotiated)
+
+
+@csrf_exempt
+async def syllabus_member(request, pk):
+    negotiated = await wants_async(request, SyllabusViewSet)
+    if negotiated is None:
+        return await sync_to_async(syllabus_detail_view)(request, pk=pk)
+    with replica_reads(request):
+        return await retrieve(request, SyllabusViewSet, negotiated, pk)
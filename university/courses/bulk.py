@@ -0,0 +1,239 @@
+import csv
+import json
+from django.core.exceptions import ValidationError
+from django.db import transaction, DatabaseError
+from django.utils import timezone
+from academic.models import Department
+from .models import Course
+from .signals import courses_bulk_changed
+
+"""
+Bulk course upsert - streams an NDJSON or CSV request body and upserts on COURSE_CODE.
+
+Rows are handled in batches of BATCH_SIZE. For each batch the disciplines and existing
+course codes are resolved with one query each. Rows are validated in memory
+(Model.clean_fields: lengths, choices, credit range). Then new rows go through bulk_create
+and existing ones through bulk_update, inside one transaction per batch. A bad row is
+reported and skipped; it never aborts its batch. When a batch repeats a COURSE_CODE, its
+last row is the one written and the earlier ones are reported as superseded, so created,
+updated and failed always add up to the rows read.
+
+Values are read as text: numbers in NDJSON are taken as their string form. Empty cells,
+nulls and missing columns count as not supplied. A new course needs every required
+column; an existing one only has the columns its row supplies written, so a row can
+update just COURSE_NAME or MAXIMUM_CREDIT and leave the rest as they are.
+
+Columns match the admin import/export (CourseResource): COURSE_CODE, COURSE_NAME, CATEGORY,
+COURSE_CATEGORY, TYPE, CREDIT_SCHEME, CBCS_CATEGORY, MAXIMUM_CREDIT, QUALIFYING_IN_NATURE,
+plus the discipline as either DISCIPLINE (department id) or DISCIPLINE__name (optionally
+narrowed by DISCIPLINE__faculty when the name exists in several faculties).
+"""
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+UPSERT_FIELDS = [
+    'COURSE_NAME', 'CATEGORY', 'COURSE_CATEGORY', 'TYPE', 'CREDIT_SCHEME', 'CBCS_CATEGORY',
+    'DISCIPLINE', 'MAXIMUM_CREDIT', 'QUALIFYING_IN_NATURE',
+]
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/x-jsonlines')
+CSV_TYPES = ('text/csv', 'application/csv')
+
+
+def iter_ndjson(lines):
+    """Yield (row number, dict or error message) for each non-blank line."""
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, f'Invalid JSON: {e}'
+            continue
+        yield number, row if isinstance(row, dict) else 'Each line must be a JSON object.'
+
+
+def iter_csv(lines):
+    """Yield (row number, dict or error message) for each data row; the header is row 1."""
+    decoded = (line.decode('utf-8-sig') if isinstance(line, bytes) else line for line in lines)
+    for number, row in enumerate(csv.DictReader(decoded), start=2):
+        if None in row:  # DictReader puts cells past the header under None
+            yield number, 'Row has more cells than the header.'
+            continue
+        # Cells missing from a short row come back as None
+        yield number, {key.strip(): value for key, value in row.items() if key and value is not None}
+
+
+def clean_row(row):
+    """
+    Return (values, errors): the supplied values as stripped strings, or errors for values
+    that cannot be a column (JSON arrays and objects).
+    """
+    values, errors = {}, {}
+    for key, value in row.items():
+        if value is None:
+            continue
+        if isinstance(value, (dict, list)):
+            errors[key] = ['Expected a string or a number.']
+            continue
+        value = str(value).strip()
+        if value:
+            values[key] = value
+    return values, errors
+
+
+def iter_rows(request):
+    """Pick the row reader for the request's Content-Type. Returns None when unsupported."""
+    content_type = request.content_type.split(';')[0].strip().lower()
+    if content_type in NDJSON_TYPES:
+        return iter_ndjson(request)
+    if content_type in CSV_TYPES:
+        return iter_csv(request)
+    return None
+
+
+class BulkUpsert:
+    def __init__(self, using='default'):
+        self.using = using
+        self.rows = self.created = self.updated = self.failed = 0
+        self.errors = []
+
+    def report(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+    def error(self, number, row, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            code = row.get('COURSE_CODE') if isinstance(row, dict) else None
+            self.errors.append({'row': number, 'COURSE_CODE': code, 'errors': errors})
+
+    def run(self, rows):
+        batch = []
+        for number, row in rows:
+            self.rows += 1
+            if not isinstance(row, dict):
+                self.error(number, None, {'non_field_errors': [row]})
+                continue
+            values, errors = clean_row(row)
+            if errors:
+                self.error(number, row, errors)
+                continue
+            batch.append((number, values))
+            if len(batch) >= BATCH_SIZE:
+                self.process(batch)
+                batch = []
+        if batch:
+            self.process(batch)
+        return self.report()
+
+    def resolve_disciplines(self, batch):
+        """Map each row's discipline reference to a department id with at most two queries."""
+        ids, names = set(), set()
+        for _, row in batch:
+            if row.get('DISCIPLINE'):
+                ids.add(row['DISCIPLINE'])
+            elif row.get('DISCIPLINE__name'):
+                names.add(row['DISCIPLINE__name'])
+        valid_ids = {str(pk) for pk in Department.objects.using(self.using)
+                     .filter(pk__in=[pk for pk in ids if pk.isdigit()]).values_list('pk', flat=True)}
+        by_name = {}
+        for pk, name, faculty in (Department.objects.using(self.using)
+                                  .filter(name__in=names).values_list('pk', 'name', 'faculty')):
+            by_name.setdefault(name, []).append((pk, faculty))
+        return valid_ids, by_name
+
+    def discipline_for(self, row, valid_ids, by_name):
+        """Return (department id, None) or (None, error message)."""
+        if row.get('DISCIPLINE'):
+            pk = row['DISCIPLINE']
+            return (int(pk), None) if pk in valid_ids else (None, f'Department {pk} does not exist.')
+        name = row.get('DISCIPLINE__name')
+        if not name:
+            return None, 'Provide DISCIPLINE (id) or DISCIPLINE__name.'
+        matches = by_name.get(name, [])
+        faculty = row.get('DISCIPLINE__faculty')
+        if faculty:
+            matches = [match for match in matches if match[1] == faculty]
+        if not matches:
+            return None, f'Department "{name}" does not exist.'
+        if len(matches) > 1:
+            return None, f'Department "{name}" exists in several faculties; add DISCIPLINE__faculty.'
+        return matches[0][0], None
+
+    def process(self, batch):
+        valid_ids, by_name = self.resolve_disciplines(batch)
+        columns = [field for field in UPSERT_FIELDS if field != 'DISCIPLINE']
+        existing = {row['COURSE_CODE']: row for row in Course.objects.using(self.using)
+                    .filter(COURSE_CODE__in=[row.get('COURSE_CODE', '') for _, row in batch])
+                    .values('pk', 'COURSE_CODE', 'DISCIPLINE_id', *columns)}
+        pending = {}  # COURSE_CODE -> (row number, row, Course, fields to write)
+        for number, row in batch:
+            code = row.get('COURSE_CODE', '')
+            current = existing.get(code)
+            supplied = [field for field in columns if field in row]
+            discipline_supplied = 'DISCIPLINE' in row or 'DISCIPLINE__name' in row
+            if current is None or discipline_supplied:
+                department_id, discipline_error = self.discipline_for(row, valid_ids, by_name)
+            else:
+                department_id, discipline_error = current['DISCIPLINE_id'], None
+            # An existing course keeps the values its row leaves out
+            values = {} if current is None else {field: current[field] for field in columns}
+            values.update((field, row[field]) for field in supplied)
+            course = Course(pk=current and current['pk'], COURSE_CODE=code, DISCIPLINE_id=department_id, **values)
+            errors = {}
+            try:
+                course.clean_fields(exclude=['DISCIPLINE'])
+            except ValidationError as e:
+                errors = e.message_dict
+            if discipline_error:
+                errors['DISCIPLINE'] = [discipline_error]
+            if errors:
+                self.error(number, row, errors)
+                continue
+            fields = tuple(field for field in UPSERT_FIELDS
+                           if field in supplied or (field == 'DISCIPLINE' and discipline_supplied))
+            if code in pending:  # A later duplicate wins
+                earlier_number, earlier_row, _, _ = pending[code]
+                self.error(earlier_number, earlier_row,
+                           {'COURSE_CODE': [f'Superseded by row {number}, which has the same COURSE_CODE.']})
+            pending[code] = (number, row, course, fields)
+        if not pending:
+            return
+
+        to_create, to_update, previous = [], {}, {}
+        for code, (_, _, course, fields) in pending.items():
+            if code in existing:
+                current = existing[code]
+                previous[course.pk] = (current['DISCIPLINE_id'], current['TYPE'], current['CBCS_CATEGORY'],
+                                       current['MAXIMUM_CREDIT'] or 0)
+                to_update.setdefault(fields, []).append(course)
+            else:
+                to_create.append(course)
+        updated = [course for courses in to_update.values() for course in courses]
+        try:
+            with transaction.atomic(using=self.using):
+                created = Course.objects.using(self.using).bulk_create(to_create)
+                now = timezone.now()  # bulk_update skips auto_now; the typeahead sync reads it
+                for fields, courses in to_update.items():
+                    if fields:  # Only the columns each row supplied
+                        for course in courses:
+                            course.updated_at = now
+                        Course.objects.using(self.using).bulk_update(courses, fields + ('updated_at',))
+                # Inside the transaction, so derived data commits (or fails) with the batch
+                courses_bulk_changed.send(sender=Course, courses=created + updated, previous=previous,
+                                          using=self.using)
+        except DatabaseError as e:
+            # e.g. a concurrent writer inserted one of these codes; report the whole batch
+            for number, row, _, _ in pending.values():
+                self.error(number, row, {'non_field_errors': [f'Batch failed: {e}']})
+            return
+        self.created += len(to_create)
+        self.updated += len(updated)
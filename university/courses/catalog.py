@@ -0,0 +1,86 @@
+import hashlib
+import json
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+from academic.models import Department
+from .models import Course
+from . import versions
+
+"""
+Catalog metadata bundle - every choice set plus the department list in one JSON document.
+The rendered bytes are built once per process and kept in memory. They are addressed by a
+hash of their content, so /catalog/<version>/ never changes and clients can cache it
+forever. /catalog/ is the only thing they revalidate: it names the current version. The
+choice constants only change on deploy, so in practice the version moves when departments do.
+Each request compares the Department change counter (courses/versions.py) with the one the
+bundle was built at, one indexed lookup, so every process sees an edit as soon as it commits.
+"""
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_bundle = None  # (department counter, version, body bytes)
+
+
+def choice_list(choices):
+    return [{'value': k, 'label': v} for k, v in choices]
+
+
+def course_choice_sets():
+    return {
+        'CATEGORY': choice_list(Course.CATEGORY_CHOICES),
+        'COURSE_CATEGORY': choice_list(Course.COURSE_CATEGORY_CHOICES),
+        'TYPE': choice_list(Course.TYPE_CHOICES),
+        'CREDIT_SCHEME': choice_list(Course.CREDIT_SCHEME_CHOICES),
+        'CBCS_CATEGORY': choice_list(Course.CBCS_CATEGORY_CHOICES),
+        'QUALIFYING_IN_NATURE': choice_list(Course.QUALIFYING_CHOICES),
+    }
+
+
+def build_bundle():
+    payload = {
+        'course_choices': course_choice_sets(),
+        'faculty_choices': choice_list(Department.FACULTY_CHOICES),
+        'departments': list(Department.objects.order_by('id').values('id', 'name', 'faculty')),
+    }
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(body).hexdigest()[:20], body
+
+
+def get_bundle():
+    """Return (version, body) for the current bundle, rebuilding it after department changes."""
+    global _bundle
+    counter = versions.fingerprint([Department])  # Read first: a later edit only makes it look stale
+    bundle = _bundle
+    if bundle is None or bundle[0] != counter:
+        version, body = build_bundle()
+        bundle = _bundle = (counter, version, body)
+    return bundle[1], bundle[2]
+
+
+@require_GET
+def catalog_pointer(request):
+    """Names the current bundle version; cheap to revalidate on every page load."""
+    version, _ = get_bundle()
+    response = JsonResponse({
+        'version': version,
+        'url': request.build_absolute_uri(reverse('catalog_bundle', args=[version])),
+    })
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@require_GET
+def catalog_bundle(request, version):
+    """The bundle itself. A given version's bytes never change."""
+    current, body = get_bundle()
+    if version != current:
+        return JsonResponse({'detail': 'Unknown catalog version.', 'version': current}, status=404)
+    etag = f'"{current}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -0,0 +1,212 @@
+import html
+import re
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+from .models import CurrentSyllabus, SyllabusChunk
+from .search import build_match_query
+
+"""
+Syllabus content search. The post-processing worker (courses/processing.py) extracts each
+PDF's text and stores it as SyllabusChunk rows via replace_chunks(). On SQLite an FTS5 table
+indexes the chunks of every course's *current* syllabus (CurrentSyllabus). A new version or
+an is_active change moves a course's mapping, and the CurrentSyllabus signals in
+courses/signals.py swap just that course's chunks in and out of the index, with no rescan.
+
+FTS rowids encode the chunk: syllabus_id * ROWID_STRIDE + position. A syllabus's entries
+are therefore one rowid range, which can be removed without reading the chunk table (it may
+already be gone, e.g. in a cascade delete). `manage.py rebuild_syllabus_content_index`
+rebuilds the whole index after bulk loads. Databases without FTS5 fall back to a
+case-insensitive scan of the current syllabi's chunks.
+"""
+
+FTS_TABLE = 'courses_syllabus_content_fts'
+ROWID_STRIDE = 1000  # Also the most chunks kept per syllabus
+CHUNK_SIZE = 1000  # characters, give or take a word
+MAX_MATCHES = 1000  # Matching chunks ranked per search before grouping them by syllabus
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "text, tokenize = 'unicode61 remove_diacritics 2', prefix = '3')"
+)
+DROP_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+INSERT_SQL = f"INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)"
+DELETE_SQL = f"DELETE FROM {FTS_TABLE} WHERE rowid >= %s AND rowid < %s"
+
+# snippet() markers, private-use characters that cannot clash with escaped text
+MARK_START, MARK_END = '\ue000', '\ue001'
+SNIPPET_TOKENS = 16
+SNIPPETS_PER_SYLLABUS = 3
+
+_WHITESPACE_RE = re.compile(r'[^\S\n]+')
+_TOKEN_RE = re.compile(r'\w+')
+_available = {}  # db alias -> bool
+
+
+def is_available(using=DEFAULT_DB_ALIAS):
+    if using not in _available:
+        connection = connections[using]
+        if connection.vendor != 'sqlite':
+            _available[using] = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+                _available[using] = cursor.fetchone() is not None
+    return _available[using]
+
+
+def forget_availability(using=DEFAULT_DB_ALIAS):
+    """Probe again on next use: migrations create and drop the table."""
+    _available.pop(using, None)
+
+
+def create_index(connection):
+    """Create the FTS table. Returns False when the SQLite build has no FTS5."""
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(CREATE_SQL)
+        except Exception:  # sqlite3.OperationalError: no such module: fts5
+            return False
+    _available.pop(connection.alias, None)
+    return True
+
+
+def drop_index(connection):
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(DROP_SQL)
+    _available.pop(connection.alias, None)
+
+
+def split_text(text):
+    """Chunks of about CHUNK_SIZE characters, broken between lines or, failing that, words."""
+    chunks, current = [], ''
+    for line in _WHITESPACE_RE.sub(' ', text).split('\n'):
+        line = line.strip()
+        while line:
+            if len(current) + len(line) < CHUNK_SIZE:
+                current = f'{current} {line}' if current else line
+                break
+            if current:
+                chunks.append(current)
+                current = ''
+                continue
+            cut = line.rfind(' ', 0, CHUNK_SIZE)  # A line longer than a chunk on its own
+            cut = cut if cut > 0 else CHUNK_SIZE
+            chunks.append(line[:cut])
+            line = line[cut:].strip()
+    if current:
+        chunks.append(current)
+    return chunks[:ROWID_STRIDE]
+
+
+def replace_chunks(syllabus_id, text, using=DEFAULT_DB_ALIAS):
+    """Store the text of a syllabus (replacing any earlier extraction) and index it if current."""
+    chunks = split_text(text)
+    with transaction.atomic(using=using):
+        SyllabusChunk.objects.using(using).filter(syllabus_id=syllabus_id).delete()
+        SyllabusChunk.objects.using(using).bulk_create([
+            SyllabusChunk(syllabus_id=syllabus_id, position=position, text=chunk)
+            for position, chunk in enumerate(chunks)
+        ])
+        if CurrentSyllabus.objects.using(using).filter(syllabus_id=syllabus_id).exists():
+            index_syllabi([syllabus_id], using=using)
+    return len(chunks)
+
+
+def unindex_syllabi(ids, using=DEFAULT_DB_ALIAS):
+    ids = list(ids)
+    if not ids or not is_available(using):
+        return
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.executemany(DELETE_SQL, [(pk * ROWID_STRIDE, (pk + 1) * ROWID_STRIDE) for pk in ids])
+
+
+def index_syllabi(ids, using=DEFAULT_DB_ALIAS):
+    """(Re-)index the stored chunks of these syllabi."""
+    ids = list(ids)
+    if not ids or not is_available(using):
+        return
+    rows = (SyllabusChunk.objects.using(using).filter(syllabus_id__in=ids)
+            .values_list('syllabus_id', 'position', 'text'))
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.executemany(DELETE_SQL, [(pk * ROWID_STRIDE, (pk + 1) * ROWID_STRIDE) for pk in ids])
+        cursor.executemany(INSERT_SQL, [(pk * ROWID_STRIDE + position, text) for pk, position, text in rows])
+
+
+def rebuild_index(using=DEFAULT_DB_ALIAS, batch_size=5000):
+    """Index the chunks of every current syllabus from scratch. Returns the number of chunks."""
+    if not is_available(using):
+        return 0
+    total = 0
+    rows = (SyllabusChunk.objects.using(using).filter(syllabus__current_for__isnull=False)
+            .values_list('syllabus_id', 'position', 'text'))
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        batch = []
+        for pk, position, text in rows.iterator(chunk_size=batch_size):
+            batch.append((pk * ROWID_STRIDE + position, text))
+            if len(batch) >= batch_size:
+                cursor.executemany(INSERT_SQL, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(INSERT_SQL, batch)
+            total += len(batch)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return total
+
+
+def highlight(snippet):
+    """HTML-escape a snippet and wrap the matched terms in <mark>."""
+    return html.escape(snippet).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def search(terms, using=DEFAULT_DB_ALIAS, limit=20):
+    """
+    Current syllabi whose text matches every term, best first, as
+    (syllabus_id, rank, [highlighted snippets]). Lower ranks are better.
+    """
+    query = build_match_query(terms)
+    if query is None:
+        return []
+    if not is_available(using):
+        return fallback_search(terms, using, limit)
+    sql = (f"SELECT rowid, bm25({FTS_TABLE}), "
+           f"snippet({FTS_TABLE}, 0, %s, %s, '…', {SNIPPET_TOKENS}) "
+           f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY bm25({FTS_TABLE}) LIMIT {MAX_MATCHES}")
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, [MARK_START, MARK_END, query])
+        rows = cursor.fetchall()
+    results = {}  # syllabus id -> (rank, snippets), in rank order of each syllabus's best chunk
+    for rowid, rank, snippet in rows:
+        syllabus_id = rowid // ROWID_STRIDE
+        if syllabus_id not in results:
+            if len(results) == limit:
+                continue
+            results[syllabus_id] = (rank, [])
+        snippets = results[syllabus_id][1]
+        if len(snippets) < SNIPPETS_PER_SYLLABUS:
+            snippets.append(highlight(snippet))
+    return [(syllabus_id, rank, snippets) for syllabus_id, (rank, snippets) in results.items()]
+
+
+def fallback_search(terms, using, limit):
+    """Unindexed: chunks containing every word, in syllabus order, with a plain text window."""
+    tokens = [token for term in terms for token in _TOKEN_RE.findall(term)]
+    chunks = SyllabusChunk.objects.using(using).filter(syllabus__current_for__isnull=False)
+    for token in tokens:
+        chunks = chunks.filter(text__icontains=token)
+    results = {}
+    for syllabus_id, text in chunks.order_by('syllabus_id', 'position').values_list('syllabus_id', 'text')[:MAX_MATCHES]:
+        if syllabus_id not in results:
+            if len(results) == limit:
+                break
+            results[syllabus_id] = []
+        if len(results[syllabus_id]) < SNIPPETS_PER_SYLLABUS:
+            start = max(text.lower().find(tokens[0].lower()) - 80, 0)
+            window = text[start:start + 200]
+            for token in tokens:
+                window = re.sub(f'({re.escape(token)})', f'{MARK_START}\\1{MARK_END}', window, flags=re.I)
+            results[syllabus_id].append(highlight(('…' if start else '') + window))
+    return [(syllabus_id, 0.0, snippets) for syllabus_id, snippets in results.items()]
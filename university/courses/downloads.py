@@ -0,0 +1,146 @@
+import json
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+from rest_framework.renderers import BaseRenderer
+
+"""
+Syllabus file delivery - static(MEDIA_URL) is Django's development file server. It only
+runs with DEBUG on, reads whole files through a worker and has no Range, ETag or
+conditional support. serve_file() streams a stored file in fixed-size chunks. It answers
+If-None-Match / If-Modified-Since with 304 and a single `Range: bytes=` request (with
+If-Range) with 206.
+
+With SYLLABUS_DOWNLOAD_OFFLOAD set, Django only checks the request and sets headers. The
+front web server sends the bytes and handles ranges itself:
+    'x-accel-redirect' - nginx, the file is served from an `internal` location at
+                         SYLLABUS_DOWNLOAD_ACCEL_PREFIX (default '/protected-media/'),
+                         which should alias MEDIA_ROOT
+    'x-sendfile'       - Apache mod_xsendfile / lighttpd, given the absolute path
+"""
+
+CHUNK_SIZE = 64 * 1024
+OFFLOAD = getattr(settings, 'SYLLABUS_DOWNLOAD_OFFLOAD', None)
+ACCEL_PREFIX = getattr(settings, 'SYLLABUS_DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileDownloadRenderer(BaseRenderer):
+    """
+    Lets content negotiation accept whatever a PDF viewer asks for (e.g. Accept: application/pdf).
+    Only error payloads ever reach render(); file bodies are returned as plain Django responses.
+    """
+    media_type = '*/*'
+    format = 'download'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data).encode('utf-8')
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) inclusive for a single satisfiable byte range, None when the header
+    should be ignored (absent, multi-range or malformed), or False when it is unsatisfiable.
+    """
+    match = _RANGE_RE.match(header.replace(' ', '')) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _stream(fileobj, start, length):
+    try:
+        fileobj.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fileobj.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def serve_file(request, fieldfile, content_type='application/pdf', offload=OFFLOAD):
+    """Build the response delivering `fieldfile` (a FieldFile) to `request` (a Django HttpRequest)."""
+    storage, name = fieldfile.storage, fieldfile.name
+    try:
+        size = storage.size(name)
+        last_modified = int(storage.get_modified_time(name).timestamp())
+    except OSError:  # FileNotFoundError included: the row outlived its file
+        raise Http404('The file is missing from storage.')
+    etag = quote_etag(f'{size:x}-{last_modified:x}')
+    filename = os.path.basename(name)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    def finish(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Accept-Ranges'] = 'bytes'
+        response['Cache-Control'] = 'no-cache'  # Always revalidate; the ETag makes that cheap
+        response['Content-Disposition'] = content_disposition_header(False, filename)  # Quoted, or RFC 5987
+        return response
+
+    if offload == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        # nginx decodes the URI before matching the location, so spaces and non-ASCII survive
+        response['X-Accel-Redirect'] = ACCEL_PREFIX.rstrip('/') + '/' + quote(name.lstrip('/'))
+        return finish(response)
+    if offload == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = storage.path(name)
+        return finish(response)
+
+    byte_range = parse_range(request.META.get('HTTP_RANGE', ''), size)
+    if byte_range is not None and not _if_range_passes(request, etag, last_modified):
+        byte_range = None  # The client's partial copy is stale: send the whole file
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return finish(response)
+    if byte_range is None:
+        # FileResponse streams in chunks and lets the server use wsgi.file_wrapper (sendfile)
+        response = FileResponse(storage.open(name, 'rb'), content_type=content_type)
+        return finish(response)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(_stream(storage.open(name, 'rb'), start, length),
+                                     status=206, content_type=content_type)
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return finish(response)
+
+
+def _if_range_passes(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag  # Strong comparison only
+    date = parse_http_date_safe(if_range)
+    return date == last_modified  # An exact match, as RFC 9110 requires of a date validator
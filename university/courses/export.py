@@ -0,0 +1,105 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+"""
+Streaming exports - the admin's ImportExportModelAdmin builds the whole dataset in memory
+before responding. export_response() instead walks a values_list() queryset with
+.iterator(chunk_size=...) and writes rows out as they are fetched, so memory stays flat no
+matter how many rows there are. The format is picked by normal DRF content negotiation
+(?format=csv|ndjson|json or the Accept header) through the renderers below. They exist only
+for negotiation and for rendering error payloads; row data never goes through render().
+"""
+
+CHUNK_SIZE = 2000  # Rows fetched per database round trip
+ROWS_PER_WRITE = 500  # Rows joined into each chunk handed to the server
+
+COURSE_EXPORT_FIELDS = (
+    'id', 'COURSE_CODE', 'COURSE_NAME', 'CATEGORY', 'COURSE_CATEGORY', 'TYPE', 'CREDIT_SCHEME',
+    'CBCS_CATEGORY', 'DISCIPLINE', 'DISCIPLINE__name', 'DISCIPLINE__faculty', 'MAXIMUM_CREDIT',
+    'QUALIFYING_IN_NATURE',
+)
+SYLLABUS_EXPORT_FIELDS = (
+    'id', 'course', 'course__COURSE_CODE', 'version', 'is_active', 'syllabus_file',
+    'uploaded_by__email', 'uploaded_at', 'description',
+)
+
+
+class _ExportRenderer(BaseRenderer):
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b'' if data is None else json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+class CSVExportRenderer(_ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONExportRenderer(_ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class _LineBuffer:
+    """csv.writer target that hands back each formatted line instead of storing it."""
+    def write(self, value):
+        return value
+
+
+def _csv_chunks(fields, rows):
+    writer = csv.writer(_LineBuffer())
+    lines = [writer.writerow(fields)]
+    for row in rows:
+        lines.append(writer.writerow(row))
+        if len(lines) >= ROWS_PER_WRITE:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def _ndjson_chunks(fields, rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+        if len(lines) >= ROWS_PER_WRITE:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def _json_chunks(fields, rows):
+    # A JSON array written incrementally: '[' row ',' row ... ']'
+    separator = '['
+    lines = []
+    for row in rows:
+        lines.append(separator + json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder, ensure_ascii=False))
+        separator = ','
+        if len(lines) >= ROWS_PER_WRITE:
+            yield ''.join(lines)
+            lines = []
+    lines.append('[]' if separator == '[' else ']')
+    yield ''.join(lines)
+
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', _csv_chunks),
+    'ndjson': ('application/x-ndjson; charset=utf-8', _ndjson_chunks),
+    'json': ('application/json; charset=utf-8', _json_chunks),
+}
+
+
+def export_response(queryset, fields, export_format, filename):
+    """Stream `fields` of every row in `queryset` as csv, ndjson or json."""
+    content_type, chunks = FORMATS[export_format]
+    if not queryset.ordered:
+        queryset = queryset.order_by('pk')
+    rows = queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+    response = StreamingHttpResponse(chunks(fields, rows), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
@@ -0,0 +1,78 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from academic.models import Department
+from .models import Course
+from . import versions
+
+"""
+Facet counts for the course catalog sidebar. All facets come from one aggregate pass:
+GROUP BY over every facet column at once. The (usually small) set of combinations is then
+folded into per-facet counts in Python. That replaces one COUNT query per facet. Results
+are cached per normalized filter. The cache key embeds the Course and Department change
+counters (courses/versions.py), so after a write stale entries are simply never read again.
+"""
+
+CHOICE_FACETS = {
+    'CATEGORY': Course.CATEGORY_CHOICES,
+    'COURSE_CATEGORY': Course.COURSE_CATEGORY_CHOICES,
+    'TYPE': Course.TYPE_CHOICES,
+    'CREDIT_SCHEME': Course.CREDIT_SCHEME_CHOICES,
+    'CBCS_CATEGORY': Course.CBCS_CATEGORY_CHOICES,
+    'QUALIFYING_IN_NATURE': Course.QUALIFYING_CHOICES,
+}
+FACET_FIELDS = [*CHOICE_FACETS, 'DISCIPLINE']
+
+# Query parameters that page through results without changing what is counted
+IGNORED_PARAMS = {'page', 'limit', 'cursor', 'pagination', 'format'}
+
+CACHE_TIMEOUT = getattr(settings, 'COURSE_FACETS_CACHE_TIMEOUT', 3600)
+
+
+def normalized_query(query_params):
+    """Canonical form of the filter/search parameters: sorted keys, sorted values, no empties."""
+    parts = []
+    for key in sorted(query_params):
+        if key in IGNORED_PARAMS:
+            continue
+        values = sorted(value.strip() for value in query_params.getlist(key) if value.strip())
+        if values:
+            parts.append(f'{key}={",".join(values)}')
+    return '&'.join(parts)
+
+
+def cache_key(query_params):
+    generation = versions.fingerprint([Course, Department])
+    digest = hashlib.sha1(f'{generation}|{normalized_query(query_params)}'.encode('utf-8')).hexdigest()
+    return f'course-facets:{digest}'
+
+
+def compute_facets(queryset):
+    """Per-value counts for every facet over `queryset`, in one GROUP BY query."""
+    counts = {field: {} for field in FACET_FIELDS}
+    total = 0
+    for row in queryset.order_by().values(*FACET_FIELDS).annotate(n=Count('pk')):
+        total += row['n']
+        for field in FACET_FIELDS:
+            counts[field][row[field]] = counts[field].get(row[field], 0) + row['n']
+
+    facets = {
+        field: [{'value': value, 'label': label, 'count': counts[field].get(value, 0)} for value, label in choices]
+        for field, choices in CHOICE_FACETS.items()
+    }
+    departments = Department.objects.filter(pk__in=list(counts['DISCIPLINE'])).order_by('name')
+    facets['DISCIPLINE'] = [
+        {'value': department.pk, 'label': str(department), 'count': counts['DISCIPLINE'][department.pk]}
+        for department in departments
+    ]
+    return {'count': total, 'facets': facets}
+
+
+def get_facets(queryset, query_params):
+    key = cache_key(query_params)
+    result = cache.get(key)
+    if result is None:
+        result = compute_facets(queryset)
+        cache.set(key, result, timeout=CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,31 @@
+import django_filters
+from .models import Course
+
+"""
+Course list filters. Every choice field takes an exact value or a comma-separated `__in` list,
+e.g. ?TYPE=THEORY or ?CBCS_CATEGORY__in=MAJOR,MINOR. Credits filter by range with
+?MAXIMUM_CREDIT__gte=2&MAXIMUM_CREDIT__lte=4. DISCIPLINE takes department ids and is
+declared as a plain number filter, so validating it never costs a query. The common
+combinations are backed by the composite indexes on Course (see Course.Meta.indexes and
+the query-plan checks in courses/tests.py).
+"""
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
+class CourseFilter(django_filters.FilterSet):
+    DISCIPLINE = django_filters.NumberFilter()
+    DISCIPLINE__in = NumberInFilter(field_name='DISCIPLINE', lookup_expr='in')
+
+    class Meta:
+        model = Course
+        fields = {
+            'CATEGORY': ['exact', 'in'],
+            'COURSE_CATEGORY': ['exact', 'in'],
+            'TYPE': ['exact', 'in'],
+            'CREDIT_SCHEME': ['exact', 'in'],
+            'CBCS_CATEGORY': ['exact', 'in'],
+            'QUALIFYING_IN_NATURE': ['exact', 'in'],
+            'MAXIMUM_CREDIT': ['exact', 'gte', 'lte'],
+        }
@@ -0,0 +1,286 @@
+import json
+import platform
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.urls import URLResolver, get_resolver, resolve
+from account.models import RevokedToken
+from academic.models import Department
+from courses.models import Course, Syllabus, SyllabusChunk, CurrentSyllabus
+from courses import catalog
+
+"""
+In-process load benchmark for the API. Every scenario is one request against a route in
+university/urls.py, sent through django.test.Client against the configured database. Seed
+it first with seed_catalog. A scenario is sent `--warmup` times (the last of these records
+the query count), then `--iterations` times back to back while each request is timed.
+The report gives throughput, p50/p95/p99 latency and query counts. It is written as JSON;
+--compare prints the change against an earlier report. Routes with no scenario, i.e. the
+ones that only create or destroy state, are listed so new endpoints don't go unmeasured.
+
+Scenarios only read or rewrite existing rows with their current values, except logout,
+which records the tokens it revokes. Those RevokedToken rows (the benchmark user's, revoked
+during the run) are deleted when the run ends. Running the benchmark leaves the data as it
+was, so consecutive runs measure the same thing.
+"""
+
+User = get_user_model()
+
+SKIPPED_ROUTE_PREFIXES = ('admin/', 'media/')
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def join_route(prefix, route):
+    return prefix + (route[1:] if route.startswith('^') else route)  # As ResolverMatch.route joins them
+
+
+def iter_routes(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, join_route(prefix, str(pattern.pattern)))
+        else:
+            yield join_route(prefix, str(pattern.pattern))
+
+
+def is_format_suffix(route):
+    return '(?P<format>' in route or '<drf_format_suffix:format>' in route
+
+
+class QueryCounter:
+    """connection.execute_wrapper() that counts statements (CaptureQueriesContext is reset by each request)."""
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = "Benchmark every API route in-process and save throughput, latency and query counts as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per scenario.')
+        parser.add_argument('--only', help='Run only scenarios whose name contains this text.')
+        parser.add_argument('--email', default='user000000@seed.example.com', help='User to log in as.')
+        parser.add_argument('--password', default='seed-password')
+        parser.add_argument('--output', default='benchmark-results.json', help='Where to write the JSON report.')
+        parser.add_argument('--compare', help='Earlier JSON report to compare against.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()  # Lets the test client use the 'testserver' host
+        self.client = Client()
+        user = self.login(options['email'], options['password'])
+        scenarios = self.scenarios(user)
+        covered = {resolve(scenario['path'].split('?')[0]).route for scenario in scenarios}
+        if options['only']:
+            scenarios = [scenario for scenario in scenarios if options['only'] in scenario['name']]
+
+        results = {}
+        started = datetime.now(timezone.utc)
+        try:
+            for scenario in scenarios:
+                results[scenario['name']] = self.run(scenario, options['warmup'], options['iterations'])
+                self.report_line(scenario['name'], results[scenario['name']])
+        finally:
+            RevokedToken.objects.filter(user=user, revoked_at__gte=started).delete()  # Left by the logout scenario
+
+        uncovered = sorted(
+            route for route in set(iter_routes(get_resolver().url_patterns))
+            if route not in covered and not route.startswith(SKIPPED_ROUTE_PREFIXES) and not is_format_suffix(route)
+        )
+        report = {
+            'meta': self.meta(options),
+            'results': results,
+            'uncovered_routes': uncovered,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+        if uncovered:
+            self.stdout.write(f"Routes without a scenario: {', '.join(uncovered)}")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def login(self, email, password):
+        response = self.client.post('/api/auth/jwt/create/', {'email': email, 'password': password})
+        if response.status_code != 200:
+            raise CommandError(f"Could not log in as {email} ({response.status_code}); run seed_catalog first.")
+        self.password = password
+        return User.objects.get(email=email)
+
+    def scenarios(self, user):
+        course = Course.objects.select_related('DISCIPLINE').order_by('pk').first()
+        current = CurrentSyllabus.objects.order_by('pk').first()
+        if course is None or current is None:
+            raise CommandError("Nothing to benchmark against; run seed_catalog first.")
+        syllabus = Syllabus.objects.get(pk=current.syllabus_id)
+        department = course.DISCIPLINE
+        course_ids = ','.join(str(pk) for pk in Course.objects.order_by('pk').values_list('pk', flat=True)[:50])
+        bulk_rows = ''.join(
+            json.dumps(row) + '\n' for row in Course.objects.filter(DISCIPLINE=department).order_by('pk').values(
+                'COURSE_CODE', 'COURSE_NAME', 'CATEGORY', 'COURSE_CATEGORY', 'TYPE', 'CREDIT_SCHEME',
+                'CBCS_CATEGORY', 'DISCIPLINE', 'MAXIMUM_CREDIT', 'QUALIFYING_IN_NATURE')[:100]
+        )
+        version, _ = catalog.get_bundle()
+        search_term = course.COURSE_NAME.split()[-1][:4]
+        chunk = SyllabusChunk.objects.order_by('pk').values_list('text', flat=True).first()
+        content_term = chunk.split()[0] if chunk and chunk.split() else search_term
+        filters = f'DISCIPLINE={department.pk}&TYPE={course.TYPE}'
+
+        def get(name, path):
+            return {'name': name, 'method': 'get', 'path': path}
+
+        def post(name, path, data, content_type='application/json', login=None):
+            return {'name': name, 'method': 'post', 'path': path, 'data': data, 'content_type': content_type,
+                    'login': login}
+
+        def patch(name, path, data):
+            return {'name': name, 'method': 'patch', 'path': path, 'data': data, 'content_type': 'application/json'}
+
+        refresh = {'refresh': self.client.cookies['refreshToken'].value}
+        return [
+            get('auth-root', '/api/auth/'),
+            get('users-list', '/api/auth/users/'),
+            get('users-me', '/api/auth/users/me/'),
+            get('users-detail', f'/api/auth/users/{user.pk}/'),
+            post('jwt-create', '/api/auth/jwt/create/', {'email': user.email, 'password': self.password}),
+            post('jwt-refresh', '/api/auth/jwt/refresh/', {}),
+            post('jwt-verify', '/api/auth/jwt/verify/', {'token': self.client.cookies['accessToken'].value}),
+            post('logout', '/api/auth/logout/', {}, login={'email': user.email, 'password': self.password}),
+            post('simplejwt-create', '/api/auth/jwt/create', {'email': user.email, 'password': self.password}),
+            post('simplejwt-refresh', '/api/auth/jwt/refresh', refresh),
+            get('academic-root', '/api/academic/'),
+            get('departments-list', '/api/academic/departments/'),
+            get('departments-detail', f'/api/academic/departments/{department.pk}/'),
+            patch('departments-update', f'/api/academic/departments/{department.pk}/', {'name': department.name}),
+            get('faculty-choices', '/api/academic/faculty-choices/'),
+            get('courses-root', '/api/courses/'),
+            get('courses-list', '/api/courses/courses/'),
+            get('courses-list-page-50', '/api/courses/courses/?page=50'),
+            get('courses-list-filtered', f'/api/courses/courses/?{filters}'),
+            get('courses-list-search', f'/api/courses/courses/?search={search_term}'),
+            get('courses-list-cursor', '/api/courses/courses/?pagination=cursor'),
+            get('courses-list-fields', '/api/courses/courses/?fields=id,COURSE_CODE,COURSE_NAME'),
+            get('courses-detail', f'/api/courses/courses/{course.pk}/'),
+            get('courses-detail-expanded', f'/api/courses/courses/{course.pk}/?expand=discipline,syllabi'),
+            patch('courses-update', f'/api/courses/courses/{course.pk}/', {'COURSE_NAME': course.COURSE_NAME}),
+            get('courses-facets', '/api/courses/courses/facets/'),
+            get('courses-facets-filtered', f'/api/courses/courses/facets/?{filters}'),
+            get('courses-autocomplete', f'/api/courses/courses/autocomplete/?q={search_term}'),
+            get('courses-autocomplete-code', f'/api/courses/courses/autocomplete/?q={course.COURSE_CODE[:3]}'),
+            get('courses-export-csv', f'/api/courses/courses/export/?format=csv&{filters}'),
+            post('courses-bulk', '/api/courses/courses/bulk/', bulk_rows, 'application/x-ndjson'),
+            get('choices', '/api/courses/choices/'),
+            get('catalog', '/api/courses/catalog/'),
+            get('catalog-bundle', f'/api/courses/catalog/{version}/'),
+            get('syllabi-list', '/api/courses/syllabi/'),
+            get('syllabi-by-course', f'/api/courses/syllabi/?course={syllabus.course_id}'),
+            get('syllabi-current', f'/api/courses/syllabi/current/?courses={course_ids}'),
+            get('syllabi-detail', f'/api/courses/syllabi/{syllabus.pk}/'),
+            get('syllabi-download', f'/api/courses/syllabi/{syllabus.pk}/download/'),
+            get('syllabi-export-ndjson', f'/api/courses/syllabi/export/?format=ndjson&course={syllabus.course_id}'),
+            get('syllabi-content-search', f'/api/courses/syllabi/content-search/?q={quote(content_term)}'),
+            get('rollups-departments', '/api/academic/rollups/departments/'),
+            get('rollups-department', f'/api/academic/rollups/departments/{department.pk}/'),
+            get('rollups-faculties', '/api/academic/rollups/faculties/'),
+            get('rollups-faculty', f"/api/academic/rollups/faculties/{quote(department.faculty, safe='')}/"),
+            get('metrics', '/metrics'),
+        ]
+
+    def client_for(self, scenario):
+        if scenario.get('login') is None:
+            return self.client
+        # Logout revokes the tokens it was sent with; each request gets its own login (untimed)
+        client = Client()
+        client.post('/api/auth/jwt/create/', scenario['login'], content_type='application/json')
+        return client
+
+    def send(self, scenario, client):
+        method = getattr(client, scenario['method'])
+        if scenario['method'] == 'get':
+            response = method(scenario['path'])
+        else:
+            response = method(scenario['path'], scenario['data'], content_type=scenario['content_type'])
+        if response.streaming:
+            b''.join(response.streaming_content)  # Time the whole body, not just the first chunk
+        response.close()
+        return response.status_code
+
+    def run(self, scenario, warmup, iterations):
+        for _ in range(max(warmup, 1)):
+            queries = QueryCounter()  # Kept from the last warm-up request, once caches are filled
+            client = self.client_for(scenario)
+            with connection.execute_wrapper(queries):
+                status = self.send(scenario, client)
+            if status >= 400:
+                raise CommandError(f"{scenario['name']}: {scenario['method'].upper()} {scenario['path']} returned {status}")
+
+        timings = []
+        for _ in range(iterations):
+            client = self.client_for(scenario)
+            request_started = time.perf_counter()
+            self.send(scenario, client)
+            timings.append((time.perf_counter() - request_started) * 1000)
+        elapsed = sum(timings) / 1000
+        timings.sort()
+        return {
+            'method': scenario['method'].upper(),
+            'path': scenario['path'] if len(scenario['path']) <= 200 else scenario['path'][:200] + '...',
+            'status': status,
+            'queries': queries.count,
+            'requests': iterations,
+            'throughput_rps': round(iterations / elapsed, 1) if elapsed else None,
+            'mean_ms': round(sum(timings) / len(timings), 3) if timings else None,
+            'p50_ms': round(percentile(timings, 50), 3) if timings else None,
+            'p95_ms': round(percentile(timings, 95), 3) if timings else None,
+            'p99_ms': round(percentile(timings, 99), 3) if timings else None,
+        }
+
+    def report_line(self, name, result):
+        self.stdout.write(
+            f"{name:<28} {result['throughput_rps'] or 0:>9.1f} req/s  p50 {result['p50_ms'] or 0:>8.2f} ms  "
+            f"p95 {result['p95_ms'] or 0:>8.2f} ms  p99 {result['p99_ms'] or 0:>8.2f} ms  {result['queries']:>3} queries"
+        )
+
+    def meta(self, options):
+        return {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'warmup': options['warmup'],
+            'rows': {
+                'departments': Department.objects.count(),
+                'courses': Course.objects.count(),
+                'syllabi': Syllabus.objects.count(),
+                'users': User.objects.count(),
+            },
+        }
+
+    def compare(self, path, results):
+        with open(path) as f:
+            previous = json.load(f)['results']
+        self.stdout.write(f"\n{'scenario':<28} {'p50 before':>11} {'p50 after':>10} {'change':>8} {'queries':>9}")
+        for name, result in results.items():
+            before = previous.get(name)
+            if not before or not before['p50_ms'] or not result['p50_ms']:
+                continue
+            change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+            self.stdout.write(
+                f"{name:<28} {before['p50_ms']:>11.2f} {result['p50_ms']:>10.2f} {change:>+7.1f}% "
+                f"{before['queries']:>4}->{result['queries']:<4}"
+            )
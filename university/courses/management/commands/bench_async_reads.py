@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment
+from academic.models import Department
+from courses.models import Course
+
+"""
+Compares the catalog read endpoints served by the sync DRF views (WSGI) with the async read
+path (ASGI, settings.ASYNC_READ_VIEWS). Each mode runs in its own subprocess because the
+async routes are mounted at import time. Requests go through Django's in-process test
+clients against the configured database. WSGI uses a thread pool with a Client per thread,
+as each worker thread of a server handles its own requests; ASGI uses one event loop with N
+concurrent tasks. Seed data first with seed_catalog.
+"""
+
+
+class Command(BaseCommand):
+    help = "Benchmark catalog reads through the WSGI (sync DRF) and ASGI (async views) paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per path.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Threads (WSGI) or tasks (ASGI).')
+        parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable).')
+        parser.add_argument('--mode', choices=['wsgi', 'asgi'], help='Run one mode in this process and print JSON.')
+
+    def handle(self, *args, **options):
+        if options['mode']:
+            self.stdout.write(json.dumps(self.run_mode(options)))
+            return
+        results = {mode: self.spawn(mode, options) for mode in ('wsgi', 'asgi')}
+        self.stdout.write(f"{'path':<50} {'wsgi req/s':>12} {'asgi req/s':>12}")
+        for path in results['wsgi']:
+            self.stdout.write(f"{path:<50} {results['wsgi'][path]:>12.1f} {results['asgi'][path]:>12.1f}")
+
+    def spawn(self, mode, options):
+        command = [sys.executable, '-m', 'django', 'bench_async_reads', '--mode', mode,
+                   '--requests', str(options['requests']), '--concurrency', str(options['concurrency'])]
+        for path in options['paths'] or []:
+            command += ['--path', path]
+        env = dict(os.environ, UNIVERSITY_ASYNC_READS='1' if mode == 'asgi' else '0')
+        done = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if done.returncode:
+            raise CommandError(f"{mode} run failed:\n{done.stderr}")
+        return json.loads(done.stdout)
+
+    def default_paths(self):
+        course = Course.objects.order_by('pk').values_list('pk', 'DISCIPLINE_id').first()
+        if course is None:
+            raise CommandError("No courses to read; run seed_catalog first.")
+        department = Department.objects.order_by('pk').values_list('pk', flat=True).first()
+        return [
+            '/api/courses/courses/',
+            f'/api/courses/courses/?DISCIPLINE={course[1]}&page=2',
+            f'/api/courses/courses/{course[0]}/',
+            '/api/courses/syllabi/',
+            '/api/academic/departments/',
+            f'/api/academic/departments/{department}/',
+        ]
+
+    def run_mode(self, options):
+        if settings.ASYNC_READ_VIEWS != (options['mode'] == 'asgi'):
+            raise CommandError("Run without --mode; the parent process sets UNIVERSITY_ASYNC_READS.")
+        setup_test_environment()  # Lets the test clients use the 'testserver' host
+        paths = options['paths'] or self.default_paths()
+        run = self.run_wsgi if options['mode'] == 'wsgi' else self.run_asgi
+        return {path: run(path, options['requests'], options['concurrency']) for path in paths}
+
+    def run_wsgi(self, path, requests, concurrency):
+        Client().get(path)  # Warm up (URLconf, FTS probe, connection)
+        local = threading.local()
+
+        def one(_):
+            if not hasattr(local, 'client'):  # Clients keep cookies and are not safe to share
+                local.client = Client()
+            return local.client.get(path).status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            statuses = list(pool.map(one, range(requests)))
+        return self.throughput(path, statuses, started)
+
+    def run_asgi(self, path, requests, concurrency):
+        async def bench():
+            client = AsyncClient()
+            await client.get(path)
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one():
+                async with semaphore:
+                    return (await client.get(path)).status_code
+
+            started = time.perf_counter()
+            statuses = await asyncio.gather(*(one() for _ in range(requests)))
+            return self.throughput(path, statuses, started)
+        return asyncio.run(bench())
+
+    def throughput(self, path, statuses, started):
+        elapsed = time.perf_counter() - started
+        if any(status != 200 for status in statuses):
+            raise CommandError(f"{path} returned {sorted(set(statuses))}")
+        return len(statuses) / elapsed
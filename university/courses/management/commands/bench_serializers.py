@@ -0,0 +1,59 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from academic.serializers import DepartmentSerializer
+from academic.models import Department
+from courses.models import Course, Syllabus
+from courses.serializers import CourseSerializer, SyllabusSerializer
+from courses.views import SyllabusViewSet
+from university.fastlist import FastJSONRenderer, rows_to_dicts, value_columns
+
+"""
+Micro-benchmark of one list page: ModelSerializer(many=True) + JSONRenderer against the
+.values() fast path + FastJSONRenderer (university/fastlist.py), on the configured
+database. Both sides include the query. The two outputs are compared byte for byte before
+anything is timed.
+"""
+
+
+class Command(BaseCommand):
+    help = "Compare serializer and .values() rendering of a list page for courses, syllabi and departments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Rows per page.')
+        parser.add_argument('--repeat', type=int, default=200, help='Timed renders per case.')
+
+    def handle(self, *args, **options):
+        request = Request(RequestFactory().get('/', SERVER_NAME='localhost'))  # Absolute file URLs need a valid host
+        rows, repeat = options['rows'], options['repeat']
+        cases = [
+            ('courses', Course.objects.order_by('pk'), CourseSerializer, {}),
+            ('syllabi', Syllabus.objects.select_related('course', 'uploaded_by').order_by('pk'), SyllabusSerializer,
+             SyllabusViewSet.fast_list_overrides),
+            ('departments', Department.objects.order_by('pk'), DepartmentSerializer, {}),
+        ]
+        self.stdout.write(f"{'case':<12} {'serializer ms':>14} {'fast path ms':>13} {'speedup':>8}")
+        for name, queryset, serializer_class, overrides in cases:
+            page = queryset[:rows]
+            serializer = serializer_class(context={'request': request})
+            columns = value_columns(serializer, overrides)
+
+            def slow():
+                return JSONRenderer().render(serializer_class(list(page), many=True, context={'request': request}).data)
+
+            def fast():
+                values = page.values(*[column.lookup for column in columns])
+                return FastJSONRenderer().render(rows_to_dicts(values, columns))
+
+            if slow() != fast():
+                raise CommandError(f"{name}: the fast path output differs from the serializer's")
+            slow_ms, fast_ms = self.time(slow, repeat), self.time(fast, repeat)
+            self.stdout.write(f"{name:<12} {slow_ms:>14.3f} {fast_ms:>13.3f} {slow_ms / fast_ms:>7.1f}x")
+
+    def time(self, render, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            render()
+        return (time.perf_counter() - started) / repeat * 1000
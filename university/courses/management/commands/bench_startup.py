@@ -0,0 +1,120 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+"""
+Cold start of a worker, per settings profile (university.settings, university.settings_api)
+and entry point. Every run is a fresh interpreter. That child reports two times: importing
+the entry point (Django setup, apps, models, middleware) and handling the first request.
+The first request also loads the URLconf and with it every view module. For manage.py the
+"request" is a `check`. The parent adds the process's wall time, interpreter start and exit
+included. Columns are medians over --runs. The last columns show how many modules were
+loaded, whether any app's admin.py ran (autodiscovery) and whether import_export was loaded.
+django.contrib.admin itself is always imported: DRF's schema generator pulls it in.
+"""
+
+# Child scripts; they print one JSON line. The path to request is argv[1].
+SETUP = '''
+import io, json, sys, time
+started = time.perf_counter()
+path = sys.argv[1]
+'''
+REPORT = '''
+print(json.dumps({
+    'import': imported - started, 'first_response': responded - imported, 'status': status,
+    'modules': len(sys.modules), 'admin': any(name.endswith('.admin') and not name.startswith('django.')
+                                              for name in sys.modules),
+    'import_export': 'import_export' in sys.modules,
+}))
+'''
+ENTRY_POINTS = {
+    'manage.py': '''
+import django
+django.setup()
+imported = time.perf_counter()
+from django.core.management import call_command
+call_command('check', stdout=io.StringIO())
+status = 0
+responded = time.perf_counter()
+''',
+    'wsgi': '''
+from university.wsgi import application
+imported = time.perf_counter()
+statuses = []
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SERVER_NAME': 'localhost',
+    'SERVER_PORT': '80', 'HTTP_HOST': 'localhost', 'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http',
+    'wsgi.errors': sys.stderr,
+}
+b''.join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+status = int(statuses[0].split()[0])
+responded = time.perf_counter()
+''',
+    'asgi': '''
+import asyncio
+from university.asgi import application
+imported = time.perf_counter()
+messages = []
+requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+async def receive():
+    if requests:
+        return requests.pop()
+    await asyncio.Event().wait()  # The client stays connected; Django cancels this once it has answered
+
+async def send(message):
+    messages.append(message)
+
+asyncio.run(application({
+    'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+    'path': path, 'raw_path': path.encode(), 'query_string': b'', 'headers': [(b'host', b'localhost')],
+    'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+}, receive, send))
+status = messages[0]['status']
+responded = time.perf_counter()
+''',
+}
+
+
+class Command(BaseCommand):
+    help = "Measure worker cold start (import and first response) per settings profile and entry point."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh processes per profile and entry point.')
+        parser.add_argument('--path', default='/api/academic/faculty-choices/', help='Path of the first request.')
+        parser.add_argument('--profile', action='append', dest='profiles',
+                            help='Settings module (repeatable; default: university.settings and university.settings_api).')
+
+    def handle(self, *args, **options):
+        profiles = options['profiles'] or ['university.settings', 'university.settings_api']
+        self.stdout.write(f"{'profile':<24} {'entry':<10} {'process ms':>11} {'import ms':>10} {'first resp ms':>14} "
+                          f"{'modules':>8}  admin.py  import_export")
+        for profile in profiles:
+            for entry in ENTRY_POINTS:
+                runs = [self.run_once(profile, entry, options['path']) for _ in range(max(options['runs'], 1))]
+                median = lambda key: statistics.median(run[key] for run in runs) * 1000
+                last = runs[-1]
+                self.stdout.write(
+                    f"{profile:<24} {entry:<10} {median('process'):>11.1f} {median('import'):>10.1f} "
+                    f"{median('first_response'):>14.1f} {last['modules']:>8}  {'yes' if last['admin'] else 'no':<8}  "
+                    f"{'yes' if last['import_export'] else 'no'}"
+                )
+
+    def run_once(self, profile, entry, path):
+        script = SETUP + ENTRY_POINTS[entry] + REPORT
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=profile)
+        started = time.perf_counter()
+        done = subprocess.run([sys.executable, '-c', script, path], cwd=settings.BASE_DIR, env=env,
+                              capture_output=True, text=True)
+        elapsed = time.perf_counter() - started
+        if done.returncode:
+            raise CommandError(f"{profile} {entry} failed:\n{done.stderr}")
+        result = json.loads(done.stdout.strip().splitlines()[-1])
+        if result['status'] >= 400:
+            raise CommandError(f"{profile} {entry}: the first request answered {result['status']}.")
+        return {**result, 'process': elapsed}
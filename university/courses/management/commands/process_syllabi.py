@@ -0,0 +1,77 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import django
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from courses import processing
+
+"""
+Worker for the syllabus post-processing queue (courses/processing.py). This process claims
+pending syllabi and hands them to a pool of --workers processes (one per core by default),
+keeping up to two jobs per pool process in flight. The pool processes are spawned rather
+than forked, so none of them inherits this process's database connections. Each one sets
+Django up and opens its own connections. Run several of these commands side by side, even on
+different hosts: claims never overlap. On Ctrl-C the jobs that have not finished go back to
+PENDING. If a pool process dies, its jobs are requeued and a fresh pool is started.
+"""
+
+
+class Command(BaseCommand):
+    help = "Process pending syllabi (checksum, page count) in a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Pool processes.')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between checks when idle.')
+        parser.add_argument('--once', action='store_true', help='Exit when nothing is pending instead of polling.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using, workers = options['database'], max(options['workers'], 1)
+        in_flight = {}  # future -> syllabus id
+        done = failed = 0
+        connections.close_all()
+        pool = self.start_pool(workers)
+        try:
+            while True:
+                processing.requeue_stalled(using)
+                try:
+                    if len(in_flight) < 2 * workers:
+                        for pk in processing.claim(2 * workers - len(in_flight), using):
+                            in_flight[pool.submit(processing.process, pk, using)] = pk
+                    if not in_flight:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+                    finished, _ = wait(in_flight, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        pk = in_flight.pop(future)
+                        try:
+                            status = future.result()
+                        except BrokenProcessPool:
+                            in_flight[future] = pk
+                            raise
+                        except Exception as e:
+                            processing.fail(pk, e, using)
+                            status = 'FAILED'
+                        done += status == 'DONE'
+                        failed += status == 'FAILED'
+                        if status == 'FAILED':
+                            self.stderr.write(f"Syllabus {pk} failed.")
+                except BrokenProcessPool:
+                    # A pool process died (e.g. killed for memory); the pool is unusable after that
+                    self.stderr.write(f"Worker pool crashed; requeueing {len(in_flight)} syllabi.")
+                    processing.release(list(in_flight.values()), using, count_attempt=True)
+                    in_flight.clear()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = self.start_pool(workers)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            processing.release(list(in_flight.values()), using)
+        self.stdout.write(self.style.SUCCESS(f"Processed {done} syllabi ({failed} failed)."))
+
+    def start_pool(self, workers):
+        return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup)
@@ -0,0 +1,23 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from courses.models import SyllabusUpload
+from courses import uploads
+
+
+class Command(BaseCommand):
+    help = "Delete chunked syllabus uploads (and their part files) that were abandoned."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=24, help='Hours since the last chunk.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['older_than'])
+        stale = SyllabusUpload.objects.filter(status='UPLOADING', updated_at__lt=cutoff)
+        count = 0
+        for upload in stale.iterator():
+            uploads.abort(upload)
+            count += 1
+        # Finished sessions only matter to a client polling for the result
+        finished, _ = SyllabusUpload.objects.filter(status='COMPLETE', updated_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Removed {count} abandoned and {finished} finished uploads."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from courses import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index used by ?search= on courses and syllabi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to rebuild.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows inserted per batch.')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not search.is_available(using):
+            raise CommandError(f"No course search index on '{using}' (requires SQLite with FTS5 and migrations applied).")
+        total = search.rebuild_index(using=using, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} courses."))
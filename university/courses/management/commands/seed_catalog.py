@@ -0,0 +1,174 @@
+import random
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Max
+from academic import rollups
+from academic.models import Department
+from courses.models import Course, Syllabus, CurrentSyllabus
+from courses import content, search, versions
+
+"""
+Seeds benchmark-sized data with bulk inserts: departments, courses, syllabi and users.
+Rows are generated from a seeded RNG, so the same options give the same data. bulk_create
+skips the model signals, so the search index, the CurrentSyllabus mapping and the department
+rollups are rebuilt at the end and the change counters bumped (courses/versions.py). Every
+syllabus points at one shared placeholder PDF in storage, which keeps the download endpoint
+servable.
+"""
+
+User = get_user_model()
+
+SUBJECTS = [
+    'Mathematics', 'Physics', 'Chemistry', 'Biology', 'Computer Science', 'Economics', 'History',
+    'Philosophy', 'Psychology', 'Sociology', 'Linguistics', 'Statistics', 'Geology', 'Astronomy',
+    'Biotechnology', 'Microbiology', 'Genetics', 'Ecology', 'Journalism', 'Media Studies',
+    'Fine Arts', 'Music', 'Architecture', 'Civil Engineering', 'Mechanical Engineering',
+    'Electrical Engineering', 'Electronics', 'Data Science', 'Management', 'Finance', 'Marketing',
+    'Accounting', 'Law', 'Political Science', 'Public Health', 'Pharmacy', 'Nursing',
+    'Environmental Science', 'Education', 'Geography',
+]
+QUALIFIERS = [
+    '', 'Applied', 'Computational', 'Theoretical', 'Experimental', 'Clinical', 'Industrial',
+    'Environmental', 'Quantitative', 'Comparative', 'Digital', 'Molecular',
+]
+COURSE_PATTERNS = [
+    'Introduction to {}', 'Foundations of {}', 'Advanced {}', 'Topics in {}', '{} Laboratory',
+    '{} Seminar', 'Research Methods in {}', '{} and Society', 'Special Problems in {}', '{} Project',
+]
+FIRST_NAMES = ['Aarav', 'Diya', 'Ishaan', 'Kavya', 'Rohan', 'Ananya', 'Vihaan', 'Meera', 'Arjun', 'Sara']
+LAST_NAMES = ['Sharma', 'Gupta', 'Iyer', 'Khan', 'Patel', 'Reddy', 'Singh', 'Das', 'Nair', 'Bose']
+
+PLACEHOLDER_PDF = 'syllabi/seed/placeholder.pdf'
+PLACEHOLDER_BODY = b'%PDF-1.4\n% Seeded placeholder syllabus\n%%EOF\n'
+
+
+def choice_values(choices):
+    return [value for value, _ in choices]
+
+
+class Command(BaseCommand):
+    help = "Seed departments, courses, syllabi and users in bulk for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=2000)
+        parser.add_argument('--courses', type=int, default=200000)
+        parser.add_argument('--syllabi', type=int, default=200000)
+        parser.add_argument('--users', type=int, default=5000)
+        parser.add_argument('--password', default='seed-password', help='Password of every seeded user.')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed gives the same data.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--clear', action='store_true', help='Delete existing catalog rows and seeded users first.')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        if options['clear']:
+            self.clear()
+
+        with transaction.atomic(using=self.using):  # One commit instead of one per batch
+            users = self.seed_users(options['users'], options['password'])
+            departments = self.seed_departments(options['departments'])
+            courses = self.seed_courses(options['courses'], departments)
+            syllabi = self.seed_syllabi(options['syllabi'], courses, users)
+
+        indexed = search.rebuild_index(using=self.using, batch_size=self.batch_size)
+        current = CurrentSyllabus.rebuild(using=self.using, batch_size=self.batch_size)
+        content.rebuild_index(using=self.using, batch_size=self.batch_size)  # Follows the rebuilt mapping
+        rollups.rebuild(using=self.using)
+        versions.bump(Department, Course, Syllabus, using=self.using)
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(users)} users, {len(departments)} departments, {len(courses)} courses and "
+            f"{syllabi} syllabi ({indexed} courses indexed, {current} current syllabi)."
+        ))
+
+    def clear(self):
+        with transaction.atomic(using=self.using):
+            Syllabus.objects.using(self.using).all().delete()
+            Course.objects.using(self.using).all().delete()
+            Department.objects.using(self.using).all().delete()
+            User.objects.using(self.using).filter(email__endswith='@seed.example.com').delete()
+
+    def bulk_create(self, model, objs):
+        # ignore_conflicts keeps re-runs going when rows from an earlier seed already exist
+        model.objects.using(self.using).bulk_create(objs, batch_size=self.batch_size, ignore_conflicts=True)
+
+    def seed_users(self, count, password):
+        hashed = make_password(password)  # Hashing once; per-user hashing would dominate the run
+        self.bulk_create(User, [
+            User(email=f'user{i:06d}@seed.example.com', first_name=self.rng.choice(FIRST_NAMES),
+                 last_name=self.rng.choice(LAST_NAMES), password=hashed)
+            for i in range(count)
+        ])
+        return list(User.objects.using(self.using).filter(email__endswith='@seed.example.com')
+                    .order_by('pk').values_list('pk', flat=True))
+
+    def seed_departments(self, count):
+        names = [f'{qualifier} {subject}'.strip() for qualifier in QUALIFIERS for subject in SUBJECTS]
+        faculties = choice_values(Department.FACULTY_CHOICES)
+        objs = []
+        for i in range(count):
+            name, round_ = names[i % len(names)], i // len(names)
+            objs.append(Department(
+                name=name if round_ == 0 else f'{name} {round_ + 1}',
+                faculty=faculties[self.rng.randrange(len(faculties))],
+            ))
+        self.bulk_create(Department, objs)
+        return list(Department.objects.using(self.using).order_by('pk').values_list('pk', 'name'))
+
+    def seed_courses(self, count, departments):
+        start = Course.objects.using(self.using).count()
+        fields = {
+            'CATEGORY': choice_values(Course.CATEGORY_CHOICES),
+            'COURSE_CATEGORY': choice_values(Course.COURSE_CATEGORY_CHOICES),
+            'TYPE': choice_values(Course.TYPE_CHOICES),
+            'CREDIT_SCHEME': choice_values(Course.CREDIT_SCHEME_CHOICES),
+            'CBCS_CATEGORY': choice_values(Course.CBCS_CATEGORY_CHOICES),
+            'QUALIFYING_IN_NATURE': choice_values(Course.QUALIFYING_CHOICES),
+        }
+        batch = []
+        for i in range(start, start + count):
+            department_id, department_name = self.rng.choice(departments)
+            prefix = ''.join(word[0] for word in department_name.split()[:3]).upper()
+            batch.append(Course(
+                COURSE_CODE=f'{prefix}{i:07d}'[-10:],
+                COURSE_NAME=self.rng.choice(COURSE_PATTERNS).format(department_name),
+                DISCIPLINE_id=department_id,
+                MAXIMUM_CREDIT=self.rng.randint(0, 6),
+                **{field: self.rng.choice(values) for field, values in fields.items()},
+            ))
+            if len(batch) >= self.batch_size:
+                self.bulk_create(Course, batch)
+                batch = []
+        if batch:
+            self.bulk_create(Course, batch)
+        return list(Course.objects.using(self.using).order_by('pk').values_list('pk', flat=True))
+
+    def seed_syllabi(self, count, courses, users):
+        if not courses or not count:
+            return 0
+        if not default_storage.exists(PLACEHOLDER_PDF):
+            default_storage.save(PLACEHOLDER_PDF, ContentFile(PLACEHOLDER_BODY))
+        versions = dict(Syllabus.objects.using(self.using).values_list('course_id').annotate(
+            latest=Max('version')))
+        batch = []
+        for _ in range(count):
+            course_id = self.rng.choice(courses)
+            versions[course_id] = versions.get(course_id, 0) + 1
+            batch.append(Syllabus(
+                course_id=course_id, syllabus_file=PLACEHOLDER_PDF, version=versions[course_id],
+                is_active=self.rng.random() < 0.9,
+                uploaded_by_id=self.rng.choice(users) if users else None,
+                description=f'Syllabus revision {versions[course_id]}',
+            ))
+            if len(batch) >= self.batch_size:
+                self.bulk_create(Syllabus, batch)
+                batch = []
+        if batch:
+            self.bulk_create(Syllabus, batch)
+        return count
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+"""
+Copies the default SQLite database over the replica stand-in (settings.DATABASE_READ_REPLICA),
+using SQLite's online backup, so it is safe while the server is writing. Run it on a timer to
+simulate replication lag locally; a real replica is kept current by the database itself.
+"""
+
+
+class Command(BaseCommand):
+    help = "Refresh the local SQLite read replica from the default database."
+
+    def handle(self, *args, **options):
+        replica = getattr(settings, 'DATABASE_READ_REPLICA', None)
+        if replica is None:
+            raise CommandError("No read replica configured; set UNIVERSITY_DB_REPLICA to a SQLite file path.")
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite' or connections[replica].vendor != 'sqlite':
+            raise CommandError("sync_replica only copies SQLite databases.")
+
+        connections[replica].close()  # Its own connection is query_only; write through a plain one
+        source = connections[DEFAULT_DB_ALIAS]
+        source.ensure_connection()
+        target_name = connections[replica].settings_dict['NAME']
+        target = source.Database.connect(target_name)
+        try:
+            source.connection.backup(target)
+        finally:
+            target.close()
+        self.stdout.write(self.style.SUCCESS(f"Copied {source.settings_dict['NAME']} to {target_name}."))
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Frozen copy of the index definition in courses/search.py as of this migration: later
+# edits to that module must not change what replaying this migration creates.
+FTS_TABLE = 'courses_course_fts'
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "code, name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+)
+DROP_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(CREATE_SQL)
+        except Exception:  # sqlite3.OperationalError: no such module: fts5
+            return
+        Course = apps.get_model('courses', 'Course')
+        rows = Course.objects.using(connection.alias).values_list('id', 'COURSE_CODE', 'COURSE_NAME')
+        cursor.executemany(f"INSERT INTO {FTS_TABLE} (rowid, code, name) VALUES (%s, %s, %s)", list(rows))
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_syllabus'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.6 on 2026-10-18 07:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_current_syllabi(apps, schema_editor):
+    Syllabus = apps.get_model('courses', 'Syllabus')
+    CurrentSyllabus = apps.get_model('courses', 'CurrentSyllabus')
+    db = schema_editor.connection.alias
+    current = {}
+    for pk, course_id in (Syllabus.objects.using(db).filter(is_active=True)
+                          .order_by('course_id', 'version', 'id').values_list('pk', 'course_id')):
+        current[course_id] = pk  # Last one per course wins: highest version, then newest
+    CurrentSyllabus.objects.using(db).bulk_create(
+        [CurrentSyllabus(course_id=course_id, syllabus_id=pk) for course_id, pk in current.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_course_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrentSyllabus',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='current_syllabus', serialize=False, to='courses.course')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='syllabus',
+            index=models.Index(fields=['course', 'is_active', 'version'], name='syllabus_course_active_ver'),
+        ),
+        migrations.AddField(
+            model_name='currentsyllabus',
+            name='syllabus',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='current_for', to='courses.syllabus'),
+        ),
+        migrations.RunPython(populate_current_syllabi, migrations.RunPython.noop),
+    ]
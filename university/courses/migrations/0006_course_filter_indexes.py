@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-18 07:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0001_initial'),
+        ('courses', '0005_syllabus_upload'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['DISCIPLINE', 'TYPE', 'COURSE_CODE'], name='course_disc_type_code'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['CATEGORY', 'CBCS_CATEGORY', 'COURSE_CODE'], name='course_cat_cbcs_code'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['CREDIT_SCHEME', 'CBCS_CATEGORY', 'COURSE_CODE'], name='course_scheme_cbcs_code'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['TYPE', 'MAXIMUM_CREDIT'], name='course_type_credit'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of the index definition in courses/content.py as of this migration
+FTS_TABLE = 'courses_syllabus_content_fts'
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "text, tokenize = 'unicode61 remove_diacritics 2', prefix = '3')"
+)
+DROP_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+
+def create_content_index(apps, schema_editor):
+    # Empty: chunks only exist once the worker has run
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(CREATE_SQL)
+        except Exception:  # sqlite3.OperationalError: no such module: fts5
+            pass
+
+
+def drop_content_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_syllabus_processing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyllabusChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('syllabus', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='courses.syllabus')),
+            ],
+            options={
+                'unique_together': {('syllabus', 'position')},
+            },
+        ),
+        migrations.RunPython(create_content_index, drop_content_index),
+    ]
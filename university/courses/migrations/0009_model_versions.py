@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:33
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_versions(apps, schema_editor):
+    # Rows up front, so bumps are plain UPDATEs from the first write on
+    ModelVersion = apps.get_model('courses', 'ModelVersion')
+    ModelVersion.objects.using(schema_editor.connection.alias).bulk_create([
+        ModelVersion(label=label, version=1, changed_at=timezone.now())
+        for label in ('academic.department', 'courses.course', 'courses.syllabus')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_syllabus_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100, unique=True)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+import uuid
+from django.db import models, transaction
 from django.core.validators import MaxLengthValidator, MinValueValidator, MaxValueValidator
 
 class Course(models.Model):
@@ -29,6 +30,18 @@ class Course(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(20)], default=0
     )
     QUALIFYING_IN_NATURE = models.CharField(max_length=3, choices=QUALIFYING_CHOICES, default='NO')
+    # Lets the typeahead index read only the rows changed since its last sync (courses/typeahead.py)
+    updated_at = models.DateTimeField(auto_now=True, null=True, db_index=True)
+
+    class Meta:
+        # Match the common CourseFilter combinations; the trailing COURSE_CODE lets cursor
+        # pagination walk a filtered list in index order instead of sorting it.
+        indexes = [
+            models.Index(fields=['DISCIPLINE', 'TYPE', 'COURSE_CODE'], name='course_disc_type_code'),
+            models.Index(fields=['CATEGORY', 'CBCS_CATEGORY', 'COURSE_CODE'], name='course_cat_cbcs_code'),
+            models.Index(fields=['CREDIT_SCHEME', 'CBCS_CATEGORY', 'COURSE_CODE'], name='course_scheme_cbcs_code'),
+            models.Index(fields=['TYPE', 'MAXIMUM_CREDIT'], name='course_type_credit'),
+        ]
 
     def __str__(self):
         return f"{self.COURSE_CODE} - {self.COURSE_NAME}"
@@ -45,6 +58,10 @@ from .validators import validate_pdf
 User = get_user_model()
 
 class Syllabus(models.Model):
+    PROCESSING_CHOICES = [
+        ('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('DONE', 'Done'), ('FAILED', 'Failed')
+    ]
+
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='syllabi')
     syllabus_file = models.FileField(
         upload_to='syllabi/%Y/%m/%d/',  # e.g., syllabi/2025/02/27/
@@ -57,8 +74,127 @@ class Syllabus(models.Model):
     version = models.IntegerField(default=1, validators=[MinValueValidator(1)])
     is_active = models.BooleanField(default=True)
     description = models.TextField(blank=True, null=True)
+    # Post-processing job state, worked through by `manage.py process_syllabi` (courses/processing.py)
+    processing_status = models.CharField(max_length=10, choices=PROCESSING_CHOICES, default='PENDING')
+    processing_progress = models.PositiveSmallIntegerField(default=0)  # percent
+    processing_started_at = models.DateTimeField(null=True, blank=True)
+    processing_attempts = models.PositiveSmallIntegerField(default=0)
+    processing_error = models.TextField(blank=True, default='')
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    checksum = models.CharField(max_length=64, blank=True, default='')  # SHA-256 of the file, hex
+
+    class Meta:
+        indexes = [
+            # Serves the "latest active version of a course" lookup in CurrentSyllabus.refresh
+            models.Index(fields=['course', 'is_active', 'version'], name='syllabus_course_active_ver'),
+            # The worker's "oldest pending jobs" claim query
+            models.Index(fields=['processing_status', 'id'], name='syllabus_processing_queue'),
+        ]
 
     def __str__(self):
         return f"{self.course.COURSE_CODE} - Syllabus v{self.version}"
-    
-#====================================================================================
\ No newline at end of file
+
+#========================================================================================
+"""
+CurrentSyllabus - one row per course pointing at its latest active syllabus (is_active,
+highest version, newest upload on ties). It is maintained by the Syllabus signals in
+courses/signals.py, so "current syllabus for these courses" is a single indexed join
+instead of clients fetching every version and filtering.
+"""
+
+class CurrentSyllabus(models.Model):
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name='current_syllabus')
+    syllabus = models.ForeignKey(Syllabus, on_delete=models.CASCADE, related_name='current_for')
+
+    def __str__(self):
+        return f"{self.course_id} -> {self.syllabus_id}"
+
+    @classmethod
+    def refresh(cls, course_id, using='default'):
+        """Recompute the mapping for one course."""
+        latest = (Syllabus.objects.using(using)
+                  .filter(course_id=course_id, is_active=True)
+                  .order_by('-version', '-id')
+                  .values_list('pk', flat=True)
+                  .first())
+        if latest is None:
+            cls.objects.using(using).filter(course_id=course_id).delete()
+        else:
+            cls.objects.using(using).update_or_create(course_id=course_id, defaults={'syllabus_id': latest})
+
+    @classmethod
+    def rebuild(cls, using='default', batch_size=5000):
+        """Recompute the whole mapping, e.g. after syllabi were bulk-inserted without signals."""
+        current = {}
+        for pk, course_id in (Syllabus.objects.using(using).filter(is_active=True)
+                              .order_by('course_id', 'version', 'id').values_list('pk', 'course_id')
+                              .iterator(chunk_size=batch_size)):
+            current[course_id] = pk  # Last one per course wins: highest version, then newest
+        with transaction.atomic(using=using):
+            cls.objects.using(using).all().delete()
+            cls.objects.using(using).bulk_create(
+                [cls(course_id=course_id, syllabus_id=pk) for course_id, pk in current.items()],
+                batch_size=batch_size,
+            )
+        return len(current)
+
+#========================================================================================
+"""
+SyllabusChunk - the text of a syllabus PDF in pieces of roughly a paragraph, written by the
+post-processing worker. The chunks of each course's current syllabus are full-text indexed
+for content search (courses/content.py).
+"""
+
+class SyllabusChunk(models.Model):
+    syllabus = models.ForeignKey(Syllabus, on_delete=models.CASCADE, related_name='chunks')
+    position = models.PositiveIntegerField()
+    text = models.TextField()
+
+    class Meta:
+        unique_together = ('syllabus', 'position')
+
+    def __str__(self):
+        return f"{self.syllabus_id} #{self.position}"
+
+#========================================================================================
+"""
+ModelVersion - a change counter per catalog model (label is e.g. 'courses.course'), bumped
+after every write to that model. Conditional GETs, the catalog bundle and the facet cache
+compare counters instead of re-reading the tables (courses/versions.py).
+"""
+
+class ModelVersion(models.Model):
+    label = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.label} v{self.version}"
+
+#========================================================================================
+"""
+SyllabusUpload - one chunked, resumable upload session (see courses/uploads.py). Chunks are
+appended to a part file in storage as they arrive. `received` is the number of bytes
+safely written, which is where a client resumes after an interruption. The Syllabus row is
+created atomically once the last chunk lands.
+"""
+
+class SyllabusUpload(models.Model):
+    STATUS_CHOICES = [('UPLOADING', 'Uploading'), ('COMPLETE', 'Complete')]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    filename = models.CharField(max_length=100)
+    size = models.BigIntegerField(validators=[MinValueValidator(1)])
+    received = models.BigIntegerField(default=0)
+    version = models.IntegerField(default=1, validators=[MinValueValidator(1)])
+    is_active = models.BooleanField(default=True)
+    description = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=9, choices=STATUS_CHOICES, default='UPLOADING')
+    syllabus = models.ForeignKey(Syllabus, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
@@ -0,0 +1,74 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.response import Response
+from university.metrics import registry
+from .versions import VersionedMixin, stamp
+
+"""
+Rendered course list pages. Most list traffic repeats a few filter/search/page combinations,
+so PageCacheMixin keeps the rendered bytes of each list response in the 'pages' cache
+(settings.COURSE_PAGE_CACHE). The key holds the normalized query (parameter names sorted,
+values in request order, which is what DRF reads), the base URL and the accepted media type,
+parameters included (`application/json; indent=4` renders differently). It also holds the
+change counters of the models the response is built from (get_version_models() in
+courses/versions.py), read before the page. A write through the API, the admin or its
+imports, or a bulk upsert bumps a counter after writing its rows (with them, or right after
+their commit under autocommit), so once the bump commits no request builds the old key
+again. A page read between the two is stored under the old key with data at least as new,
+never the reverse. Old entries are never invalidated: they just stop being read, and the
+LRU bound on the cache evicts them.
+
+The default 'pages' cache is process-local (LocMemCache, shared by the process's threads).
+Since keys carry the counters, a memcached or Redis cache shared by every worker is just as
+safe. The async course list (courses/async_views.py) reads and fills the same entries.
+Lookups are counted as cache_requests_total{cache="course_pages"} on /metrics.
+"""
+
+STATS_NAME = 'course_pages'
+
+
+def get_cache():
+    alias = getattr(settings, 'COURSE_PAGE_CACHE', 'pages')  # None turns the cache off
+    return None if alias is None else caches[alias]
+
+
+def normalized_query(query_params):
+    return '&'.join(f'{key}={value}' for key in sorted(query_params) for value in query_params.getlist(key))
+
+
+def page_key(base_url, media_type, versions, query_params):
+    key = '|'.join([base_url, media_type, stamp(versions), normalized_query(query_params)])
+    return f'course-page:{hashlib.sha1(key.encode()).hexdigest()}'
+
+
+class PageCacheMixin(VersionedMixin):
+    """Viewset mixin: list() responses served from, and stored in, the page cache."""
+
+    _page_key = None
+
+    def get_page_key(self, request):
+        # The whole base URL: pagination links in the body are absolute
+        return page_key(request.build_absolute_uri(request.path), request.accepted_media_type,
+                        self.get_model_versions(), request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        cache = get_cache()
+        if cache is None or request.accepted_renderer.format == 'api':
+            return super().list(request, *args, **kwargs)  # The browsable API page shows the user and a CSRF token
+        key = self.get_page_key(request)
+        cached = cache.get(key)
+        registry.record_cache(STATS_NAME, hit=cached is not None)
+        if cached is not None:
+            body, content_type = cached
+            return HttpResponse(body, content_type=content_type)
+        self._page_key = key
+        return super().list(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._page_key is not None and isinstance(response, Response) and response.status_code == 200:
+            response.render()
+            get_cache().set(self._page_key, (response.content, response['Content-Type']))
+        return response
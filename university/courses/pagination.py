@@ -0,0 +1,85 @@
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+
+"""
+Keyset (cursor) pagination - page-number pagination runs a COUNT(*) and an OFFSET scan on
+every request, so late pages get slower as the catalog grows. Cursor pagination seeks on
+an indexed ordering instead and never counts. Clients opt in with ?pagination=cursor and
+then follow the `next` / `previous` links (which carry the ?cursor= value). A ?cursor= on its
+own selects cursor mode too. The cursor ordering replaces any other: a cursor can only seek
+on a fixed, unique ordering, so ?search= results come in COURSE_CODE order in cursor mode
+rather than ranked by relevance.
+"""
+
+class CourseCursorPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = 'limit'  # e.g., ?limit=20
+    max_page_size = 100
+    ordering = ('COURSE_CODE', 'id')  # COURSE_CODE is unique, so its index gives exact seeks
+
+
+class SyllabusCursorPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    ordering = ('course_id', 'id')  # Served by the course FK index; versions of a course tie-break on id
+
+
+class CoursePagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'limit'  # e.g., ?limit=20
+    max_page_size = 100
+
+    mode_query_param = 'pagination'  # ?pagination=cursor switches to keyset pagination
+    cursor_pagination_class = CourseCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request):
+        """Cursor mode is chosen explicitly or implied by a cursor from a previous page."""
+        cursor_param = self.cursor_pagination_class.cursor_query_param
+        return (request.query_params.get(self.mode_query_param) == 'cursor'
+                or cursor_param in request.query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_html_context()
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            'name': self.mode_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Set to "cursor" for keyset pagination (no total count).',
+            'schema': {'type': 'string', 'enum': ['page', 'cursor']},
+        })
+        parameters.append({
+            'name': self.cursor_pagination_class.cursor_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'The pagination cursor value (cursor mode only).',
+            'schema': {'type': 'string'},
+        })
+        return parameters
+
+
+class SyllabusPagination(CoursePagination):
+    cursor_pagination_class = SyllabusCursorPagination
@@ -0,0 +1,228 @@
+import re
+import zlib
+
+"""
+Just enough PDF parsing for syllabus post-processing, without a PDF library.
+
+Pages: a page is a `/Type /Page` dictionary. These sit either in the file body or, since
+PDF 1.5, inside compressed object streams, so Flate-encoded streams are inflated and
+searched as well.
+
+Text: the string operands of the text-showing operators (Tj, TJ, ' and ") in every content
+stream, in file order, with line breaks where the text moves to a new line. Strings are
+read as Latin-1, or as UTF-16 when they carry a byte order mark. Fonts with custom encodings
+(most subset CID fonts) come out as noise, which is harmless for a search index.
+
+Both come out of one pass over the file (Scanner), fed in chunks as it is read, so a large
+upload is never held in memory whole: only the content and object streams are kept, one at
+a time, while images and other streams are skipped as they go by.
+
+Malformed or encrypted files give a count of 0 and no text rather than an error.
+"""
+
+PAGE_OBJECT = re.compile(rb'/Type\s*/Page(?![A-Za-z])')
+STREAM_START = re.compile(rb'(?<!end)stream\r?\n')
+MAX_DICTIONARY = 4096  # How far before `stream` to look for the stream's dictionary
+MAX_INFLATED = 64 * 1024 * 1024  # Per stream; guards against decompression bombs
+NOT_CONTENT = (b'/ObjStm', b'/XRef', b'/Image', b'/Length1', b'/Length2', b'/Length3', b'/Metadata')
+
+# Content stream tokens: strings, arrays, names/numbers and operators
+TOKEN = re.compile(rb'''
+    (?P<string>\() | (?P<hex><(?!<)[0-9A-Fa-f\s]*>) | (?P<open>\[) | (?P<close>\]) |
+    (?P<number>[+-]?(?:\d+\.?\d*|\.\d+)) | (?P<operator>[A-Za-z'"*]+) | /[^\s/<>\[\]()]*
+''', re.X)
+LITERAL_SPECIAL = re.compile(rb'[\\()]')
+ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+NEW_LINE_OPERATORS = {b'T*', b'Td', b'TD', b"'", b'"', b'ET'}
+WORD_GAP = -200  # TJ adjustments beyond this (thousandths of an em) separate words
+
+
+def page_count(data):
+    return scan([data]).pages
+
+
+def read_literal(body, start):
+    """The literal string starting after the '(' at `start`, and the position after it."""
+    out, depth, i = bytearray(), 1, start
+    while True:
+        special = LITERAL_SPECIAL.search(body, i)
+        if special is None:
+            out += body[i:]
+            return bytes(out), len(body)
+        out += body[i:special.start()]
+        i = special.start()
+        char = special.group()
+        if char == b'\\':
+            following = body[i + 1:i + 2]
+            if following in ESCAPES:
+                out += ESCAPES[following]
+                i += 2
+            elif following.isdigit():
+                octal = re.match(rb'[0-7]{1,3}', body[i + 1:i + 4])
+                out.append(int(octal.group(), 8) & 0xFF if octal else 0)
+                i += 1 + (len(octal.group()) if octal else 1)
+            elif following in (b'\r', b'\n'):  # Line continuation
+                i += 2
+            else:
+                out += following
+                i += 2
+            continue
+        depth += 1 if char == b'(' else -1
+        if not depth:
+            return bytes(out), i + 1
+        out += char
+        i += 1
+
+
+def decode(raw):
+    if raw.startswith(b'\xfe\xff'):
+        return raw[2:].decode('utf-16-be', 'replace')
+    return raw.decode('latin-1')
+
+
+def content_text(body):
+    """Text shown by one content stream."""
+    parts, operands, in_array = [], [], False
+    position = 0
+    while True:
+        match = TOKEN.search(body, position)
+        if match is None:
+            break
+        position = match.end()
+        kind = match.lastgroup
+        if kind == 'string':
+            raw, position = read_literal(body, position)
+            operands.append(decode(raw))
+        elif kind == 'hex':
+            digits = re.sub(rb'\s', b'', match.group()[1:-1])
+            operands.append(decode(bytes.fromhex((digits + b'0' * (len(digits) % 2)).decode())))
+        elif kind == 'open':
+            in_array = True
+        elif kind == 'close':
+            in_array = False
+        elif kind == 'number':
+            if in_array and float(match.group()) < WORD_GAP:
+                operands.append(' ')
+        elif kind == 'operator':
+            operator = match.group()
+            if operator in NEW_LINE_OPERATORS:
+                parts.append('\n')
+            if operator in (b'Tj', b'TJ', b"'", b'"'):
+                parts.extend(operands)
+            if not in_array:
+                operands = []
+    return ''.join(parts)
+
+
+def extract_text(data):
+    return scan([data]).text()
+
+
+class Stream:
+    """
+    The body of one stream as it is read, kept only when it is an object stream (pages) or
+    may be a content stream (text), inflated when Flate-encoded.
+    """
+
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+        filtered = b'/Filter' in dictionary
+        wanted = b'/ObjStm' in dictionary or not any(marker in dictionary for marker in NOT_CONTENT)
+        self.parts = [] if wanted and (not filtered or b'/FlateDecode' in dictionary) else None
+        self.inflater = zlib.decompressobj() if filtered else None
+        self.size = 0
+
+    def write(self, data):
+        if self.parts is None or not data or self.size >= MAX_INFLATED:
+            return
+        if self.inflater is None:
+            data = data[:MAX_INFLATED - self.size]
+        else:
+            try:
+                data = self.inflater.decompress(data, MAX_INFLATED - self.size)
+            except zlib.error:
+                self.parts = None  # Corrupt: skipped, like any stream we cannot read
+                return
+        self.parts.append(data)
+        self.size += len(data)
+
+    def body(self):
+        return None if self.parts is None else b''.join(self.parts)
+
+
+class Scanner:
+    """
+    Page count and text of a file fed in chunks, in one pass. Only a window of the bytes
+    before the next `stream` keyword (where its dictionary is) and the bodies of the object
+    and content streams are held; images and other streams are dropped as they go by.
+    """
+    PAGE_OVERLAP = 64  # Bytes kept between chunks so a /Type /Page split across them is found
+
+    def __init__(self):
+        self.pages = 0
+        self.texts = []
+        self._buffer = b''
+        self._position = 0  # Where scanning resumes in _buffer; the bytes before are context
+        self._stream = None  # The Stream being read, if any
+        self._page_tail = b''
+
+    def feed(self, chunk, final=False):
+        self._count_pages(chunk, final)
+        data, position = self._buffer + chunk, self._position
+        while True:
+            if self._stream is not None:
+                end = data.find(b'endstream', position)
+                if end == -1:
+                    if final:  # Unterminated: dropped
+                        self._stream = None
+                        return
+                    keep = max(position, len(data) - len(b'endstream') + 1)  # A split `endstream`
+                    self._stream.write(data[position:keep])
+                    self._buffer, self._position = data[keep:], 0
+                    return
+                self._stream.write(data[position:end])
+                self._finish(self._stream)
+                self._stream = None
+                position = end + len(b'endstream')
+            match = STREAM_START.search(data, position)
+            if match is None:
+                # Keep the dictionary window, and rescan a `stream` keyword split across chunks
+                keep = max(0, len(data) - MAX_DICTIONARY - len(b'stream\r\n'))
+                self._buffer = data[keep:]
+                self._position = max(position, len(data) - len(b'stream\r\n') + 1) - keep
+                return
+            obj = data.rfind(b'obj', max(0, match.start() - MAX_DICTIONARY), match.start())
+            self._stream = Stream(data[obj if obj != -1 else max(0, match.start() - MAX_DICTIONARY):match.start()])
+            position = match.end()
+
+    def close(self):
+        self.feed(b'', final=True)
+        return self
+
+    def text(self):
+        return '\n'.join(self.texts)
+
+    def _count_pages(self, chunk, final):
+        data = self._page_tail + chunk
+        cut = len(data) if final else max(0, len(data) - self.PAGE_OVERLAP)
+        self.pages += sum(1 for match in PAGE_OBJECT.finditer(data) if match.start() < cut)
+        self._page_tail = data[cut:]
+
+    def _finish(self, stream):
+        body = stream.body()
+        if body is None:
+            return
+        if b'/ObjStm' in stream.dictionary:
+            self.pages += len(PAGE_OBJECT.findall(body))
+        if not any(marker in stream.dictionary for marker in NOT_CONTENT) and b'BT' in body:
+            text = content_text(body)
+            if text.strip():
+                self.texts.append(text)
+
+
+def scan(chunks):
+    """A closed Scanner fed with `chunks`."""
+    scanner = Scanner()
+    for chunk in chunks:
+        scanner.feed(chunk)
+    return scanner.close()
@@ -0,0 +1,145 @@
+import hashlib
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+from django.utils import timezone
+from .models import Syllabus
+from . import content, pdf, versions
+
+"""
+Syllabus post-processing queue, kept in the Syllabus table itself: new rows start as
+PENDING and `manage.py process_syllabi` works through them in a process pool, so uploads
+return as soon as the row is saved. The API shows processing_status, processing_progress
+and, once DONE, page_count and checksum; the text becomes searchable through content search.
+
+    claim()           PENDING -> PROCESSING, oldest first, with an UPDATE per row guarded by
+                      the status, so concurrent workers never take the same row. No
+                      transaction spans the read and the writes: on SQLite that would have
+                      to upgrade a read lock, which fails instead of waiting.
+    process()         runs in a pool process: reads the file in chunks, hashing and
+                      parsing each as it comes (courses/pdf.py), records progress as it
+                      goes, stores the page count, checksum and extracted text
+                      (courses/content.py), finishes as DONE or FAILED. Writes are queryset updates, so the
+                      Syllabus signals (search index, CurrentSyllabus) do not fire; every
+                      function here bumps the Syllabus change counter itself (versions.py)
+                      when a status changes or a result is stored. Progress alone does not
+                      bump it, so cached pages and 304s may show the previous step's
+                      processing_progress until the next one.
+    requeue_stalled() PROCESSING rows older than SYLLABUS_PROCESSING_TIMEOUT (a worker that
+                      died) go back to PENDING, or FAILED after SYLLABUS_PROCESSING_MAX_ATTEMPTS.
+    release()         puts claimed rows back to PENDING, for a worker shutting down or whose
+                      pool crashed (rows that keep crashing it end up FAILED).
+Replacing a syllabus's file through the API queues it again (SyllabusViewSet.perform_update).
+"""
+
+TIMEOUT = getattr(settings, 'SYLLABUS_PROCESSING_TIMEOUT', 600)  # seconds
+MAX_ATTEMPTS = getattr(settings, 'SYLLABUS_PROCESSING_MAX_ATTEMPTS', 3)
+READ_CHUNK = 1024 * 1024
+
+# Progress reported at the end of each step
+READ_PROGRESS = 60  # Reading and hashing scale from 0 to this with the bytes read
+PAGES_PROGRESS = 70
+TEXT_PROGRESS = 95
+
+
+class Abandoned(Exception):
+    """The row stopped being ours mid-way: requeued after a timeout, or deleted."""
+
+
+def claim(limit, using=DEFAULT_DB_ALIAS):
+    """Mark up to `limit` pending syllabi as PROCESSING and return their ids."""
+    pending = Syllabus.objects.using(using).filter(processing_status='PENDING')
+    claimed = []
+    for pk in pending.order_by('id').values_list('id', flat=True)[:limit]:
+        # Each row is taken by a single-statement UPDATE that only matches while it is still
+        # PENDING; a worker that loses the race to another one gets 0 rows and skips it
+        if pending.filter(pk=pk).update(
+            processing_status='PROCESSING', processing_progress=0, processing_started_at=timezone.now(),
+            processing_attempts=F('processing_attempts') + 1, processing_error='',
+        ):
+            claimed.append(pk)
+    if claimed:
+        versions.bump(Syllabus, using=using)
+    return claimed
+
+
+def requeue_stalled(using=DEFAULT_DB_ALIAS):
+    stalled = Syllabus.objects.using(using).filter(
+        processing_status='PROCESSING', processing_started_at__lt=timezone.now() - timedelta(seconds=TIMEOUT))
+    failed = stalled.filter(processing_attempts__gte=MAX_ATTEMPTS).update(
+        processing_status='FAILED', processing_error='Timed out.')
+    # Jobs released after crashing their pool process too often
+    failed += Syllabus.objects.using(using).filter(
+        processing_status='PENDING', processing_attempts__gte=MAX_ATTEMPTS,
+    ).update(processing_status='FAILED', processing_error='Gave up after repeated worker crashes.')
+    requeued = stalled.update(processing_status='PENDING', processing_progress=0) + failed
+    if requeued:
+        versions.bump(Syllabus, using=using)
+    return requeued
+
+
+def release(ids, using=DEFAULT_DB_ALIAS, count_attempt=False):
+    """
+    Put claimed rows back to PENDING. A clean shutdown does not count as an attempt; a
+    crashed pool does (count_attempt), since one of the rows may be what crashed it.
+    """
+    attempts = F('processing_attempts') if count_attempt else F('processing_attempts') - 1
+    released = Syllabus.objects.using(using).filter(pk__in=ids, processing_status='PROCESSING').update(
+        processing_status='PENDING', processing_progress=0, processing_attempts=attempts)
+    if released:
+        versions.bump(Syllabus, using=using)
+    return released
+
+
+def fail(pk, error, using=DEFAULT_DB_ALIAS):
+    """For a job that raised outside process() itself."""
+    Syllabus.objects.using(using).filter(pk=pk, processing_status='PROCESSING').update(processing_status='FAILED', processing_error=str(error)[:1000])
+    versions.bump(Syllabus, using=using)
+
+
+def process(pk, using=DEFAULT_DB_ALIAS):
+    """Process one claimed syllabus. Returns the final status."""
+    rows = Syllabus.objects.using(using).filter(pk=pk, processing_status='PROCESSING')
+
+    def progress(percent, **fields):
+        # Stop if the row was requeued or deleted under us
+        if not rows.update(processing_progress=percent, **fields):
+            raise Abandoned(pk)
+        if fields:
+            versions.bump(Syllabus, using=using)
+
+    try:
+        name = rows.values_list('syllabus_file', flat=True).get()
+    except Syllabus.DoesNotExist:
+        return None
+    try:
+        if not name:
+            raise ValueError('This syllabus has no file.')
+        digest, scanner = hashlib.sha256(), pdf.Scanner()  # The file is never held whole
+        with default_storage.open(name, 'rb') as f:
+            size = max(default_storage.size(name), 1)
+            read = reported = 0
+            for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+                digest.update(chunk)
+                scanner.feed(chunk)
+                read += len(chunk)
+                percent = min(READ_PROGRESS * read // size, READ_PROGRESS)
+                if percent >= reported + 10:  # An UPDATE every 10 points at most
+                    progress(percent)
+                    reported = percent
+        scanner.close()
+        progress(READ_PROGRESS, checksum=digest.hexdigest())
+        progress(PAGES_PROGRESS, page_count=scanner.pages)
+        content.replace_chunks(pk, scanner.text(), using=using)  # Searchable text, see content.py
+        progress(TEXT_PROGRESS)
+    except Abandoned:
+        return None
+    except Exception as e:
+        rows.update(processing_status='FAILED', processing_error=str(e)[:1000])
+        versions.bump(Syllabus, using=using)
+        return 'FAILED'
+    rows.update(processing_status='DONE', processing_progress=100, processing_error='')
+    versions.bump(Syllabus, using=using)
+    return 'DONE'
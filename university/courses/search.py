@@ -0,0 +1,172 @@
+import re
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+
+"""
+Course search index - ?search= used to become LIKE '%term%' over the whole course table,
+which no index can serve. On SQLite we keep an FTS5 table (rowid = Course.id) holding the
+course code and name, kept in sync by the signals in courses/signals.py and rebuilt in bulk
+by `manage.py rebuild_course_search_index`. Every search word becomes a prefix query, so
+"cs10" or "algo" are answered from the FTS prefix indexes and results come back ranked by
+bm25 (code matches weigh more than name matches).
+The index only sees word prefixes. When it finds nothing, the search falls back to the
+plain SearchFilter (icontains), so a substring inside a word, like "101" in CS101 or
+"gorith" in Algorithms, still matches as it always did. Only those searches pay for the
+table scan. Databases without FTS5 keep the plain SearchFilter behaviour.
+"""
+
+FTS_TABLE = 'courses_course_fts'
+CODE_WEIGHT, NAME_WEIGHT = 10.0, 1.0
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "code, name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+)
+DROP_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+_TOKEN_RE = re.compile(r'\w+')
+_available = {}  # db alias -> bool, the table does not come and go at runtime
+
+
+def is_available(using=DEFAULT_DB_ALIAS):
+    """True when `using` is SQLite and the FTS table has been created by the migration."""
+    if using not in _available:
+        connection = connections[using]
+        if connection.vendor != 'sqlite':
+            _available[using] = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+                _available[using] = cursor.fetchone() is not None
+    return _available[using]
+
+
+def availability_known(using=DEFAULT_DB_ALIAS):
+    """Whether is_available(using) can answer without a query (async callers probe it once)."""
+    return using in _available
+
+
+def forget_availability(using=DEFAULT_DB_ALIAS):
+    """Probe again on next use: migrations create and drop the table."""
+    _available.pop(using, None)
+
+
+def create_index(connection):
+    """Create the FTS table. Returns False when the SQLite build has no FTS5."""
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(CREATE_SQL)
+        except Exception:  # sqlite3.OperationalError: no such module: fts5
+            return False
+    _available.pop(connection.alias, None)
+    return True
+
+
+def drop_index(connection):
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(DROP_SQL)
+    _available.pop(connection.alias, None)
+
+
+def index_courses(rows, using=DEFAULT_DB_ALIAS):
+    """Upsert (id, COURSE_CODE, COURSE_NAME) tuples into the index."""
+    rows = list(rows)
+    if not rows or not is_available(using):
+        return
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk, _, _ in rows])
+        cursor.executemany(f"INSERT INTO {FTS_TABLE} (rowid, code, name) VALUES (%s, %s, %s)", rows)
+
+
+def remove_courses(ids, using=DEFAULT_DB_ALIAS):
+    ids = list(ids)
+    if not ids or not is_available(using):
+        return
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in ids])
+
+
+def rebuild_index(using=DEFAULT_DB_ALIAS, batch_size=5000):
+    """Drop every entry and re-index the whole course table. Returns the number of rows indexed."""
+    from .models import Course
+
+    if not is_available(using):
+        return 0
+    total = 0
+    # One transaction: in autocommit mode SQLite would commit (and sync) every inserted row
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        batch = []
+        rows = Course.objects.using(using).values_list('id', 'COURSE_CODE', 'COURSE_NAME')
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(f"INSERT INTO {FTS_TABLE} (rowid, code, name) VALUES (%s, %s, %s)", batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(f"INSERT INTO {FTS_TABLE} (rowid, code, name) VALUES (%s, %s, %s)", batch)
+            total += len(batch)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return total
+
+
+def build_match_query(terms):
+    """
+    Turn search terms into an FTS5 MATCH expression: every word must match (AND) as a
+    prefix in either column. Returns None when the terms contain no indexable words.
+    """
+    tokens = [token for term in terms for token in _TOKEN_RE.findall(term)]
+    if not tokens:
+        return None
+    return ' AND '.join(f'"{token}"*' for token in tokens)
+
+
+def search_course_ids(terms, using=DEFAULT_DB_ALIAS, limit=None):
+    """Ranked course ids for the given search terms, best match first."""
+    query = build_match_query(terms)
+    if query is None or not is_available(using):
+        return []
+    sql = (f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+           f"ORDER BY bm25({FTS_TABLE}, {CODE_WEIGHT}, {NAME_WEIGHT})")
+    params = [query]
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+class IndexedSearchFilter(SearchFilter):
+    """
+    SearchFilter that answers ?search= from the course FTS index. Views name the field that
+    holds the course id with `search_index_field` ('id' on courses, 'course' on syllabi);
+    results are ordered by relevance unless the paginator imposes its own ordering. A
+    search the index cannot answer falls back to SearchFilter's substring match.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        index_field = getattr(view, 'search_index_field', None)
+        search_terms = self.get_search_terms(request)
+        if not search_terms or index_field is None or not is_available(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+        query = build_match_query(search_terms)
+        if query is None:
+            return super().filter_queryset(request, queryset, view)
+
+        opts = queryset.model._meta
+        column = f'"{opts.db_table}"."{opts.get_field(index_field).column}"'
+        matches = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [query])
+        rank = RawSQL(
+            f"SELECT bm25({FTS_TABLE}, {CODE_WEIGHT}, {NAME_WEIGHT}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = {column}", [query]
+        )
+        indexed = queryset.filter(**{f'{index_field}__in': matches})
+        if not indexed.exists():  # Maybe a substring within a word, which the prefix index cannot see
+            return super().filter_queryset(request, queryset, view)
+        return indexed.annotate(search_rank=rank).order_by('search_rank', 'pk')
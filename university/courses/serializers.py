@@ -1,7 +1,28 @@
 from rest_framework import serializers
-from .models import Course, Syllabus
+from academic.serializers import DepartmentSerializer
+from .models import Course, Syllabus, SyllabusUpload
+from .uploads import MAX_UPLOAD_SIZE
 
+class SyllabusSerializer(serializers.ModelSerializer):
+    uploaded_by = serializers.StringRelatedField()  # Display username
+    course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
+
+    class Meta:
+        model = Syllabus
+        fields = ['id', 'course', 'syllabus_file', 'uploaded_by', 'uploaded_at', 'version', 'is_active', 'description',
+                  'processing_status', 'processing_progress', 'page_count', 'checksum']
+        read_only_fields = ['processing_status', 'processing_progress', 'page_count', 'checksum']
+
+"""
+CourseSerializer optionally takes `fields` (only these columns are rendered) and `expand`
+(embed related objects instead of ids): 'discipline' replaces the DISCIPLINE id with the
+department, 'syllabi' adds the course's syllabi. CourseViewSet fills both from ?fields= and
+?expand= and loads the matching columns and relations up front (see
+CourseViewSet.get_queryset).
+"""
 class CourseSerializer(serializers.ModelSerializer):
+    EXPANDABLE = ('discipline', 'syllabi')
+
     class Meta:
         model = Course
         fields = [
@@ -9,10 +30,31 @@ class CourseSerializer(serializers.ModelSerializer):
             'CREDIT_SCHEME', 'CBCS_CATEGORY', 'DISCIPLINE', 'MAXIMUM_CREDIT', 'QUALIFYING_IN_NATURE'
         ]
 
-class SyllabusSerializer(serializers.ModelSerializer):
-    uploaded_by = serializers.StringRelatedField()  # Display username
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        if 'discipline' in expand and 'DISCIPLINE' in self.fields:
+            self.fields['DISCIPLINE'] = DepartmentSerializer(read_only=True)
+        if 'syllabi' in expand:
+            self.fields['syllabi'] = SyllabusSerializer(many=True, read_only=True)
+
+class SyllabusUploadSerializer(serializers.ModelSerializer):
     course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
 
     class Meta:
-        model = Syllabus
-        fields = ['id', 'course', 'syllabus_file', 'uploaded_by', 'uploaded_at', 'version', 'is_active', 'description']
\ No newline at end of file
+        model = SyllabusUpload
+        fields = ['id', 'course', 'filename', 'size', 'received', 'version', 'is_active', 'description',
+                  'status', 'syllabus', 'created_at']
+        read_only_fields = ['received', 'status', 'syllabus', 'created_at']
+
+    def validate_filename(self, value):
+        if not value.lower().endswith('.pdf'):
+            raise serializers.ValidationError('Only PDF files are allowed.')
+        return value
+
+    def validate_size(self, value):
+        if value > MAX_UPLOAD_SIZE:
+            raise serializers.ValidationError(f'File size must be under {MAX_UPLOAD_SIZE // (1024 * 1024)}MB.')
+        return value
@@ -0,0 +1,106 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, post_migrate
+from django.dispatch import receiver, Signal
+from academic.models import Department
+from .models import Course, Syllabus, CurrentSyllabus
+from . import content, search, versions
+from .typeahead import typeahead_index
+
+"""
+Keeps derived data in step with Course, Syllabus and Department writes made through
+save()/delete() - the API, the admin and django-import-export all go through these.
+"""
+
+# Sent after bulk_create/bulk_update write courses without per-row signals
+# (courses/bulk.py), inside the batch's transaction. Arguments: courses (list of Course
+# instances), previous (pk -> (DISCIPLINE_id, TYPE, CBCS_CATEGORY, MAXIMUM_CREDIT) before
+# the write, for updated courses), using.
+courses_bulk_changed = Signal()
+
+@receiver(post_save, sender=Course)
+def index_course(sender, instance, using, **kwargs):
+    search.index_courses([(instance.pk, instance.COURSE_CODE, instance.COURSE_NAME)], using=using)
+
+@receiver(post_delete, sender=Course)
+def unindex_course(sender, instance, using, **kwargs):
+    search.remove_courses([instance.pk], using=using)
+
+@receiver(courses_bulk_changed)
+def index_bulk_courses(sender, courses, using, **kwargs):
+    rows = [(course.pk, course.COURSE_CODE, course.COURSE_NAME) for course in courses]
+    if any(pk is None for pk, _, _ in rows):  # Backends that do not return ids from bulk_create
+        codes = [code for _, code, _ in rows]
+        rows = Course.objects.using(using).filter(COURSE_CODE__in=codes).values_list('pk', 'COURSE_CODE', 'COURSE_NAME')
+    search.index_courses(rows, using=using)
+
+@receiver(post_migrate)
+def forget_index_availability(sender, using, **kwargs):
+    # The migrations create and drop the FTS tables
+    search.forget_availability(using)
+    content.forget_availability(using)
+
+# This process's typeahead index takes its own writes once they commit (courses/typeahead.py)
+@receiver(post_save, sender=Course)
+def update_typeahead(sender, instance, using, **kwargs):
+    row = (instance.pk, instance.COURSE_CODE, instance.COURSE_NAME)
+    transaction.on_commit(lambda: typeahead_index.update([row]), using=using)
+
+@receiver(post_delete, sender=Course)
+def remove_from_typeahead(sender, instance, using, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: typeahead_index.update(removed=[pk]), using=using)
+
+@receiver(courses_bulk_changed)
+def update_bulk_typeahead(sender, courses, using, **kwargs):
+    # Without ids (backends that do not return them from bulk_create) the next sync picks them up
+    rows = [(course.pk, course.COURSE_CODE, course.COURSE_NAME) for course in courses if course.pk is not None]
+    transaction.on_commit(lambda: typeahead_index.update(rows), using=using)
+
+@receiver(pre_save, sender=Syllabus)
+def remember_syllabus_course(sender, instance, using, **kwargs):
+    # A syllabus moved to another course leaves the old course's mapping to be recomputed too
+    instance._previous_course_id = None
+    if instance.pk is not None:
+        instance._previous_course_id = (Syllabus.objects.using(using).filter(pk=instance.pk)
+                                        .values_list('course_id', flat=True).first())
+
+@receiver(post_save, sender=Syllabus)
+def refresh_current_syllabus(sender, instance, using, **kwargs):
+    CurrentSyllabus.refresh(instance.course_id, using=using)
+    previous = getattr(instance, '_previous_course_id', None)
+    if previous is not None and previous != instance.course_id:
+        CurrentSyllabus.refresh(previous, using=using)
+
+@receiver(post_delete, sender=Syllabus)
+def refresh_current_syllabus_after_delete(sender, instance, using, **kwargs):
+    CurrentSyllabus.refresh(instance.course_id, using=using)
+
+# The content index holds current syllabi only (courses/content.py): follow the mapping.
+@receiver(pre_save, sender=CurrentSyllabus)
+def remember_current_syllabus(sender, instance, using, **kwargs):
+    instance._previous_syllabus_id = (CurrentSyllabus.objects.using(using).filter(pk=instance.pk)
+                                      .values_list('syllabus_id', flat=True).first())
+
+@receiver(post_save, sender=CurrentSyllabus)
+def index_current_syllabus_content(sender, instance, using, **kwargs):
+    previous = getattr(instance, '_previous_syllabus_id', None)
+    if previous == instance.syllabus_id:
+        return
+    if previous is not None:
+        content.unindex_syllabi([previous], using=using)
+    content.index_syllabi([instance.syllabus_id], using=using)
+
+@receiver(post_delete, sender=CurrentSyllabus)
+def unindex_current_syllabus_content(sender, instance, using, **kwargs):
+    content.unindex_syllabi([instance.syllabus_id], using=using)
+
+# Change counters behind ETags, the catalog bundle and the facet cache (courses/versions.py)
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Syllabus)
+@receiver(post_delete, sender=Syllabus)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(courses_bulk_changed)
+def bump_version(sender, using, **kwargs):
+    versions.bump(sender, using=using)
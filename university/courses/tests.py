@@ -1,3 +1,1118 @@
-from django.test import TestCase
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import os
+import tempfile
+import zlib
+from datetime import timedelta
+from urllib.parse import parse_qs, urlsplit
+from unittest import mock, skipUnless
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.db import DatabaseError, connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from academic import urls as academic_urls
+from academic.models import Department
+from account.models import CustomUser
+from .bulk import BulkUpsert
+from .filters import CourseFilter
+from .models import Course, CurrentSyllabus, Syllabus, SyllabusUpload
+from . import catalog, downloads, pdf, processing, search, uploads, versions
+from . import urls as course_urls
+from .typeahead import REBUILD_AFTER, Entries, typeahead_index
+from .views import SyllabusViewSet
+from university.db_router import ReadReplicaRouter, read_alias
 
-# Create your tests here.
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are checked with SQLite EXPLAIN QUERY PLAN')
+class CourseFilterIndexTests(TestCase):
+    """The common CourseFilter combinations must be answered from the composite indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Computer Science', faculty='I&C')
+        Course.objects.bulk_create([
+            Course(COURSE_CODE=f'CS{i:03d}', COURSE_NAME=f'Course {i}', CATEGORY='CBCS',
+                   COURSE_CATEGORY='COMPULSORY', TYPE='THEORY' if i % 2 else 'PRACTICAL',
+                   CREDIT_SCHEME='NEP', CBCS_CATEGORY='MAJOR' if i % 3 else 'MINOR',
+                   DISCIPLINE=cls.department, MAXIMUM_CREDIT=i % 6)
+            for i in range(50)
+        ])
+
+    def assertUsesIndex(self, params, index_name, ordering=None):
+        queryset = CourseFilter(params, queryset=Course.objects.all()).qs
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        plan = queryset.explain()
+        self.assertIn(f'INDEX {index_name}', plan, f'{params} did not use {index_name}:\n{plan}')
+        return plan
+
+    def test_discipline_and_type(self):
+        self.assertUsesIndex({'DISCIPLINE': self.department.pk, 'TYPE': 'THEORY'}, 'course_disc_type_code')
+
+    def test_discipline_and_type_in_cursor_order(self):
+        plan = self.assertUsesIndex({'DISCIPLINE': self.department.pk, 'TYPE': 'THEORY'},
+                                    'course_disc_type_code', ordering=('COURSE_CODE', 'id'))
+        self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_category_and_cbcs_category(self):
+        self.assertUsesIndex({'CATEGORY': 'CBCS', 'CBCS_CATEGORY__in': 'MAJOR,MINOR'}, 'course_cat_cbcs_code')
+
+    def test_credit_scheme_and_cbcs_category(self):
+        self.assertUsesIndex({'CREDIT_SCHEME': 'NEP', 'CBCS_CATEGORY': 'MAJOR'}, 'course_scheme_cbcs_code')
+
+    def test_type_and_credit_range(self):
+        self.assertUsesIndex({'TYPE': 'THEORY', 'MAXIMUM_CREDIT__gte': 2, 'MAXIMUM_CREDIT__lte': 4},
+                             'course_type_credit')
+
+    def test_filtered_results(self):
+        queryset = CourseFilter({'TYPE__in': 'THEORY', 'MAXIMUM_CREDIT__gte': 4}, queryset=Course.objects.all()).qs
+        self.assertEqual(
+            sorted(queryset.values_list('COURSE_CODE', flat=True)),
+            [f'CS{i:03d}' for i in range(50) if i % 2 and i % 6 >= 4],
+        )
+
+
+@skipUnless(connection.vendor == 'sqlite', 'The course search index is SQLite FTS5')
+@override_settings(COURSE_PAGE_CACHE=None)  # Every search has to reach the index
+class CourseSearchTests(TestCase):
+    """
+    ?search= words are ANDed prefixes over code and name, code matches ranked first; what
+    the index cannot find falls back to substring matching.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Computer Science', faculty='SC')
+        for code, name in [('CS101', 'Algorithms'), ('CS102', 'Data Structures'),
+                           ('MA201', 'Linear Álgebra for CS'), ('PH101', 'Mechanics')]:
+            Course.objects.create(COURSE_CODE=code, COURSE_NAME=name, CATEGORY='CBCS', COURSE_CATEGORY='COMPULSORY',
+                                  TYPE='THEORY', CREDIT_SCHEME='NEP', CBCS_CATEGORY='CORE', DISCIPLINE=cls.department)
+
+    def search(self, terms, url='/api/courses/courses/'):
+        return self.client.get(url, {'search': terms}).json()['results']
+
+    def codes(self, terms):
+        return [course['COURSE_CODE'] for course in self.search(terms)]
+
+    def test_prefix_words(self):
+        self.assertEqual(self.codes('algo'), ['CS101'])
+        self.assertEqual(self.codes('cs10'), ['CS101', 'CS102'])
+        self.assertEqual(self.codes('data struct'), ['CS102'])
+        self.assertEqual(self.codes('data mech'), [])  # Every word has to match
+        self.assertEqual(self.codes('algebra'), ['MA201'])  # Diacritics are folded
+        self.assertEqual(self.codes('"linear"'), ['MA201'])  # Quotes cannot break out of the MATCH string
+
+    def test_substrings_still_match(self):
+        self.assertEqual(self.codes('101'), ['CS101', 'PH101'])
+        self.assertEqual(self.codes('gorith'), ['CS101'])
+        self.assertEqual(self.codes('S10 ructur'), ['CS102'])  # Still every word
+        self.assertEqual(self.codes('gorith mech'), [])
+
+    def test_code_matches_rank_first(self):
+        self.assertEqual(self.codes('cs'), ['CS101', 'CS102', 'MA201'])
+
+    def test_index_follows_writes(self):
+        course = Course.objects.get(COURSE_CODE='PH101')
+        course.COURSE_NAME = 'Quantum Mechanics'
+        course.save()
+        self.assertEqual(self.codes('quant'), ['PH101'])
+        course.delete()
+        self.assertEqual(self.codes('mech'), [])
+        BulkUpsert().run(iter([(1, {'COURSE_CODE': 'CS201', 'COURSE_NAME': 'Compilers', 'CATEGORY': 'CBCS',
+                                    'COURSE_CATEGORY': 'COMPULSORY', 'TYPE': 'THEORY', 'CREDIT_SCHEME': 'NEP',
+                                    'CBCS_CATEGORY': 'CORE', 'DISCIPLINE': self.department.pk})]))
+        self.assertEqual(self.codes('compil'), ['CS201'])
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.FTS_TABLE}')
+        self.assertEqual(search.search_course_ids(['compil']), [])
+        self.assertEqual(search.rebuild_index(), 4)
+        self.assertEqual(search.search_course_ids(['compil']), [Course.objects.get(COURSE_CODE='CS201').pk])
+
+    def test_syllabi_by_course(self):
+        syllabus = Syllabus.objects.create(course=Course.objects.get(COURSE_CODE='CS102'))
+        results = self.search('struct', url='/api/courses/syllabi/')
+        self.assertEqual([result['id'] for result in results], [syllabus.pk])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'The course search index is SQLite FTS5')
+@override_settings(COURSE_PAGE_CACHE=None)
+class CoursePaginationTests(TestCase):
+    """?pagination=cursor (or a ?cursor= from a previous page) switches to keyset pagination."""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Computer Science', faculty='SC')
+        courses = [(f'CS{i:03d}', f'Programming {i}' if i % 2 else f'Statistics {i}',
+                    'THEORY' if i % 3 else 'PRACTICAL') for i in range(20)]
+        for code, name, kind in courses + [('AA100', 'CS Seminar', 'THEORY')]:
+            Course.objects.create(COURSE_CODE=code, COURSE_NAME=name, CATEGORY='CBCS', COURSE_CATEGORY='COMPULSORY',
+                                  TYPE=kind, CREDIT_SCHEME='NEP', CBCS_CATEGORY='CORE', DISCIPLINE=department)
+
+    def get(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def codes(self, page):
+        return [course['COURSE_CODE'] for course in page['results']]
+
+    def test_cursor_mode_skips_the_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            page = self.get('/api/courses/courses/', {'pagination': 'cursor', 'limit': 5})
+        self.assertNotIn('count', page)
+        self.assertFalse([query['sql'] for query in queries if 'COUNT(' in query['sql'].upper()])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get('/api/courses/courses/', {'limit': 5})['count'], 21)
+        self.assertTrue([query['sql'] for query in queries if 'COUNT(' in query['sql'].upper()])
+
+    def test_cursor_alone_selects_cursor_mode(self):
+        first = self.get('/api/courses/courses/', {'pagination': 'cursor', 'limit': 5})
+        query = parse_qs(urlsplit(first['next']).query)
+        del query['pagination']
+        second = self.get('/api/courses/courses/', query)
+        self.assertNotIn('count', second)
+        self.assertEqual(self.codes(second), ['CS004', 'CS005', 'CS006', 'CS007', 'CS008'])
+
+    def test_links_walk_a_filtered_search(self):
+        expected = [f'CS{i:03d}' for i in range(20) if i % 2 and i % 3]
+        pages = [self.get('/api/courses/courses/', {'pagination': 'cursor', 'limit': 3, 'TYPE': 'THEORY',
+                                                    'search': 'prog'})]
+        while pages[-1]['next']:
+            pages.append(self.get(pages[-1]['next']))
+        self.assertEqual([code for page in pages for code in self.codes(page)], expected)  # No gaps, no repeats
+
+        back = [pages[-1]]
+        while back[-1]['previous']:
+            back.append(self.get(back[-1]['previous']))
+        self.assertEqual([self.codes(page) for page in reversed(back)], [self.codes(page) for page in pages])
+
+    def test_cursor_order_replaces_relevance(self):
+        ranked = self.codes(self.get('/api/courses/courses/', {'search': 'cs', 'limit': 3}))
+        self.assertEqual(ranked, ['CS000', 'CS001', 'CS002'])  # Code matches rank before the name match
+        ordered = self.codes(self.get('/api/courses/courses/', {'search': 'cs', 'limit': 3, 'pagination': 'cursor'}))
+        self.assertEqual(ordered, ['AA100', 'CS000', 'CS001'])
+
+
+@override_settings(COURSE_PAGE_CACHE=None)  # Both paths must actually run
+class FastListTests(TestCase):
+    """List endpoints served from .values() rows must match the serializer output byte for byte."""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Études\u2028Avancées', faculty='LAMS')
+        user = CustomUser.objects.create_user('teacher@example.com', 'A', 'B', 'password-123')
+        courses = Course.objects.bulk_create([
+            Course(COURSE_CODE=f'FR{i:03d}', COURSE_NAME=f'Cours "{i}" \\ naïve\t😀', CATEGORY='CBCS',
+                   COURSE_CATEGORY='ELECTIVE', TYPE='THEORY', CREDIT_SCHEME='NEP', CBCS_CATEGORY='GE',
+                   DISCIPLINE=department, MAXIMUM_CREDIT=i % 6)
+            for i in range(15)
+        ])
+        for i, course in enumerate(courses[:4]):
+            Syllabus.objects.create(course=course, syllabus_file=f'syllabi/2025/01/0{i + 1}/plan {i}é.pdf',
+                                    uploaded_by=user if i % 2 else None, version=i + 1,
+                                    description=None if i == 2 else 'Line\u2029break')
+
+    def assertSameAsSerializers(self, url):
+        fast = self.client.get(url)
+        with override_settings(FAST_LIST_RESPONSES=False):
+            slow = self.client.get(url)
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+        self.assertEqual(fast['Content-Type'], slow['Content-Type'])
+        return fast.json()
+
+    def test_courses(self):
+        self.assertSameAsSerializers('/api/courses/courses/?page=2&limit=5')
+        self.assertSameAsSerializers('/api/courses/courses/?fields=id,COURSE_NAME')
+        page = self.assertSameAsSerializers('/api/courses/courses/?pagination=cursor&limit=4')
+        self.assertSameAsSerializers(page['next'])
+
+    def test_syllabi(self):
+        self.assertSameAsSerializers('/api/courses/syllabi/')
+        self.assertSameAsSerializers('/api/courses/syllabi/?pagination=cursor&limit=3')
+
+    def test_departments(self):
+        self.assertSameAsSerializers('/api/academic/departments/')
+
+
+@override_settings(DATABASE_READ_REPLICA='default')  # Routing is observable without a second database
+class ReplicaRoutingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Mathematics', faculty='SC')
+        cls.course = Course.objects.create(COURSE_CODE='MA101', COURSE_NAME='Calculus', CATEGORY='CBCS',
+                                           COURSE_CATEGORY='COMPULSORY', TYPE='THEORY', CREDIT_SCHEME='NEP',
+                                           CBCS_CATEGORY='CORE', DISCIPLINE=cls.department)
+        CustomUser.objects.create_user('editor@example.com', 'A', 'B', 'password-123')
+
+    def read_aliases(self, path):
+        aliases = []
+
+        def db_for_read(router, model, **hints):
+            aliases.append(read_alias.get())
+            return read_alias.get()
+
+        with mock.patch.object(ReadReplicaRouter, 'db_for_read', autospec=True, side_effect=db_for_read):
+            self.assertEqual(self.client.get(path).status_code, 200)
+        return aliases
+
+    def test_list_and_retrieve_read_from_replica(self):
+        self.assertIn('default', self.read_aliases('/api/courses/courses/'))
+        self.assertIn('default', self.read_aliases(f'/api/courses/courses/{self.course.pk}/'))
+        self.assertIn('default', self.read_aliases('/api/academic/departments/'))
+        self.assertNotIn('default', self.read_aliases('/api/courses/courses/facets/'))
+
+    def test_write_pins_client_to_primary(self):
+        self.client.post('/api/auth/jwt/create/', {'email': 'editor@example.com', 'password': 'password-123'})
+        response = self.client.patch(f'/api/courses/courses/{self.course.pk}/', {'COURSE_NAME': 'Calculus I'},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('dbPinned', response.cookies)
+        self.assertNotIn('default', self.read_aliases(f'/api/courses/courses/{self.course.pk}/'))
+
+
+class ExportTests(TestCase):
+    """courses/export/ and syllabi/export/ stream every matching row in the negotiated format."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Physics', faculty='SC')
+        cls.courses = [
+            Course.objects.create(COURSE_CODE=code, COURSE_NAME=name, CATEGORY='CBCS', COURSE_CATEGORY='COMPULSORY',
+                                  TYPE=course_type, CREDIT_SCHEME='NEP', CBCS_CATEGORY='CORE', DISCIPLINE=cls.department)
+            for code, name, course_type in [('PH101', 'Mécanique, "classical"', 'THEORY'), ('PH102', 'Optics', 'THEORY'),
+                                            ('PH103', 'Lab', 'PRACTICAL')]
+        ]
+
+    def export(self, url='/api/courses/courses/export/', **params):
+        accept = params.pop('accept', None)
+        response = self.client.get(url, params, **({'HTTP_ACCEPT': accept} if accept else {}))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        with mock.patch('courses.export.ROWS_PER_WRITE', 1):  # Several chunks
+            response, body = self.export(format='csv', TYPE='THEORY')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="courses.csv"')
+        rows = list(csv.DictReader(body.splitlines()))
+        self.assertEqual([row['COURSE_CODE'] for row in rows], ['PH101', 'PH102'])
+        self.assertEqual(rows[0]['COURSE_NAME'], 'Mécanique, "classical"')
+        self.assertEqual(rows[0]['DISCIPLINE__name'], 'Physics')
+        self.assertEqual(self.export(accept='text/csv')[0]['Content-Type'], 'text/csv; charset=utf-8')
+
+    def test_ndjson_and_json(self):
+        _, body = self.export(format='ndjson')
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([line['COURSE_CODE'] for line in lines], ['PH101', 'PH102', 'PH103'])
+        self.assertEqual(lines[0]['DISCIPLINE'], self.department.pk)
+
+        with mock.patch('courses.export.ROWS_PER_WRITE', 2):
+            _, body = self.export(format='json')
+        self.assertEqual([row['COURSE_CODE'] for row in json.loads(body)], ['PH101', 'PH102', 'PH103'])
+        self.assertEqual(self.export(format='json', TYPE='PROJECT')[1], '[]')
+
+    def test_syllabi(self):
+        syllabus = Syllabus.objects.create(course=self.courses[1], description='Week 1')
+        _, body = self.export('/api/courses/syllabi/export/', format='ndjson', course=self.courses[1].pk)
+        [row] = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual((row['id'], row['course__COURSE_CODE'], row['description']), (syllabus.pk, 'PH102', 'Week 1'))
+
+
+@override_settings(COURSE_PAGE_CACHE=None)
+class CourseReadOptionsTests(TestCase):
+    """?fields= trims the columns, ?expand= embeds relations; unknown names are a 400."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Physics', faculty='SC')
+        cls.courses = [
+            Course.objects.create(COURSE_CODE=f'PH10{i}', COURSE_NAME=f'Physics {i}', CATEGORY='CBCS',
+                                  COURSE_CATEGORY='COMPULSORY', TYPE='THEORY', CREDIT_SCHEME='NEP',
+                                  CBCS_CATEGORY='CORE', DISCIPLINE=cls.department)
+            for i in range(3)
+        ]
+        for course in cls.courses:
+            Syllabus.objects.create(course=course)
+
+    def test_fields(self):
+        data = self.client.get('/api/courses/courses/', {'fields': 'COURSE_CODE, COURSE_NAME'}).json()
+        self.assertEqual(set(data['results'][0]), {'COURSE_CODE', 'COURSE_NAME'})
+        data = self.client.get(f'/api/courses/courses/{self.courses[0].pk}/', {'fields': 'id'}).json()
+        self.assertEqual(data, {'id': self.courses[0].pk})
+
+    def test_expand(self):
+        with self.assertNumQueries(5):  # Counters, count, page, departments, syllabi: none per course
+            data = self.client.get('/api/courses/courses/', {'expand': 'discipline,syllabi'}).json()
+        course = data['results'][0]
+        self.assertEqual(course['DISCIPLINE'], {'id': self.department.pk, 'name': 'Physics', 'faculty': 'SC'})
+        self.assertEqual([syllabus['course'] for syllabus in course['syllabi']], [course['id']])
+
+        data = self.client.get('/api/courses/courses/', {'expand': 'discipline', 'fields': 'COURSE_CODE'}).json()
+        self.assertEqual(set(data['results'][0]), {'COURSE_CODE'})  # Nothing to expand into
+
+    def test_unknown_names(self):
+        response = self.client.get('/api/courses/courses/', {'fields': 'COURSE_CODE,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['fields'])
+        response = self.client.get(f'/api/courses/courses/{self.courses[0].pk}/', {'expand': 'teachers'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('teachers', response.json()['expand'])
+
+
+class FacetCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.physics = Department.objects.create(name='Physics', faculty='SC')
+        cls.history = Department.objects.create(name='History', faculty='LAMS')
+        for code, department, course_type, credits in [('PH101', cls.physics, 'THEORY', 4),
+                                                       ('PH102', cls.physics, 'PRACTICAL', 2),
+                                                       ('HI101', cls.history, 'THEORY', 4)]:
+            Course.objects.create(COURSE_CODE=code, COURSE_NAME=code, CATEGORY='CBCS', COURSE_CATEGORY='COMPULSORY',
+                                  TYPE=course_type, CREDIT_SCHEME='NEP', CBCS_CATEGORY='CORE', DISCIPLINE=department,
+                                  MAXIMUM_CREDIT=credits)
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def facets(self, **params):
+        return self.client.get('/api/courses/courses/facets/', params).json()
+
+    def counts(self, data, field):
+        return {facet['value']: facet['count'] for facet in data['facets'][field] if facet['count']}
+
+    def test_counts(self):
+        data = self.facets()
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(self.counts(data, 'TYPE'), {'THEORY': 2, 'PRACTICAL': 1})
+        self.assertEqual(len(data['facets']['TYPE']), len(Course.TYPE_CHOICES))  # Zero counts included
+        self.assertEqual(data['facets']['DISCIPLINE'], [
+            {'value': self.history.pk, 'label': str(self.history), 'count': 1},
+            {'value': self.physics.pk, 'label': str(self.physics), 'count': 2},
+        ])
+
+        data = self.facets(MAXIMUM_CREDIT__gte=3)
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(self.counts(data, 'DISCIPLINE'), {self.physics.pk: 1, self.history.pk: 1})
+
+    def test_cached_per_filter_until_a_write(self):
+        self.facets(TYPE='THEORY', limit=5)
+        with self.assertNumQueries(1):  # The change counters only; paging parameters are not part of the key
+            data = self.facets(TYPE='THEORY', page=2)
+        self.assertEqual(data['count'], 2)
+
+        Course.objects.get(COURSE_CODE='HI101').delete()
+        self.assertEqual(self.facets(TYPE='THEORY')['count'], 1)
+        self.physics.name = 'Applied Physics'
+        self.physics.save()
+        [discipline] = self.facets(TYPE='THEORY')['facets']['DISCIPLINE']
+        self.assertEqual(discipline['label'], str(self.physics))
+
+
+class BulkUpsertTests(TestCase):
+    """POST courses/bulk/: streamed CSV or NDJSON, upserted on COURSE_CODE, errors reported per row."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Physics', faculty='SC')
+        cls.user = CustomUser.objects.create_user('editor@example.com', 'Test', 'Editor', password='pass-1234')
+        Course.objects.create(COURSE_CODE='PH101', COURSE_NAME='Mechanics', CATEGORY='CBCS', COURSE_CATEGORY='COMPULSORY',
+                              TYPE='THEORY', CREDIT_SCHEME='NEP', CBCS_CATEGORY='CORE', DISCIPLINE=cls.department,
+                              MAXIMUM_CREDIT=4, QUALIFYING_IN_NATURE='YES')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, body, content_type):
+        response = self.client.generic('POST', '/api/courses/courses/bulk/', body, content_type=content_type)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def errors(self, report):
+        return {error['row']: sorted(error['errors']) for error in report['errors']}
+
+    def test_csv(self):
+        report = self.post(
+            'COURSE_CODE,COURSE_NAME,CATEGORY,COURSE_CATEGORY,TYPE,CREDIT_SCHEME,CBCS_CATEGORY,DISCIPLINE,MAXIMUM_CREDIT\n'
+            f'PH102,Optics,CBCS,ELECTIVE,THEORY,NEP,CORE,{self.department.pk},3\n'
+            'PH103,Waves\n'  # Short: the missing cells are not supplied
+            f'PH104,Heat,CBCS,ELECTIVE,THEORY,NEP,CORE,{self.department.pk},3,extra\n'
+            f'PH105,Sound,CBCS,ELECTIVE,LECTURE,NEP,CORE,{self.department.pk},30\n',
+            'text/csv',
+        )
+        self.assertEqual((report['rows'], report['created'], report['updated'], report['failed']), (4, 1, 0, 3))
+        errors = self.errors(report)
+        self.assertIn('CATEGORY', errors[3])
+        self.assertIn('DISCIPLINE', errors[3])
+        self.assertEqual(errors[4], ['non_field_errors'])
+        self.assertEqual(errors[5], ['MAXIMUM_CREDIT', 'TYPE'])
+        self.assertEqual(Course.objects.get(COURSE_CODE='PH102').MAXIMUM_CREDIT, 3)
+
+    def test_ndjson(self):
+        report = self.post('\n'.join([
+            json.dumps({'COURSE_CODE': 101, 'COURSE_NAME': 'Numbers', 'CATEGORY': 'CBCS', 'COURSE_CATEGORY': 'ELECTIVE',
+                        'TYPE': 'THEORY', 'CREDIT_SCHEME': 'NEP', 'CBCS_CATEGORY': 'CORE',
+                        'DISCIPLINE__name': 'Physics', 'MAXIMUM_CREDIT': 2}),
+            json.dumps({'COURSE_CODE': 'PH106', 'COURSE_NAME': ['Not', 'text']}),
+            '{"COURSE_CODE": "PH107",',
+            '[1, 2]',
+            '',
+        ]), 'application/x-ndjson')
+        self.assertEqual((report['rows'], report['created'], report['failed']), (4, 1, 3))
+        self.assertEqual(self.errors(report), {2: ['COURSE_NAME'], 3: ['non_field_errors'], 4: ['non_field_errors']})
+        self.assertEqual(Course.objects.get(COURSE_CODE='101').MAXIMUM_CREDIT, 2)
+
+    def test_partial_update(self):
+        report = self.post(json.dumps({'COURSE_CODE': 'PH101', 'COURSE_NAME': 'Classical Mechanics'}),
+                           'application/x-ndjson')
+        self.assertEqual((report['updated'], report['failed']), (1, 0))
+        course = Course.objects.get(COURSE_CODE='PH101')
+        self.assertEqual((course.COURSE_NAME, course.MAXIMUM_CREDIT, course.QUALIFYING_IN_NATURE, course.DISCIPLINE_id),
+                         ('Classical Mechanics', 4, 'YES', self.department.pk))
+
+        report = self.post('COURSE_CODE,MAXIMUM_CREDIT,TYPE\nPH101,6,\n', 'text/csv')
+        self.assertEqual(report['updated'], 1)
+        course.refresh_from_db()
+        self.assertEqual((course.COURSE_NAME, course.MAXIMUM_CREDIT, course.TYPE), ('Classical Mechanics', 6, 'THEORY'))
+
+    def test_duplicate_codes_in_a_batch(self):
+        report = self.post('COURSE_CODE,COURSE_NAME\nPH101,Statics\nPH101,Dynamics\nPH101,Kinematics\n', 'text/csv')
+        self.assertEqual((report['rows'], report['updated'], report['failed']), (3, 1, 2))
+        self.assertEqual(self.errors(report), {2: ['COURSE_CODE'], 3: ['COURSE_CODE']})  # Line numbers
+        self.assertEqual(report['errors'][0]['errors']['COURSE_CODE'],
+                         ['Superseded by row 3, which has the same COURSE_CODE.'])
+        self.assertEqual(Course.objects.get(COURSE_CODE='PH101').COURSE_NAME, 'Kinematics')
+
+    def test_unsupported_content_type(self):
+        response = self.client.post('/api/courses/courses/bulk/', {'COURSE_CODE': 'PH101'}, format='json')
+        self.assertEqual(response.status_code, 415)
+
+
+class ConditionalGetTests(TestCase):
+    """List and detail GETs revalidate against the change counters without reading the tables."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Physics', faculty='SC')
+        cls.course = Course.objects.create(COURSE_CODE='PH101', COURSE_NAME='Mechanics', CATEGORY='CBCS',
+                                           COURSE_CATEGORY='COMPULSORY', TYPE='THEORY', CREDIT_SCHEME='NEP',
+                                           CBCS_CATEGORY='CORE', DISCIPLINE=cls.department)
+
+    def test_not_modified_until_a_write(self):
+        for url, shown in [('/api/academic/departments/', self.department),
+                           (f'/api/courses/courses/{self.course.pk}/', self.course)]:
+            response = self.client.get(url)
+            etag = response['ETag']
+            self.assertEqual(response.status_code, 200)
+            with self.assertNumQueries(1):  # The counters only
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['ETag'], etag)
+
+            shown.save()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_bulk_and_queryset_writes_bump(self):
+        etag = self.client.get('/api/courses/syllabi/')['ETag']
+        syllabus = Syllabus.objects.create(course=self.course)
+        self.assertEqual(self.client.get('/api/courses/syllabi/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        etag = self.client.get('/api/courses/syllabi/')['ETag']
+        processing.claim(10)  # A queryset update, no signals
+        self.assertEqual(Syllabus.objects.get(pk=syllabus.pk).processing_status, 'PROCESSING')
+        self.assertEqual(self.client.get('/api/courses/syllabi/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_only_the_models_shown_count(self):
+        urls = ['/api/courses/courses/', '/api/courses/courses/?expand=discipline', '/api/courses/courses/?expand=syllabi']
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        revalidate = lambda: [self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code for url, etag in zip(urls, etags)]
+        self.department.save()
+        self.assertEqual(revalidate(), [304, 200, 304])
+        Syllabus.objects.create(course=self.course)
+        self.assertEqual(revalidate(), [304, 200, 200])
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        CustomUser.objects.create_user('teacher@example.com', 'Test', 'Teacher', password='x')
+        self.assertEqual(revalidate(), [304, 304, 200])  # Syllabi show their uploader's email
+
+    def test_uploader_changes_revalidate_syllabi(self):
+        user = CustomUser.objects.create_user('teacher@example.com', 'Test', 'Teacher', password='x')
+        syllabus = Syllabus.objects.create(course=self.course, uploaded_by=user)
+        url = f'/api/courses/syllabi/{syllabus.pk}/'
+        etag = self.client.get(url)['ETag']
+        user.email = 'lecturer@example.com'
+        user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['uploaded_by'], 'lecturer@example.com')
+
+    def test_media_type_parameters(self):
+        compact = self.client.get('/api/courses/courses/')
+        indented = self.client.get('/api/courses/courses/', HTTP_ACCEPT='application/json; indent=4')
+        self.assertNotEqual(indented['ETag'], compact['ETag'])
+        self.assertEqual(self.client.get('/api/courses/courses/', HTTP_ACCEPT='application/json; indent=4',
+                                         HTTP_IF_NONE_MATCH=compact['ETag']).status_code, 200)
+
+
+class CoursePageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Biology', faculty='LS')
+        Course.objects.create(COURSE_CODE='BI101', COURSE_NAME='Cells', CATEGORY='CBCS', COURSE_CATEGORY='COMPULSORY',
+                              TYPE='THEORY', CREDIT_SCHEME='NEP', CBCS_CATEGORY='CORE', DISCIPLINE=cls.department)
+
+    def setUp(self):
+        caches['pages'].clear()
+
+    def test_hit_until_bulk_upsert(self):
+        first = self.client.get('/api/courses/courses/?TYPE=THEORY&limit=5')
+        with self.assertNumQueries(1):  # The counters only
+            second = self.client.get('/api/courses/courses/?limit=5&TYPE=THEORY')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+
+        BulkUpsert().run(iter([(1, {'COURSE_CODE': 'BI101', 'COURSE_NAME': 'Genes', 'CATEGORY': 'CBCS',
+                                    'COURSE_CATEGORY': 'COMPULSORY', 'TYPE': 'THEORY', 'CREDIT_SCHEME': 'NEP',
+                                    'CBCS_CATEGORY': 'CORE', 'DISCIPLINE': self.department.pk})]))
+        data = self.client.get('/api/courses/courses/?limit=5&TYPE=THEORY').json()
+        self.assertEqual([course['COURSE_NAME'] for course in data['results']], ['Genes'])
+        self.assertIn('cache_requests_total{cache="course_pages",result="hit"}', self.client.get('/metrics').content.decode())
+
+    def test_media_type_parameters(self):
+        compact = self.client.get('/api/courses/courses/')
+        indented = self.client.get('/api/courses/courses/', HTTP_ACCEPT='application/json; indent=4')
+        self.assertIn(b'\n    "count": 1', indented.content)
+        self.assertEqual(json.loads(indented.content), json.loads(compact.content))
+        self.assertEqual(self.client.get('/api/courses/courses/').content, compact.content)
+
+
+class AsyncReadURLConf:
+    """The course and department routes as mounted when settings.ASYNC_READ_VIEWS is on (ASGI)."""
+    urlpatterns = [
+        path('api/academic/', include(academic_urls.async_read_urlpatterns() + academic_urls.urlpatterns)),
+        path('api/courses/', include(course_urls.async_read_urlpatterns() + course_urls.urlpatterns)),
+    ]
+
+
+@override_settings(ROOT_URLCONF=AsyncReadURLConf)
+class AsyncReadRouteTests(TestCase):
+    """The async list/detail routes come before the router's and must not swallow its actions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Botany', faculty='LS')
+        cls.course = Course.objects.create(COURSE_CODE='BO101', COURSE_NAME='Plants', CATEGORY='CBCS',
+                                           COURSE_CATEGORY='COMPULSORY', TYPE='THEORY', CREDIT_SCHEME='NEP',
+                                           CBCS_CATEGORY='CORE', DISCIPLINE=department)
+
+    def test_every_viewset_action_resolves_to_its_view(self):
+        for prefix, module in [('/api/courses/', course_urls), ('/api/academic/', academic_urls)]:
+            shadows = {pattern.name: pattern.callback for pattern in module.async_read_urlpatterns()}
+            for pattern in module.router.urls:
+                groups = pattern.pattern.regex.groupindex
+                if 'format' in groups:
+                    continue
+                url = prefix + reverse(pattern.name, kwargs={'pk': 1} if 'pk' in groups else {}, urlconf=module)[1:]
+                match = resolve(url)
+                self.assertEqual(match.url_name, pattern.name, url)
+                self.assertIs(match.func, shadows.get(pattern.name, pattern.callback), url)
+
+    def test_list_actions_answer(self):
+        for url in ['/api/courses/courses/autocomplete/?q=bo', '/api/courses/courses/facets/',
+                    '/api/courses/courses/export/?format=csv', '/api/courses/syllabi/current/']:
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+        self.assertEqual(self.client.post('/api/courses/courses/bulk/').status_code, 401)
+        response = self.client.get(f'/api/courses/courses/{self.course.pk}/')
+        self.assertEqual(response.json()['COURSE_CODE'], 'BO101')
+
+
+class AsyncReadParityTests(TestCase):
+    """The async list/detail views answer exactly what the DRF viewsets do."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Chemistry', faculty='SC')
+        cls.courses = [
+            Course.objects.create(COURSE_CODE=code, COURSE_NAME=name, CATEGORY='CBCS', COURSE_CATEGORY='COMPULSORY',
+                                  TYPE=kind, CREDIT_SCHEME='NEP', CBCS_CATEGORY='CORE', DISCIPLINE=cls.department)
+            for code, name, kind in [('CH300', 'Spectroscopy', 'THEORY'), ('CH100', 'Atoms', 'LAB'),
+                                     ('CH200', 'Bonds', 'THEORY')]
+        ]
+        cls.syllabi = [Syllabus.objects.create(course=course) for course in reversed(cls.courses)]
+
+    def setUp(self):
+        caches['pages'].clear()
+
+    def assertSameResponse(self, url, **headers):
+        expected = self.client.get(url, **headers)
+        with override_settings(ROOT_URLCONF=AsyncReadURLConf):
+            self.assertTrue(asyncio.iscoroutinefunction(resolve(url.partition('?')[0]).func), url)
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, expected.status_code, url)
+        for header in ['Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Vary']:
+            self.assertEqual(response.get(header), expected.get(header), f'{url} {header}')
+        self.assertEqual(response.content, expected.content, url)
+        return response
+
+    def test_lists(self):
+        for query in ['', '?limit=2&page=2', '?page=last', '?page=9', '?TYPE=THEORY', '?TYPE__in=LAB,THEORY',
+                      '?TYPE=BOGUS', '?DISCIPLINE=x', '?MAXIMUM_CREDIT__gte=2', '?search=CH1']:
+            self.assertSameResponse(f'/api/courses/courses/{query}')
+        course = self.courses[0].pk
+        for query in ['', '?limit=1', f'?course={course}', '?course=999999', '?course=x', '?search=Bonds']:
+            self.assertSameResponse(f'/api/courses/syllabi/{query}')
+        self.assertSameResponse('/api/academic/departments/')
+
+    def test_details(self):
+        course = self.courses[0].pk
+        for url in [f'/api/courses/courses/{course}/', f'/api/courses/courses/{course}/?TYPE=LAB',
+                    '/api/courses/courses/999999/', f'/api/courses/syllabi/{self.syllabi[0].pk}/',
+                    '/api/courses/syllabi/999999/', f'/api/academic/departments/{self.department.pk}/',
+                    '/api/academic/departments/999999/']:
+            self.assertSameResponse(url)
+
+    def test_negotiation(self):
+        for url in ['/api/courses/courses/', f'/api/courses/syllabi/{self.syllabi[0].pk}/', '/api/courses/courses/?TYPE=BOGUS']:
+            self.assertSameResponse(url, HTTP_ACCEPT='application/json; indent=4')
+            self.assertSameResponse(url, HTTP_ACCEPT='text/csv')  # 406 from the sync view
+
+    def test_not_modified(self):
+        for url in ['/api/courses/courses/?TYPE=THEORY', f'/api/courses/courses/{self.courses[0].pk}/',
+                    f'/api/courses/syllabi/?course={self.courses[0].pk}', '/api/academic/departments/']:
+            etag = self.client.get(url)['ETag']  # From the sync view: both paths build the same validators
+            self.assertEqual(self.assertSameResponse(url, HTTP_IF_NONE_MATCH=etag).status_code, 304, url)
+            with override_settings(ROOT_URLCONF=AsyncReadURLConf), self.assertNumQueries(1):  # The counters only
+                self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_page_cache(self):
+        url = '/api/courses/courses/?limit=2'
+        with override_settings(ROOT_URLCONF=AsyncReadURLConf):
+            first = self.client.get(url)
+            with self.assertNumQueries(1):  # The counters only
+                second = self.client.get(url)
+        self.assertEqual(second.content, first.content)
+        with self.assertNumQueries(1):  # The sync view reads the same entry
+            self.assertEqual(self.client.get(url).content, first.content)
+
+
+class CurrentSyllabusTests(TestCase):
+    """The current syllabus of a course is its latest active version, kept by the signals."""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Chemistry', faculty='SC')
+        cls.organic, cls.inorganic = [
+            Course.objects.create(COURSE_CODE=code, COURSE_NAME=code, CATEGORY='CBCS', COURSE_CATEGORY='COMPULSORY',
+                                  TYPE='THEORY', CREDIT_SCHEME='NEP', CBCS_CATEGORY='CORE', DISCIPLINE=department)
+            for code in ('CH101', 'CH102')
+        ]
+
+    def current(self, **params):
+        response = self.client.get('/api/courses/syllabi/current/', params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        syllabi = data if 'courses' in params else data['results']  # Explicit ids are not paginated
+        return [(syllabus['course'], syllabus['id']) for syllabus in syllabi]
+
+    def test_latest_active_version(self):
+        first = Syllabus.objects.create(course=self.organic, version=1)
+        second = Syllabus.objects.create(course=self.organic, version=2)
+        Syllabus.objects.create(course=self.organic, version=3, is_active=False)
+        moved = Syllabus.objects.create(course=self.inorganic, version=1)
+        self.assertEqual(self.current(), [(self.organic.pk, second.pk), (self.inorganic.pk, moved.pk)])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.current(courses=f'{self.inorganic.pk}'), [(self.inorganic.pk, moved.pk)])
+
+        second.is_active = False
+        second.save()
+        self.assertEqual(self.current(), [(self.organic.pk, first.pk), (self.inorganic.pk, moved.pk)])
+        moved.course = self.organic
+        moved.save()
+        self.assertEqual(self.current(), [(self.organic.pk, moved.pk)])  # Ties on version go to the newest
+        moved.delete()
+        self.assertEqual(self.current(), [(self.organic.pk, first.pk)])
+
+        incremental = sorted(CurrentSyllabus.objects.values_list('course_id', 'syllabus_id'))
+        self.assertEqual(CurrentSyllabus.rebuild(), 1)
+        self.assertEqual(sorted(CurrentSyllabus.objects.values_list('course_id', 'syllabus_id')), incremental)
+
+    def test_course_ids_are_validated(self):
+        response = self.client.get('/api/courses/syllabi/current/', {'courses': '1,x'})
+        self.assertEqual(response.status_code, 400)
+        with mock.patch.object(SyllabusViewSet, 'max_current_courses', 1):
+            response = self.client.get('/api/courses/syllabi/current/', {'courses': '1,2'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class SyllabusDownloadTests(TestCase):
+    BODY = b'%PDF-1.4\n' + bytes(range(256)) * 4 + b'\n%%EOF\n'
+
+    def setUp(self):
+        department = Department.objects.create(name='Chemistry', faculty='SC')
+        course = Course.objects.create(COURSE_CODE='CH101', COURSE_NAME='Chemistry', CATEGORY='CBCS',
+                                       COURSE_CATEGORY='COMPULSORY', TYPE='THEORY', CREDIT_SCHEME='NEP',
+                                       CBCS_CATEGORY='CORE', DISCIPLINE=department)
+        self.syllabus = Syllabus(course=course)
+        self.syllabus.syllabus_file.save('plan.pdf', ContentFile(self.BODY))
+        self.url = f'/api/courses/syllabi/{self.syllabus.pk}/download/'
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_whole_file_and_revalidation(self):
+        response, body = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.BODY)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        filename = self.syllabus.syllabus_file.name.rsplit('/', 1)[-1]
+        self.assertEqual(response['Content-Disposition'], f'inline; filename="{filename}"')
+        response, body = self.get(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual((response.status_code, body), (304, b''))
+
+    def test_ranges(self):
+        response, body = self.get(HTTP_RANGE='bytes=0-7')
+        self.assertEqual((response.status_code, body), (206, self.BODY[:8]))
+        self.assertEqual(response['Content-Range'], f'bytes 0-7/{len(self.BODY)}')
+        response, body = self.get(HTTP_RANGE='bytes=-6')
+        self.assertEqual((response.status_code, body), (206, self.BODY[-6:]))
+        response, body = self.get(HTTP_RANGE=f'bytes={len(self.BODY)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.BODY)}')
+        response, body = self.get(HTTP_RANGE='bytes=0-1,4-5')  # Multiple ranges: the whole file
+        self.assertEqual((response.status_code, body), (200, self.BODY))
+
+    def test_if_range(self):
+        etag = self.get()[0]['ETag']
+        response, body = self.get(HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE=etag)
+        self.assertEqual((response.status_code, body), (206, self.BODY[10:20]))
+        response, body = self.get(HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"stale"')
+        self.assertEqual((response.status_code, body), (200, self.BODY))
+        response, body = self.get(HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='Sat, 01 Jan 2000 00:00:00 GMT')
+        self.assertEqual((response.status_code, body), (200, self.BODY))
+        last_modified = self.get()[0]['Last-Modified']
+        response, body = self.get(HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE=last_modified)
+        self.assertEqual((response.status_code, body), (206, self.BODY[10:20]))
+        response, body = self.get(HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual((response.status_code, body), (200, self.BODY))  # Not the copy's date either
+
+    def test_offloaded_names_are_encoded(self):
+        self.syllabus.syllabus_file.save('plan é.pdf', ContentFile(self.BODY))
+        name = self.syllabus.syllabus_file.name
+        response = downloads.serve_file(RequestFactory().get(self.url), self.syllabus.syllabus_file,
+                                        offload='x-accel-redirect')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + name.replace('é', '%C3%A9'))
+        self.assertEqual(response['Content-Disposition'], "inline; filename*=utf-8''plan_%C3%A9.pdf")
+
+    def test_missing_file(self):
+        self.syllabus.syllabus_file.storage.delete(self.syllabus.syllabus_file.name)
+        self.assertEqual(self.get()[0].status_code, 404)
+        Syllabus.objects.filter(pk=self.syllabus.pk).update(syllabus_file='')
+        self.assertEqual(self.get()[0].status_code, 404)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class SyllabusUploadTests(TestCase):
+    BODY = b'%PDF-1.4\n' + b'0123456789' * 30 + b'\n%%EOF\n'
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Chemistry', faculty='SC')
+        cls.course = Course.objects.create(COURSE_CODE='CH101', COURSE_NAME='Chemistry', CATEGORY='CBCS',
+                                           COURSE_CATEGORY='COMPULSORY', TYPE='THEORY', CREDIT_SCHEME='NEP',
+                                           CBCS_CATEGORY='CORE', DISCIPLINE=department)
+        cls.user = CustomUser.objects.create_user('teacher@example.com', 'Test', 'Teacher', password='pass-1234')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def start(self, body=BODY, **fields):
+        response = self.client.post('/api/courses/syllabus-uploads/', {
+            'course': self.course.pk, 'filename': 'plan.pdf', 'size': len(body), 'version': 2, **fields,
+        })
+        self.assertEqual(response.status_code, 201, response.content)
+        return f"/api/courses/syllabus-uploads/{response.json()['id']}/"
+
+    def put(self, url, body, start, end=None, total=None):
+        end = start + len(body) - 1 if end is None else end
+        total = len(self.BODY) if total is None else total
+        return self.client.put(url, body, content_type='application/octet-stream',
+                               HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{total}')
+
+    def test_resume_and_complete(self):
+        url = self.start()
+        self.assertEqual(self.put(url, self.BODY[:100], 0).json()['received'], 100)
+        self.assertEqual(self.client.get(url).json()['received'], 100)
+
+        conflict = self.put(url, self.BODY[50:150], 50)  # A retry of bytes already stored
+        self.assertEqual(conflict.status_code, 409)
+        self.assertEqual(conflict.json()['received'], 100)
+
+        response = self.put(url, self.BODY[100:], 100)
+        self.assertEqual(response.status_code, 201)
+        syllabus = Syllabus.objects.get(pk=response.json()['id'])
+        self.assertEqual((syllabus.course_id, syllabus.version, syllabus.uploaded_by_id), (self.course.pk, 2, self.user.pk))
+        with syllabus.syllabus_file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.BODY)
+        self.assertEqual(self.client.get(url).json()['status'], 'COMPLETE')
+        self.assertEqual(self.put(url, self.BODY[:10], 0).status_code, 400)  # Already complete
+
+    def test_session_validation(self):
+        response = self.client.post('/api/courses/syllabus-uploads/', {
+            'course': self.course.pk, 'filename': 'plan.docx', 'size': 10})
+        self.assertEqual(set(response.json()), {'filename'})
+        response = self.client.post('/api/courses/syllabus-uploads/', {
+            'course': self.course.pk, 'filename': 'plan.pdf', 'size': uploads.MAX_UPLOAD_SIZE + 1})
+        self.assertEqual(set(response.json()), {'size'})
+
+    def test_chunk_validation(self):
+        url = self.start()
+        self.assertEqual(self.client.put(url, self.BODY[:10], content_type='application/octet-stream').status_code, 400)
+        self.assertEqual(self.put(url, self.BODY[:10], 0, total=999).status_code, 400)  # Not the declared size
+        self.assertEqual(self.put(url, self.BODY[:10], 0, end=len(self.BODY)).status_code, 400)  # Past the end
+        self.assertEqual(self.put(url, self.BODY[:10], 0, end=19).status_code, 400)  # Shorter than announced
+        self.assertEqual(self.put(url, b'GIF89a' + self.BODY[6:20], 0).status_code, 400)  # Not a PDF
+        self.assertEqual(self.client.get(url).json()['received'], 0)
+
+        truncated = self.BODY[:-7] + b'\n\n\n\n\n\n\n'  # Same size, no %%EOF
+        response = self.put(url, truncated, 0)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 404)  # The session is dropped
+        self.assertFalse(Syllabus.objects.exists())
+
+    def test_sessions_are_private_and_can_be_abandoned(self):
+        url = self.start()
+        self.put(url, self.BODY[:100], 0)
+        other = APIClient()
+        other.force_authenticate(CustomUser.objects.create_user('other@example.com', 'Other', 'User', password='x'))
+        self.assertEqual(other.get(url).status_code, 404)
+        self.assertEqual(other.put(url, self.BODY[100:], content_type='application/octet-stream',
+                                   HTTP_CONTENT_RANGE=f'bytes 100-{len(self.BODY) - 1}/{len(self.BODY)}').status_code, 404)
+
+        upload = SyllabusUpload.objects.get()
+        self.assertTrue(os.path.exists(uploads.part_path(upload)))
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(os.path.exists(uploads.part_path(upload)))
+        self.assertFalse(SyllabusUpload.objects.exists())
+
+    def test_losing_writer_leaves_the_part_file_alone(self):
+        self.start()
+        first, second = SyllabusUpload.objects.get(), SyllabusUpload.objects.get()  # Both read received=0
+        uploads.write_chunk(first, io.BytesIO(self.BODY[:100]), 0, 99, len(self.BODY))
+        with self.assertRaises(uploads.UploadConflict):
+            uploads.write_chunk(second, io.BytesIO(b'%PDF-1.4\n' + b'x' * 91), 0, 99, len(self.BODY))
+        with open(uploads.part_path(first), 'rb') as part:
+            self.assertEqual(part.read(), self.BODY[:100])
+        self.assertEqual([name for name in os.listdir(os.path.dirname(uploads.part_path(first)))
+                          if name.startswith(f'{first.pk}.')], [f'{first.pk}.part'])  # No chunk files left
+
+    def test_failed_completion_can_be_finished_later(self):
+        url = self.start()
+        self.put(url, self.BODY[:100], 0)
+        with mock.patch.object(Syllabus, 'save', side_effect=DatabaseError('disk full')):
+            with self.assertRaises(DatabaseError):
+                self.put(url, self.BODY[100:], 100)
+        upload = SyllabusUpload.objects.get()
+        with open(uploads.part_path(upload), 'rb') as part:  # Moved back
+            self.assertEqual(part.read(), self.BODY)
+        self.assertEqual((upload.received, upload.status), (len(self.BODY), 'UPLOADING'))
+
+        response = self.put(url, self.BODY[100:], 100)
+        self.assertEqual(response.status_code, 201)
+        with Syllabus.objects.get().syllabus_file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.BODY)
+
+
+class CatalogBundleTests(TestCase):
+    """The bundle is addressed by a hash of its bytes and moves when departments change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Physics', faculty='SC')
+
+    def setUp(self):
+        catalog._bundle = None
+
+    def test_pointer_and_bundle(self):
+        pointer = self.client.get('/api/courses/catalog/')
+        self.assertEqual(pointer['Cache-Control'], 'no-cache')
+        version = pointer.json()['version']
+        self.assertEqual(pointer.json()['url'], f'http://testserver/api/courses/catalog/{version}/')
+
+        response = self.client.get(f'/api/courses/catalog/{version}/')
+        self.assertEqual(version, hashlib.sha256(response.content).hexdigest()[:20])
+        self.assertEqual(response['Cache-Control'], catalog.IMMUTABLE_CACHE_CONTROL)
+        data = response.json()
+        self.assertEqual(data['departments'], [{'id': self.department.pk, 'name': 'Physics', 'faculty': 'SC'}])
+        self.assertEqual(data['course_choices'], self.client.get('/api/courses/choices/').json())
+        self.assertEqual(self.client.get(f'/api/courses/catalog/{version}/',
+                                         HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        with self.assertNumQueries(1):  # The Department counter; the bytes are kept in memory
+            self.assertEqual(self.client.get('/api/courses/catalog/').json()['version'], version)
+
+    def test_department_edit_moves_the_version(self):
+        version = self.client.get('/api/courses/catalog/').json()['version']
+        self.department.name = 'Applied Physics'
+        self.department.save()
+        current = self.client.get('/api/courses/catalog/').json()['version']
+        self.assertNotEqual(current, version)
+
+        stale = self.client.get(f'/api/courses/catalog/{version}/')
+        self.assertEqual(stale.status_code, 404)
+        self.assertEqual(stale.json()['version'], current)
+        self.assertEqual(self.client.get(f'/api/courses/catalog/{current}/').json()['departments'][0]['name'],
+                         'Applied Physics')
+
+
+class TypeaheadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Computer Science', faculty='SC')
+        for code, name in [('CS101', 'Introduction to Programming'), ('CS102', 'Data Structures'),
+                           ('MA101', 'Introduction to Statistics'), ('CS-201', 'Programming Languages')]:
+            Course.objects.create(COURSE_CODE=code, COURSE_NAME=name, CATEGORY='CBCS', COURSE_CATEGORY='COMPULSORY',
+                                  TYPE='THEORY', CREDIT_SCHEME='NEP', CBCS_CATEGORY='CORE', DISCIPLINE=cls.department)
+
+    def setUp(self):
+        typeahead_index.clear()
+
+    def codes(self, query, **params):
+        data = self.client.get('/api/courses/courses/autocomplete/', {'q': query, **params}).json()
+        return [course['COURSE_CODE'] for course in data]
+
+    def test_matches_without_queries(self):
+        self.codes('cs')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.codes('cs'), ['CS101', 'CS102', 'CS-201'])
+        self.assertEqual(self.codes('cs 2'), ['CS-201'])
+        self.assertEqual(self.codes('intro'), ['CS101', 'MA101'])
+        self.assertEqual(self.codes('prog intro'), ['CS101'])
+        self.assertEqual(self.codes('PROGRAM', limit=1), ['CS101'])
+        self.assertEqual(self.codes(''), [])
+
+    def test_sync_applies_other_writes(self):
+        self.codes('cs')
+        # As another process would: no signals reach this index, only the change counter
+        Course.objects.filter(COURSE_CODE='CS102').update(COURSE_NAME='Algorithms', updated_at=timezone.now())
+        Course.objects.filter(COURSE_CODE='MA101').delete()
+        versions.bump(Course)
+        self.assertEqual(self.codes('data'), ['CS102'])  # Until the next sync
+        typeahead_index._next_sync = 0
+        self.assertEqual(self.codes('algo'), ['CS102'])
+        self.assertEqual(self.codes('data'), [])
+        self.assertEqual(self.codes('intro'), ['CS101'])
+
+    def test_sync_reads_changed_rows_only(self):
+        Course.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        self.codes('cs')
+        Course.objects.filter(COURSE_CODE='CS102').update(COURSE_NAME='Algorithms', updated_at=timezone.now())
+        Course.objects.filter(COURSE_CODE='CS101').update(COURSE_NAME='Compilers')  # Unstamped: not read
+        versions.bump(Course)
+        typeahead_index._next_sync = 0
+        with self.assertNumQueries(3):  # Counter, stamped rows, count; no ids without deletes
+            typeahead_index.maybe_sync()
+        self.assertEqual(self.codes('algo'), ['CS102'])
+        self.assertEqual(self.codes('intro'), ['CS101', 'MA101'])
+
+    def test_many_changes_sort_once(self):
+        rows = [(pk, f'C{pk}', f'Course {pk}') for pk in range(1, 200)]
+        changed = [(pk, f'D{pk}', f'Renamed {pk}') for pk in range(1, 200, 2)]
+        self.assertGreaterEqual(len(changed), REBUILD_AFTER)
+        for updates, removed in [(changed, {2, 4}), (changed[:3], {2, 4})]:
+            entries = Entries.build(rows).changed(updates, removed)
+            final = {pk: (code, name) for pk, code, name in rows + updates if pk not in removed}
+            expected = Entries.build((pk, code, name) for pk, (code, name) in final.items())
+            self.assertEqual((entries.courses, entries.codes, entries.names),
+                             (expected.courses, expected.codes, expected.names))
+
+    def test_local_writes_apply_on_commit(self):
+        self.codes('cs')
+        with self.captureOnCommitCallbacks(execute=True):
+            Course.objects.create(COURSE_CODE='CS301', COURSE_NAME='Operating Systems', CATEGORY='CBCS',
+                                  COURSE_CATEGORY='COMPULSORY', TYPE='THEORY', CREDIT_SCHEME='NEP',
+                                  CBCS_CATEGORY='CORE', DISCIPLINE=self.department)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.codes('oper'), ['CS301'])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class SyllabusProcessingTests(TestCase):
+    BODY = (b'%PDF-1.4\n1 0 obj<</Type /Pages /Count 2>>endobj\n2 0 obj<</Type /Page>>endobj\n3 0 obj<</Type/Page>>endobj\n'
+            b'4 0 obj<</Length 60>>stream\nBT /F1 12 Tf (Organic reactions) Tj T* [(and ) -300 (<alkenes>)] TJ ET\n'
+            b'endstream endobj\n%%EOF\n')
+
+    def setUp(self):
+        department = Department.objects.create(name='Chemistry', faculty='SC')
+        course = Course.objects.create(COURSE_CODE='CH101', COURSE_NAME='Chemistry', CATEGORY='CBCS',
+                                       COURSE_CATEGORY='COMPULSORY', TYPE='THEORY', CREDIT_SCHEME='NEP',
+                                       CBCS_CATEGORY='CORE', DISCIPLINE=department)
+        self.syllabus = Syllabus(course=course)
+        self.syllabus.syllabus_file.save('plan.pdf', ContentFile(self.BODY))
+
+    def test_claim_and_process(self):
+        self.assertEqual(self.syllabus.processing_status, 'PENDING')
+        self.assertEqual(processing.claim(10), [self.syllabus.pk])
+        self.assertEqual(processing.claim(10), [])  # Already taken
+        self.assertEqual(processing.process(self.syllabus.pk), 'DONE')
+
+        data = self.client.get(f'/api/courses/syllabi/{self.syllabus.pk}/').json()
+        self.assertEqual(data['processing_status'], 'DONE')
+        self.assertEqual(data['processing_progress'], 100)
+        self.assertEqual(data['page_count'], 2)
+        self.assertEqual(data['checksum'], hashlib.sha256(self.BODY).hexdigest())
+
+    def test_content_search(self):
+        processing.claim(10)
+        processing.process(self.syllabus.pk)
+        data = self.client.get('/api/courses/syllabi/content-search/', {'q': 'alkene'}).json()
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['results'][0]['syllabus']['id'], self.syllabus.pk)
+        self.assertIn('<mark>alkenes</mark>', data['results'][0]['snippets'][0])
+        self.assertIn('&lt;', data['results'][0]['snippets'][0])  # Text is escaped, only <mark> is HTML
+
+        # Only current syllabi are searchable
+        self.syllabus.is_active = False
+        self.syllabus.save()
+        self.assertEqual(self.client.get('/api/courses/syllabi/content-search/', {'q': 'organic'}).json()['count'], 0)
+        self.syllabus.is_active = True
+        self.syllabus.save()
+        self.assertEqual(self.client.get('/api/courses/syllabi/content-search/', {'q': 'organic'}).json()['count'], 1)
+
+    def test_scanned_in_any_chunk_size(self):
+        content = b'BT (Thermodynamics) Tj ET'
+        body = (self.BODY + b'5 0 obj<</Subtype /Image /Filter /DCTDecode>>stream\n' + bytes(range(256)) * 20
+                + b'\nendstream endobj\n6 0 obj<</Type /ObjStm /Filter /FlateDecode>>stream\n'
+                + zlib.compress(b'<</Type /Page>>') + b'\nendstream endobj\n7 0 obj<</Filter /FlateDecode>>stream\n'
+                + zlib.compress(content) + b'\nendstream endobj\n')
+        for size in [1, 5, 9, 100, len(body)]:
+            scanner = pdf.scan(body[i:i + size] for i in range(0, len(body), size))
+            self.assertEqual(scanner.pages, 3, size)
+            self.assertEqual(scanner.text().split(), ['Organic', 'reactions', 'and', '<alkenes>', 'Thermodynamics'])
+
+    def test_progress_alone_does_not_bump(self):
+        processing.claim(10)
+        before = versions.get_versions([Syllabus])['courses.syllabus'][0]
+        with mock.patch('courses.processing.READ_CHUNK', 16):  # A progress update every few chunks
+            self.assertEqual(processing.process(self.syllabus.pk), 'DONE')
+        self.assertEqual(versions.get_versions([Syllabus])['courses.syllabus'][0], before + 3)  # Checksum, pages, DONE
+
+    def test_missing_file_fails(self):
+        self.syllabus.syllabus_file.storage.delete(self.syllabus.syllabus_file.name)
+        processing.claim(10)
+        self.assertEqual(processing.process(self.syllabus.pk), 'FAILED')
+        self.syllabus.refresh_from_db()
+        self.assertEqual(self.syllabus.processing_status, 'FAILED')
+        self.assertTrue(self.syllabus.processing_error)
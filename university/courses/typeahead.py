@@ -0,0 +1,209 @@
+import bisect
+import re
+import threading
+import time
+import unicodedata
+from datetime import timedelta
+from django.conf import settings
+from django.db import router
+from django.utils import timezone
+from .models import Course
+from . import versions
+
+"""
+Course picker autocomplete without a database query per keystroke.
+
+Every process keeps a prefix index of the courses: two sorted arrays searched with bisect,
+one of normalized course codes ("CS-101" -> "cs101") and one of (word, course id) for every
+word of every course name. A query matches a course when its words, run together, start its
+code, or when each query word starts some word of its name. Code matches rank first, then
+name matches in word order. The top `limit` come from walking the matching slice only, so
+a lookup costs microseconds whatever the catalog size.
+
+The index is built from (id, COURSE_CODE, COURSE_NAME) on first use, and kept current from
+the Course change counter (courses/versions.py):
+  - sync, at most every COURSE_TYPEAHEAD_SYNC_INTERVAL seconds: one query reads the counter.
+    Only when it moved are the courses whose updated_at is past the last sync read (less
+    SYNC_OVERLAP, for commits that landed late) and diffed against the index. A count of the
+    table then tells whether any were deleted, and only in that case are the ids read;
+  - a course saved or deleted in this process is applied at once, when its transaction
+    commits (courses/signals.py).
+Writes made by other processes therefore show up within the sync interval, as long as they
+set updated_at: save() and the bulk upsert (courses/bulk.py) do, a queryset .update() has to
+pass it. Updates build new arrays and swap them in, so concurrent lookups always see a whole
+index. A few changed courses are moved with bisect; past REBUILD_AFTER the arrays are
+filtered and sorted once instead.
+"""
+
+SYNC_INTERVAL = getattr(settings, 'COURSE_TYPEAHEAD_SYNC_INTERVAL', 5)
+SYNC_OVERLAP = timedelta(seconds=60)
+REBUILD_AFTER = 64
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def words(text):
+    """Lowercased words of `text`, accents removed ("Électronique" -> ["electronique"])."""
+    text = text.casefold()
+    if not text.isascii():
+        text = ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+    return _WORD_RE.findall(text)
+
+
+def course_keys(code, name):
+    return ''.join(words(code)), tuple(sorted(set(words(name))))
+
+
+class Entries:
+    """One immutable generation of the index."""
+
+    def __init__(self, courses, codes, names):
+        self.courses = courses  # id -> (COURSE_CODE, COURSE_NAME, name words)
+        self.codes = codes  # Sorted [(normalized code, id)]
+        self.names = names  # Sorted [(name word, id)]
+
+    @classmethod
+    def build(cls, rows):
+        courses, codes, names = {}, [], []
+        for pk, code, name in rows:
+            code_key, name_words = course_keys(code, name)
+            courses[pk] = (code, name, name_words)
+            codes.append((code_key, pk))
+            names.extend((word, pk) for word in name_words)
+        codes.sort()
+        names.sort()
+        return cls(courses, codes, names)
+
+    def changed(self, rows, removed):
+        """A new generation with `rows` (id, code, name) upserted and the ids in `removed` dropped."""
+        if len(rows) + len(removed) >= REBUILD_AFTER:
+            return self.rebuilt(rows, removed)
+        courses, codes, names = dict(self.courses), list(self.codes), list(self.names)
+        for pk in [pk for pk, _, _ in rows] + list(removed):
+            old = courses.pop(pk, None)
+            if old is not None:
+                del codes[bisect.bisect_left(codes, (''.join(words(old[0])), pk))]
+                for word in old[2]:
+                    del names[bisect.bisect_left(names, (word, pk))]
+        for pk, code, name in rows:
+            code_key, name_words = course_keys(code, name)
+            courses[pk] = (code, name, name_words)
+            bisect.insort(codes, (code_key, pk))
+            for word in name_words:
+                bisect.insort(names, (word, pk))
+        return Entries(courses, codes, names)
+
+    def rebuilt(self, rows, removed):
+        """changed() for many rows: one pass to drop them and one sort, not a bisect per row."""
+        dropped = {pk for pk, _, _ in rows}.union(removed)
+        courses = {pk: course for pk, course in self.courses.items() if pk not in dropped}
+        codes = [entry for entry in self.codes if entry[1] not in dropped]
+        names = [entry for entry in self.names if entry[1] not in dropped]
+        for pk, code, name in rows:
+            code_key, name_words = course_keys(code, name)
+            courses[pk] = (code, name, name_words)
+            codes.append((code_key, pk))
+            names.extend((word, pk) for word in name_words)
+        codes.sort()  # Sorted runs plus a tail: close to linear
+        names.sort()
+        return Entries(courses, codes, names)
+
+    def search(self, query, limit):
+        terms = words(query)
+        if not terms:
+            return []
+        found = []
+        prefix = ''.join(terms)
+        position = bisect.bisect_left(self.codes, (prefix,))
+        while len(found) < limit and position < len(self.codes) and self.codes[position][0].startswith(prefix):
+            found.append(self.codes[position][1])
+            position += 1
+
+        # Walk the words of the longest (usually rarest) term, checking the others per course
+        first = max(terms, key=len)
+        others = [term for term in terms if term is not first]
+        seen = set(found)
+        position = bisect.bisect_left(self.names, (first,))
+        while len(found) < limit and position < len(self.names) and self.names[position][0].startswith(first):
+            pk = self.names[position][1]
+            position += 1
+            if pk in seen:
+                continue
+            seen.add(pk)
+            name_words = self.courses[pk][2]
+            if all(any(word.startswith(term) for word in name_words) for term in others):
+                found.append(pk)
+        return [{'id': pk, 'COURSE_CODE': self.courses[pk][0], 'COURSE_NAME': self.courses[pk][1]} for pk in found]
+
+
+class TypeaheadIndex:
+    def __init__(self, sync_interval):
+        self.sync_interval = sync_interval
+        self.entries = None  # Built on first use
+        self._lock = threading.Lock()
+        self._version = None  # versions.fingerprint([Course]) the entries were last synced at
+        self._synced_at = None  # When the last sync started reading rows
+        self._next_sync = 0.0
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        self.maybe_sync()
+        return self.entries.search(query, limit)
+
+    def maybe_sync(self):
+        if time.monotonic() < self._next_sync and self.entries is not None:
+            return
+        # Without entries every caller has to wait for the first build
+        if not self._lock.acquire(blocking=self.entries is None):
+            return  # Another thread is syncing
+        try:
+            if self.entries is None or time.monotonic() >= self._next_sync:
+                self.sync()
+        finally:
+            self._lock.release()
+
+    def sync(self):
+        using = router.db_for_read(Course)
+        version = versions.fingerprint([Course], using)  # Read before the rows: they can only be newer
+        if self.entries is None or version != self._version:
+            now = timezone.now()
+            courses = Course.objects.using(using).order_by()
+            if self.entries is None:
+                self.entries = Entries.build(courses.values_list('pk', 'COURSE_CODE', 'COURSE_NAME'))
+            else:
+                rows = courses.filter(updated_at__gte=self._synced_at - SYNC_OVERLAP) \
+                    .values_list('pk', 'COURSE_CODE', 'COURSE_NAME')
+                changed = [(pk, code, name) for pk, code, name in rows
+                           if self.entries.courses.get(pk, (None, None))[:2] != (code, name)]
+                # Every course in the table is in the index now, so a surplus means deletes
+                removed = ()
+                if len(self.entries.courses.keys() | {pk for pk, _, _ in changed}) != courses.count():
+                    removed = self.entries.courses.keys() - set(courses.values_list('pk', flat=True))
+                if changed or removed:
+                    self.entries = self.entries.changed(changed, removed)
+            self._version = version
+            self._synced_at = now
+        self._next_sync = time.monotonic() + self.sync_interval
+
+    def update(self, rows=(), removed=()):
+        """Apply committed writes made in this process; a no-op until the index is built."""
+        rows, removed = list(rows), list(removed)
+        with self._lock:
+            if self.entries is not None and (rows or removed):
+                self.entries = self.entries.changed(rows, removed)
+
+    def clear(self):
+        """Drop the index; the next lookup rebuilds it from the table."""
+        with self._lock:
+            self.entries = None
+            self._version = None
+            self._synced_at = None
+
+
+typeahead_index = TypeaheadIndex(SYNC_INTERVAL)
+
+
+def autocomplete(query, limit=DEFAULT_LIMIT):
+    """Up to `limit` courses matching what has been typed so far: [{id, COURSE_CODE, COURSE_NAME}]."""
+    return typeahead_index.search(query, max(1, min(limit, MAX_LIMIT)))
@@ -0,0 +1,166 @@
+import os
+import re
+import shutil
+import tempfile
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from .models import Syllabus, SyllabusUpload
+from .validators import PDF_MAGIC, validate_pdf_header, validate_pdf_trailer
+
+"""
+Chunked, resumable syllabus uploads.
+
+    POST   /api/courses/syllabus-uploads/       {course, filename, size, version, ...}  -> session
+    PUT    /api/courses/syllabus-uploads/<id>/  raw bytes + "Content-Range: bytes a-b/size"
+    GET    /api/courses/syllabus-uploads/<id>/  -> {received, ...}: where to resume
+    DELETE /api/courses/syllabus-uploads/<id>/  abandon the upload
+
+Each chunk is read from the request in CHUNK_SIZE blocks into a file of its own next to the
+part file, so worker memory stays flat however large the PDF is. The first block must carry
+the PDF magic bytes, and the running total may never exceed the declared size. Only once the
+whole chunk is in does the request claim its offset, with a conditional UPDATE of the
+session, and copy the chunk into the part file while the row is still locked: two requests
+for the same offset cannot both write to it, and the next chunk waits for the copy. When the
+last byte arrives the trailer is checked, the part file is moved into place (a rename on
+FileSystemStorage) and the Syllabus row is created in the same transaction that closes the
+session. Should that transaction fail, the file is moved back, and the next PUT to the
+session (with any range) finishes it.
+"""
+
+CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_SIZE = getattr(settings, 'SYLLABUS_CHUNKED_MAX_SIZE', 100 * 1024 * 1024)
+INCOMING_DIR = 'syllabi/incoming'
+
+_CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadConflict(Exception):
+    """The chunk does not start where the session left off; carries the offset to resume from."""
+    def __init__(self, received):
+        super().__init__(f'Expected a chunk starting at byte {received}.')
+        self.received = received
+
+
+class _PartFile(File):
+    # FileSystemStorage moves files that expose temporary_file_path() instead of copying them
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def part_path(upload):
+    return default_storage.path(f'{INCOMING_DIR}/{upload.pk}.part')
+
+
+def parse_content_range(header):
+    """'bytes 0-65535/1048576' -> (0, 65535, 1048576); raises ValidationError otherwise."""
+    match = _CONTENT_RANGE_RE.match((header or '').strip())
+    if not match:
+        raise ValidationError('A "Content-Range: bytes <first>-<last>/<size>" header is required.')
+    start, end, total = (int(group) for group in match.groups())
+    if end < start:
+        raise ValidationError('Invalid Content-Range.')
+    return start, end, total
+
+
+def write_chunk(upload, stream, start, end, total):
+    """
+    Append bytes start..end (inclusive) read from `stream` to the upload's part file and
+    advance `received`. Returns the updated session.
+    """
+    if upload.status != 'UPLOADING':
+        raise ValidationError('This upload is already complete.')
+    if upload.received == upload.size:
+        return complete(upload)  # Every byte is stored; an earlier attempt to finish it failed
+    if total != upload.size:
+        raise ValidationError(f'Content-Range size {total} does not match the declared size {upload.size}.')
+    if end >= upload.size:
+        raise ValidationError('Chunk extends past the declared size.')
+    if start != upload.received:
+        raise UploadConflict(upload.received)
+
+    path = part_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    expected = end - start + 1
+    written = 0
+    head = b'' if start == 0 else None  # Leading bytes of the file, checked against the PDF magic
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=f'{upload.pk}.', suffix='.chunk') as chunk:
+        while written < expected:
+            block = stream.read(min(CHUNK_SIZE, expected - written))
+            if not block:
+                break
+            if head is not None and len(head) < len(PDF_MAGIC):
+                head += block[:len(PDF_MAGIC) - len(head)]
+                if len(head) == len(PDF_MAGIC):
+                    validate_pdf_header(head)
+            chunk.write(block)
+            written += len(block)
+        if head is not None and len(head) < len(PDF_MAGIC):
+            validate_pdf_header(head)
+        if written != expected:
+            raise ValidationError(f'Chunk body was {written} bytes, Content-Range announced {expected}.')
+
+        # Conditional update: a concurrent writer for the same offset loses and gets a 409. The
+        # row stays locked until the copy is done, and a failed copy gives the offset back.
+        chunk.seek(0)
+        with transaction.atomic():
+            claimed = (SyllabusUpload.objects.filter(pk=upload.pk, received=start, status='UPLOADING')
+                       .update(received=end + 1, updated_at=timezone.now()))
+            if claimed:
+                with open(path, 'r+b' if os.path.exists(path) else 'wb') as part:
+                    part.seek(start)
+                    shutil.copyfileobj(chunk, part, CHUNK_SIZE)
+                    part.truncate(end + 1)  # Drop anything left over from an earlier, abandoned attempt
+    if not claimed:
+        upload.refresh_from_db()
+        raise UploadConflict(upload.received)
+    upload.received = end + 1
+    if upload.received == upload.size:
+        return complete(upload)
+    return upload
+
+
+def complete(upload):
+    """Check the trailer, move the file into place and create the Syllabus row atomically."""
+    path = part_path(upload)
+    with open(path, 'rb') as part:
+        part.seek(max(upload.size - 1024, 0))
+        tail = part.read()
+    try:
+        validate_pdf_trailer(tail)
+    except ValidationError:
+        abort(upload)
+        raise
+
+    moved = None  # Where the part file went, until the transaction commits
+    try:
+        with transaction.atomic():
+            upload = SyllabusUpload.objects.select_for_update().get(pk=upload.pk)
+            if upload.status != 'UPLOADING':
+                return upload  # Another request finished it
+            syllabus = Syllabus(course_id=upload.course_id, uploaded_by_id=upload.uploaded_by_id,
+                                version=upload.version, is_active=upload.is_active,
+                                description=upload.description)
+            with open(path, 'rb') as part:
+                syllabus.syllabus_file.save(upload.filename, _PartFile(part), save=False)
+            moved = default_storage.path(syllabus.syllabus_file.name)
+            syllabus.save()
+            upload.status = 'COMPLETE'
+            upload.syllabus = syllabus
+            upload.save(update_fields=['status', 'syllabus', 'updated_at'])
+    except Exception:
+        if moved is not None:
+            os.replace(moved, path)  # Back in place, so the session can still be finished
+        raise
+    return upload
+
+
+def abort(upload):
+    """Remove the part file and the session."""
+    path = part_path(upload)
+    if os.path.exists(path):
+        os.remove(path)
+    upload.delete()
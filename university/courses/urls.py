@@ -1,12 +1,37 @@
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
-from .views import CourseViewSet, course_choices, SyllabusViewSet
+from .views import CourseViewSet, course_choices, SyllabusViewSet, SyllabusUploadViewSet
+from .catalog import catalog_pointer, catalog_bundle
 
 router = DefaultRouter()
 router.register(r'courses', CourseViewSet)
 router.register(r'syllabi', SyllabusViewSet)
+router.register(r'syllabus-uploads', SyllabusUploadViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
     path('choices/', course_choices, name='course_choices'),
-]
\ No newline at end of file
+    path('catalog/', catalog_pointer, name='catalog'),
+    path('catalog/<str:version>/', catalog_bundle, name='catalog_bundle'),
+]
+
+
+def async_read_urlpatterns():
+    """
+    Async GET handlers shadowing the router's list/detail routes, under the same names (see
+    courses/async_views.py). They come first, so a pk is digits only: list-level actions
+    such as courses/export/ must still reach the router.
+    """
+    from . import async_views
+
+    return [
+        re_path(r'^courses/$', async_views.course_collection, name='course-list'),
+        re_path(r'^courses/(?P<pk>\d+)/$', async_views.course_member, name='course-detail'),
+        re_path(r'^syllabi/$', async_views.syllabus_collection, name='syllabus-list'),
+        re_path(r'^syllabi/(?P<pk>\d+)/$', async_views.syllabus_member, name='syllabus-detail'),
+    ]
+
+
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = async_read_urlpatterns() + urlpatterns
@@ -1,9 +1,24 @@
+from django.conf import settings
 from django.core.exceptions import ValidationError
 import os
 
+PDF_MAGIC = b'%PDF-'
+PDF_EOF_MARKER = b'%%EOF'
+MAX_PDF_SIZE = getattr(settings, 'SYLLABUS_MAX_FILE_SIZE', 5 * 1024 * 1024)  # Single-request uploads
+
 def validate_pdf(value):
     ext = os.path.splitext(value.name)[1].lower()
     if ext != '.pdf':
         raise ValidationError('Only PDF files are allowed.')
-    if value.size > 5 * 1024 * 1024:  # 5MB limit
-        raise ValidationError('File size must be under 5MB.')
\ No newline at end of file
+    if value.size > MAX_PDF_SIZE:
+        raise ValidationError(f'File size must be under {MAX_PDF_SIZE // (1024 * 1024)}MB.')
+
+def validate_pdf_header(first_bytes):
+    """Check the magic bytes at the start of a file as it is streamed in."""
+    if not first_bytes.startswith(PDF_MAGIC):
+        raise ValidationError('File is not a PDF (missing %PDF- header).')
+
+def validate_pdf_trailer(last_bytes):
+    """A complete PDF ends with an %%EOF marker (possibly followed by whitespace)."""
+    if PDF_EOF_MARKER not in last_bytes:
+        raise ValidationError('File is not a complete PDF (missing %%EOF trailer).')
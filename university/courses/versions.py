@@ -0,0 +1,135 @@
+import hashlib
+from django.db import DEFAULT_DB_ALIAS, router
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .models import ModelVersion
+
+"""
+Per-model change counters (ModelVersion) and the conditional GETs built on them. Every
+write to a tracked model bumps its counter with an UPDATE that runs after the write itself:
+save()/delete() through courses/signals.py, bulk writes where they happen (courses/bulk.py,
+the processing worker, seed_catalog). Inside a transaction the bump commits or rolls back
+with the change. Under autocommit post_save runs once the row is committed, so the bump
+commits just after it. Either way the new data is visible no later than the new counter,
+and every process sees the counter move.
+
+ConditionalGetMixin hashes the counters of a viewset's version_models, plus the URL and the
+accepted media type (parameters included: ?indent= changes the body), into an ETag and also
+sends the newest change time as Last-Modified. A GET whose If-None-Match still matches gets
+a 304 after a single query on ModelVersion, so the viewset's own tables are never read. The
+counters are read before the data, so a write landing in between (or one whose bump has not
+committed yet) can only make the ETag look older than the body. Then the next request gets
+a full response, never a wrong 304. The async views (courses/async_views.py) build the same
+validators from the same inputs, so either path revalidates the other's ETags.
+"""
+
+
+def label(model):
+    return model._meta.label_lower
+
+
+def bump(*models, using=DEFAULT_DB_ALIAS):
+    labels = [label(model) for model in models]
+    now = timezone.now()
+    rows = ModelVersion.objects.using(using).filter(label__in=labels)
+    if rows.update(version=F('version') + 1, changed_at=now) < len(labels):
+        # A model without a row yet (the migration creates the usual ones)
+        ModelVersion.objects.using(using).bulk_create(
+            [ModelVersion(label=name, version=1, changed_at=now) for name in labels], ignore_conflicts=True)
+
+
+def version_rows(labels, using=None):
+    using = using or router.db_for_read(ModelVersion)
+    return ModelVersion.objects.using(using).filter(label__in=labels).values_list('label', 'version', 'changed_at')
+
+
+def get_versions(models, using=None):
+    """{label: (version, changed_at)} for `models`, (0, None) for one never written."""
+    labels = [label(model) for model in models]
+    found = {name: (version, changed_at) for name, version, changed_at in version_rows(labels, using)}
+    return {name: found.get(name, (0, None)) for name in labels}
+
+
+async def aget_versions(models, using=None):
+    """get_versions() for async views."""
+    labels = [label(model) for model in models]
+    found = {name: (version, changed_at) async for name, version, changed_at in version_rows(labels, using)}
+    return {name: found.get(name, (0, None)) for name in labels}
+
+
+def stamp(versions):
+    """
+    A string from get_versions() that changes with every committed write to those models.
+    The change time is part of it: a rolled back bump followed by another write reuses the
+    version number.
+    """
+    return ','.join(f'{name}:{version}@{changed_at.timestamp() if changed_at else 0}'
+                    for name, (version, changed_at) in sorted(versions.items()))
+
+
+def fingerprint(models, using=None):
+    return stamp(get_versions(models, using))
+
+
+def validators(full_path, media_type, versions):
+    """(weak ETag, Last-Modified timestamp or None) of a response for `full_path` built from `versions`."""
+    key = '|'.join([full_path, media_type, stamp(versions)])
+    changed = [changed_at for _, changed_at in versions.values() if changed_at is not None]
+    last_modified = int(max(changed).timestamp()) if changed else None
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"', last_modified
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'no-cache'  # Clients may keep it, but revalidate first
+
+
+class VersionedMixin:
+    version_models = ()  # Every model the responses are built from
+
+    _model_versions = None
+
+    def get_version_models(self):
+        """The models this request's response is built from: version_models unless overridden."""
+        return self.version_models
+
+    def get_model_versions(self):
+        """get_versions() for get_version_models(), read once per request (the view is per request)."""
+        if self._model_versions is None:
+            self._model_versions = get_versions(self.get_version_models())
+        return self._model_versions
+
+
+class ConditionalGetMixin(VersionedMixin):
+    """Viewset mixin: ETag / Last-Modified and 304s for `conditional_actions`."""
+    conditional_actions = ('list', 'retrieve')
+
+    _etag = _last_modified = None
+
+    def get_validators(self, request):
+        return validators(request.get_full_path(), request.accepted_media_type, self.get_model_versions())
+
+    def conditional_response(self, request):
+        """A 304 when the client's copy is current, else None (and the validators are kept)."""
+        if self.action not in self.conditional_actions or request.accepted_renderer.format == 'api':
+            return None  # The browsable API page shows the user and a CSRF token
+        self._etag, self._last_modified = self.get_validators(request)
+        return get_conditional_response(request._request, etag=self._etag, last_modified=self._last_modified)
+
+    def list(self, request, *args, **kwargs):
+        response = self.conditional_response(request)
+        return response if response is not None else super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        response = self.conditional_response(request)
+        return response if response is not None else super().retrieve(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._etag is not None and response.status_code in (200, 304):
+            set_validators(response, self._etag, self._last_modified)
+        return response
@@ -1,59 +1,263 @@
-from rest_framework import viewsets,  permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework import viewsets,  permissions, mixins, status
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import router
+from django.db.models import Prefetch
+from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
-from .models import Course, Syllabus
-from .serializers import CourseSerializer, SyllabusSerializer
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError, NotFound
+from .models import Course, Syllabus, SyllabusUpload
+from .serializers import CourseSerializer, SyllabusSerializer, SyllabusUploadSerializer
+from . import uploads
+from .bulk import BulkUpsert, iter_rows
+from .export import (CSVExportRenderer, NDJSONExportRenderer, export_response,
+                     COURSE_EXPORT_FIELDS, SYLLABUS_EXPORT_FIELDS)
+from .catalog import course_choice_sets
+from .pagination import CoursePagination, SyllabusPagination
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter
+from .search import IndexedSearchFilter
+from .filters import CourseFilter
+from . import content, facets, typeahead
+from .downloads import FileDownloadRenderer, serve_file
+from rest_framework.renderers import JSONRenderer
+from university.fastlist import FastListMixin, Column
+from university.db_router import ReplicaReadMixin
+from .versions import ConditionalGetMixin
+from .pagecache import PageCacheMixin
+from academic.models import Department
 
-class CoursePagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'limit'  # e.g., ?limit=20
-    max_page_size = 100
-
-class CourseViewSet(viewsets.ModelViewSet):
-    queryset = Course.objects.all()
+class CourseViewSet(ConditionalGetMixin, PageCacheMixin, ReplicaReadMixin, FastListMixin, viewsets.ModelViewSet):
+    queryset = Course.objects.order_by('COURSE_CODE', 'id')  # Stable pages; the cursor ordering, same index
     serializer_class = CourseSerializer
+    version_models = (Course,)
+    # What each ?expand= embeds; a syllabus shows its uploader's email
+    expand_version_models = {'discipline': (Department,), 'syllabi': (Syllabus, get_user_model())}
     pagination_class = CoursePagination
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter]
+    filterset_class = CourseFilter
     search_fields = ['COURSE_CODE', 'COURSE_NAME']  # Fields to search
+    search_index_field = 'id'  # Answered from the course FTS index where available
+    replica_actions = ('list', 'retrieve', 'autocomplete')
+
+    def get_list_param(self, name, allowed):
+        """Comma-separated ?fields= / ?expand= values, rejecting unknown names."""
+        raw = self.request.query_params.get(name)
+        if not raw:
+            return None
+        values = [value.strip() for value in raw.split(',') if value.strip()]
+        unknown = sorted(set(values) - set(allowed))
+        if unknown:
+            raise ValidationError({name: f"Unknown value(s): {', '.join(unknown)}. Choose from: {', '.join(allowed)}."})
+        return values
+
+    def get_read_options(self):
+        """(fields, expand) for list/retrieve; (None, []) for everything else."""
+        if self.action not in ('list', 'retrieve'):
+            return None, []
+        if not hasattr(self, '_read_options'):
+            fields = self.get_list_param('fields', CourseSerializer.Meta.fields)
+            expand = self.get_list_param('expand', CourseSerializer.EXPANDABLE) or []
+            if fields is not None and 'DISCIPLINE' not in fields and 'discipline' in expand:
+                expand.remove('discipline')  # Nothing to render it into
+            self._read_options = (fields, expand)
+        return self._read_options
+
+    def get_queryset(self):
+        """Fetch only the requested columns and load each expanded relation in one batched query."""
+        queryset = super().get_queryset()
+        fields, expand = self.get_read_options()
+        if fields is not None:
+            columns = set(fields) | {'COURSE_CODE'}  # Cursor pagination reads COURSE_CODE from each row
+            queryset = queryset.only(*columns)
+        if 'discipline' in expand:
+            queryset = queryset.prefetch_related('DISCIPLINE')
+        if 'syllabi' in expand:
+            queryset = queryset.prefetch_related(
+                Prefetch('syllabi', queryset=Syllabus.objects.select_related('uploaded_by'))
+            )
+        return queryset
+
+    def get_version_models(self):
+        """Course, plus the model of each relation ?expand= embeds: only those writes change the response."""
+        _, expand = self.get_read_options()
+        return self.version_models + tuple(model for name in expand for model in self.expand_version_models[name])
+
+    def get_serializer(self, *args, **kwargs):
+        fields, expand = self.get_read_options()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        if expand:
+            kwargs.setdefault('expand', expand)
+        return super().get_serializer(*args, **kwargs)
 
     def get_permissions(self):
         """Set permissions based on the request method."""
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'export', 'facet_counts', 'autocomplete']:
             return [permissions.AllowAny()]  # GET requests (list & retrieve) are open
         return [permissions.IsAuthenticated()]  # POST, PUT, DELETE require auth]
 
+    @action(detail=False, methods=['get'], renderer_classes=[JSONRenderer, CSVExportRenderer, NDJSONExportRenderer])
+    def export(self, request):
+        """Stream every course matching the list filters/search (?format=csv|ndjson|json)."""
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(queryset, COURSE_EXPORT_FIELDS, request.accepted_renderer.format, 'courses')
+
+    @action(detail=False, methods=['get'], url_path='facets', url_name='facets')
+    def facet_counts(self, request):
+        """Per-value counts of every choice field and DISCIPLINE for the current filters/search."""
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(facets.get_facets(queryset, request.query_params))
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Courses whose code or name starts with what has been typed in ?q=, for the course
+        picker. Answered from the in-process index (courses/typeahead.py), not the database.
+        ?limit= caps the matches (default 10, at most 50).
+        """
+        try:
+            limit = int(request.query_params.get('limit', typeahead.DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'Expected an integer.'})
+        return Response(typeahead.autocomplete(request.query_params.get('q', ''), limit))
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Upsert courses on COURSE_CODE from a streamed NDJSON (application/x-ndjson) or CSV
+        (text/csv) body; see courses/bulk.py. Responds with counts and a per-row error report.
+        """
+        rows = iter_rows(request._request)  # Read line by line, never parsed into request.data
+        if rows is None:
+            return Response({'detail': 'Send application/x-ndjson or text/csv.'},
+                            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        report = BulkUpsert(using=router.db_for_write(Course)).run(rows)
+        return Response(report)
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])  # Ensure GET is open for choices
 def course_choices(request):
-    choices = {
-            'CATEGORY': [{'value': k, 'label': v} for k, v in Course.CATEGORY_CHOICES],
-            'COURSE_CATEGORY': [{'value': k, 'label': v} for k, v in Course.COURSE_CATEGORY_CHOICES],
-            'TYPE': [{'value': k, 'label': v} for k, v in Course.TYPE_CHOICES],
-            'CREDIT_SCHEME': [{'value': k, 'label': v} for k, v in Course.CREDIT_SCHEME_CHOICES],
-            'CBCS_CATEGORY': [{'value': k, 'label': v} for k, v in Course.CBCS_CATEGORY_CHOICES],
-            'QUALIFYING_IN_NATURE': [{'value': k, 'label': v} for k, v in Course.QUALIFYING_CHOICES],
-        }
+    choices = course_choice_sets()
     return Response(choices)
 
 #=================================================================================
 
-class SyllabusViewSet(viewsets.ModelViewSet):
-    queryset = Syllabus.objects.all()
+class SyllabusViewSet(ConditionalGetMixin, ReplicaReadMixin, FastListMixin, viewsets.ModelViewSet):
+    # uploaded_by and __str__ need both; ordered as the cursor pagination is, for stable pages
+    queryset = Syllabus.objects.select_related('course', 'uploaded_by').order_by('course_id', 'id')
     serializer_class = SyllabusSerializer
-    pagination_class = CoursePagination  # Optional: paginate syllabi too
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    version_models = (Syllabus, Course, get_user_model())  # The user for uploaded_by, bumped by account/signals.py
+    fast_list_overrides = {'uploaded_by': Column('uploaded_by', 'uploaded_by__email')}  # str(CustomUser) is the email
+    pagination_class = SyllabusPagination  # Optional: paginate syllabi too
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter]
     filterset_fields = ['course']  # Filter by course ID
     search_fields = ['course__COURSE_CODE', 'course__COURSE_NAME']  # Search by course code/name
+    search_index_field = 'course'
+    max_current_courses = 500
+    max_content_results = 100
+    replica_actions = ('list', 'retrieve', 'content_search')
 
     def get_permissions(self):
         """Set permissions based on the request method."""
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'current', 'download', 'export', 'content_search']:
             return [permissions.AllowAny()]  # GET requests (list & retrieve) are open
         return [permissions.IsAuthenticated()]  # POST, PUT, DELETE require auth]
 
+    @action(detail=False, methods=['get'])
+    def current(self, request):
+        """
+        Latest active syllabus per course, e.g. ?courses=1,2,3 (all courses when omitted).
+        One query against the CurrentSyllabus mapping.
+        """
+        queryset = self.get_queryset().filter(current_for__isnull=False)
+        course_ids = request.query_params.get('courses')
+        if course_ids:
+            try:
+                ids = [int(pk) for pk in course_ids.split(',') if pk.strip()]
+            except ValueError:
+                raise ValidationError({'courses': 'Expected a comma-separated list of course ids.'})
+            if len(ids) > self.max_current_courses:
+                raise ValidationError({'courses': f'At most {self.max_current_courses} course ids per request.'})
+            serializer = self.get_serializer(queryset.filter(course_id__in=ids).order_by('course_id'), many=True)
+            return Response(serializer.data)
+        page = self.paginate_queryset(queryset.order_by('course_id'))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='content-search')
+    def content_search(self, request):
+        """
+        Current syllabi whose PDF text matches ?q=, best first, each with highlighted
+        snippets (<mark>) from the matching passages. ?limit= caps the syllabi returned.
+        """
+        terms = request.query_params.get('q', '').split()
+        if not terms:
+            raise ValidationError({'q': 'This parameter is required.'})
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_content_results)
+        except ValueError:
+            raise ValidationError({'limit': 'Expected an integer.'})
+        matches = content.search(terms, using=router.db_for_read(Syllabus), limit=max(limit, 1))
+        syllabi = self.get_queryset().in_bulk([syllabus_id for syllabus_id, _, _ in matches])
+        results = [
+            {'syllabus': self.get_serializer(syllabi[syllabus_id]).data, 'rank': rank, 'snippets': snippets}
+            for syllabus_id, rank, snippets in matches if syllabus_id in syllabi
+        ]
+        return Response({'count': len(results), 'results': results})
+
+    @action(detail=False, methods=['get'], renderer_classes=[JSONRenderer, CSVExportRenderer, NDJSONExportRenderer])
+    def export(self, request):
+        """Stream syllabus metadata matching the list filters/search (?format=csv|ndjson|json)."""
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(queryset, SYLLABUS_EXPORT_FIELDS, request.accepted_renderer.format, 'syllabi')
+
+    @action(detail=True, methods=['get'], renderer_classes=[JSONRenderer, FileDownloadRenderer])
+    def download(self, request, pk=None):
+        """Stream the PDF with Range / ETag support (or hand it to the web server, see downloads.py)."""
+        syllabus = self.get_object()
+        if not syllabus.syllabus_file:
+            raise NotFound('This syllabus has no file.')
+        return serve_file(request._request, syllabus.syllabus_file)
+
+    def perform_create(self, serializer):
+        serializer.save(uploaded_by=self.request.user)  # Queued as PENDING for `manage.py process_syllabi`
+
+    def perform_update(self, serializer):
+        if 'syllabus_file' in serializer.validated_data:  # A new file needs processing again
+            serializer.save(processing_status='PENDING', processing_progress=0, processing_attempts=0,
+                            processing_error='', page_count=None, checksum='')
+        else:
+            serializer.save()
+
+#=================================================================================
+
+class SyllabusUploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                            mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """Chunked, resumable syllabus uploads - see courses/uploads.py for the protocol."""
+    queryset = SyllabusUpload.objects.all()
+    serializer_class = SyllabusUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return super().get_queryset().filter(uploaded_by=self.request.user)  # Own sessions only
+
     def perform_create(self, serializer):
         serializer.save(uploaded_by=self.request.user)
 
+    def update(self, request, pk=None):
+        """Append one chunk. The body is streamed to storage, never parsed into request.data."""
+        upload = self.get_object()
+        try:
+            start, end, total = uploads.parse_content_range(request.headers.get('Content-Range'))
+            upload = uploads.write_chunk(upload, request._request, start, end, total)
+        except DjangoValidationError as e:
+            raise ValidationError({'detail': e.messages})
+        except uploads.UploadConflict as e:
+            return Response({'detail': str(e), 'received': e.received}, status=status.HTTP_409_CONFLICT)
+        if upload.status == 'COMPLETE':
+            syllabus = SyllabusSerializer(upload.syllabus, context=self.get_serializer_context())
+            return Response(syllabus.data, status=status.HTTP_201_CREATED)
+        return Response(self.get_serializer(upload).data)
+
+    def perform_destroy(self, instance):
+        uploads.abort(instance)
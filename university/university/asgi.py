@@ -12,5 +12,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university.settings')
+os.environ.setdefault('UNIVERSITY_ASYNC_READS', '1')  # Mount the async read views (settings.ASYNC_READ_VIEWS)
 
 application = get_asgi_application()
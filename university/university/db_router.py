@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+"""
+Read replica routing. Nothing is routed by model: a request's reads go to the replica only
+while read_alias is set, which ReplicaReadMixin does for list/retrieve on the catalog
+viewsets (and replica_reads() for the async views), after authentication and permission
+checks have read from default. Writes and every other read stay on default.
+
+Read-your-writes: replicas lag, so after a successful write ReplicaPinMiddleware sets a
+short-lived cookie (DATABASE_REPLICA_PIN_SECONDS) and requests carrying it keep reading from
+default. Without settings.DATABASE_READ_REPLICA all of this is a no-op.
+"""
+
+PIN_COOKIE = 'dbPinned'
+
+read_alias = ContextVar('db_read_alias', default=None)
+
+
+def replica_alias(request):
+    """The alias to read from for `request`, or None for default."""
+    alias = getattr(settings, 'DATABASE_READ_REPLICA', None)
+    if alias is None or request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES:
+        return None
+    return alias
+
+
+@contextmanager
+def replica_reads(request):
+    token = read_alias.set(replica_alias(request))
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # The replica is a copy of default
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from default along with the data
+        return db != getattr(settings, 'DATABASE_READ_REPLICA', None)
+
+
+class ReplicaReadMixin:
+    """Viewset mixin: `replica_actions` read from the replica (see the module docstring)."""
+    replica_actions = ('list', 'retrieve')
+
+    _read_alias_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)  # Authentication and permissions read from default
+        if self.action in self.replica_actions:
+            self._read_alias_token = read_alias.set(replica_alias(request))
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # Also after an unhandled exception, or the thread's next request would inherit it
+            if self._read_alias_token is not None:
+                read_alias.reset(self._read_alias_token)
+                self._read_alias_token = None
+
+
+class ReplicaPinMiddleware:
+    """Pins a client to default for a few seconds after each successful write it makes."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.pin(request, await self.get_response(request))
+
+    def pin(self, request, response):
+        if getattr(settings, 'DATABASE_READ_REPLICA', None) is None or request.method in SAFE_METHODS:
+            return response
+        if response.status_code < 400:
+            response.set_cookie(PIN_COOKIE, '1', max_age=getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5),
+                                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,195 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils import timezone
+from django.utils.encoding import filepath_to_uri
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings, ISO_8601
+
+try:
+    import orjson
+except ImportError:  # Optional; the standard library encoder gives the same bytes, only slower
+    orjson = None
+
+"""
+Fast read path for list endpoints. A ModelSerializer list builds a model instance per row
+and runs every value through a DRF field object. FastListMixin.list() instead fetches the
+serializer's columns with .values(), maps each row straight to its output dict, and
+renders it with FastJSONRenderer (orjson when installed). The response is byte-identical
+to the serializer path. The columns come from the view's serializer itself
+(value_columns), so ?fields= and similar per-request field sets still apply. Anything the
+mapping does not cover (nested serializers, method fields, other renderers such as the
+browsable API) falls back to the regular list(). Set FAST_LIST_RESPONSES = False to turn
+the fast path off.
+"""
+
+# Fields whose value from .values() is already what to_representation() returns
+PASSTHROUGH_FIELDS = (
+    serializers.CharField, serializers.IntegerField, serializers.BooleanField,
+    serializers.ChoiceField, serializers.UUIDField,
+)
+
+
+class Column:
+    __slots__ = ('name', 'lookup', 'convert')
+
+    def __init__(self, name, lookup, convert=None):
+        self.name = name  # Key in the output
+        self.lookup = lookup  # Argument to .values()
+        self.convert = convert  # Applied to non-null values, like Serializer.to_representation does
+
+
+def file_url(field, request):
+    """FileField.to_representation for a stored file name instead of a FieldFile."""
+    storage = field.parent.Meta.model._meta.get_field(field.source).storage
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+    if not use_url:
+        return lambda name: name or None
+    base_url = getattr(storage, 'base_url', None) or ''
+    if request is not None and isinstance(storage, FileSystemStorage) and base_url.startswith('/') \
+            and base_url.endswith('/'):
+        # What build_absolute_uri(storage.url(name)) gives, minus a urljoin() per row
+        prefix = request.build_absolute_uri(base_url)
+        return lambda name: prefix + filepath_to_uri(name).lstrip('/') if name else None
+
+    def convert(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+def iso_datetime(field):
+    """DateTimeField.to_representation, with the output timezone looked up once."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()  # As enforce_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if not timezone.is_aware(value):
+            return field.to_representation(value)
+        text = value.astimezone(field_timezone).isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    return convert
+
+
+def value_columns(serializer, overrides=None):
+    """
+    Columns reproducing `serializer`'s output from .values() rows, or None when a field
+    has no column equivalent. `overrides` maps field names to Column objects for fields
+    that can only be mapped with model knowledge (e.g. a StringRelatedField).
+    """
+    overrides = overrides or {}
+    model = serializer.Meta.model
+    request = serializer.context.get('request')
+    columns = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in overrides:
+            columns.append(overrides[name])
+            continue
+        if '.' in field.source or field.source == '*':
+            return None
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None  # A property or method, not a column
+        if not getattr(model_field, 'concrete', False):
+            return None  # Reverse relations
+        if isinstance(model_field, models.FloatField):
+            return None  # orjson and json.dumps spell some floats differently (1e16 / 1e+16)
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None or model_field.target_field != model_field.related_model._meta.pk:
+                return None
+            columns.append(Column(name, model_field.attname))
+        elif isinstance(field, serializers.FileField):
+            columns.append(Column(name, field.source, file_url(field, request)))
+        elif isinstance(field, serializers.DateTimeField):
+            columns.append(Column(name, field.source, iso_datetime(field)))
+        elif isinstance(field, (serializers.DateField, serializers.TimeField, serializers.DecimalField)):
+            columns.append(Column(name, field.source, field.to_representation))
+        elif isinstance(field, PASSTHROUGH_FIELDS) and not model_field.is_relation:
+            if isinstance(field, serializers.UUIDField) and field.uuid_format != 'hex_verbose':
+                return None
+            columns.append(Column(name, field.source))
+        else:
+            return None
+    return columns
+
+
+def rows_to_dicts(rows, columns):
+    """Output dicts for .values() rows, keys in the serializer's field order."""
+    if all(column.convert is None for column in columns):
+        pairs = [(column.name, column.lookup) for column in columns]
+        return [{name: row[lookup] for name, lookup in pairs} for row in rows]
+    data = []
+    for row in rows:
+        item = {}
+        for column in columns:
+            value = row[column.lookup]
+            item[column.name] = value if value is None or column.convert is None else column.convert(value)
+        data.append(item)
+    return data
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer producing the same bytes through orjson where it can: compact separators,
+    non-ASCII kept as UTF-8, U+2028/U+2029 escaped. Indented output (?indent= in the Accept
+    header) and anything orjson rejects go through JSONRenderer itself.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            body = orjson.dumps(data, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+                                default=self.fallback)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes these two (valid JSON, but not valid in JavaScript source)
+        return body.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+    @staticmethod
+    def fallback(obj):
+        raise TypeError  # Types orjson would format differently from JSONEncoder: use the stdlib path
+
+
+class FastListMixin:
+    """
+    list() through .values() for JSON responses. `fast_list_overrides` maps serializer field
+    names to Column objects for fields value_columns() cannot derive.
+    """
+    fast_list_overrides = {}
+
+    def get_fast_columns(self):
+        if not getattr(settings, 'FAST_LIST_RESPONSES', True):
+            return None
+        if type(self.request.accepted_renderer) is not JSONRenderer:
+            return None
+        return value_columns(self.get_serializer(), self.fast_list_overrides)
+
+    def list(self, request, *args, **kwargs):
+        columns = self.get_fast_columns()
+        if columns is None:
+            return super().list(request, *args, **kwargs)
+        lookups = [column.lookup for column in columns]
+        # Cursor pagination reads its position from each row, so fetch its ordering columns too
+        cursor = getattr(self.paginator, 'cursor_pagination_class', self.paginator)
+        ordering = getattr(cursor, 'ordering', None) or ()
+        for field in (ordering,) if isinstance(ordering, str) else ordering:
+            if field.lstrip('-') not in lookups:
+                lookups.append(field.lstrip('-'))
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).values(*lookups)
+        page = self.paginate_queryset(queryset)
+        data = rows_to_dicts(queryset if page is None else page, columns)
+        request.accepted_renderer = FastJSONRenderer()  # Same media type; finalize_response renders with it
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,349 @@
+import atexit
+import ipaddress
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+
+"""
+Per-endpoint request metrics with a Prometheus text exposition on /metrics.
+
+MetricsMiddleware times every request. An execute wrapper, installed on each database
+connection as it opens, counts SQL statements and their time for the current request (found
+through a context variable, which also follows the async ORM into its worker thread, where
+the connection is a different object). Once the response is ready it records these, keyed
+by (resolved URL name, method):
+
+    http_request_duration_seconds   histogram
+    http_response_size_bytes        histogram (responses with a known length)
+    http_requests_total             counter, also labelled by status code
+    db_queries_total                counter
+    db_query_duration_seconds_total counter
+
+and, from record_cache(), cache_requests_total (by cache and hit/miss) for response caches
+such as the course page cache (courses/pagecache.py).
+
+Recording is lock-free: each thread adds into its own shard (a dict of plain lists). The
+shards are only merged when /metrics is scraped or the process flushes. A lock is taken
+once per thread, to register its shard. Then, and on every merge, the shards of threads that
+have exited are folded into one retired total and dropped, so the list stays as long as the
+live threads however many come and go.
+
+Multiple worker processes: with METRICS_DIR set, each process writes its merged totals to
+METRICS_DIR/<pid>-<start>.json (write then rename, so readers never see half a file). It
+does so at most every METRICS_FLUSH_INTERVAL seconds, after a request, and at exit. /metrics
+sums every file in the directory, so any worker can answer a scrape. Files from processes
+that exited stay and keep their counts in the totals; the start time in the name keeps a
+later process that is given the same pid from overwriting one. Clear the directory when the
+whole server is restarted. Without METRICS_DIR, /metrics reports the answering process only.
+
+/metrics answers only the clients in METRICS_ALLOWED_IPS (addresses or networks, checked
+against REMOTE_ADDR), 403 to anyone else.
+"""
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METRICS_DIR = getattr(settings, 'METRICS_DIR', None)
+FLUSH_INTERVAL = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+
+UNMATCHED = '<unmatched>'  # Requests that did not resolve to a view (404s, static files)
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}  # Anything else counts as OTHER
+
+# Positions in a route's stats list
+COUNT, DURATION_SUM, SIZE_COUNT, SIZE_SUM, QUERIES, QUERY_SECONDS = range(6)
+DURATION_OFFSET = 6
+SIZE_OFFSET = DURATION_OFFSET + len(DURATION_BUCKETS) + 1
+STATS_LENGTH = SIZE_OFFSET + len(SIZE_BUCKETS) + 1
+
+
+def bucket_index(buckets, value):
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            return index
+    return len(buckets)  # +Inf
+
+
+class Shard:
+    def __init__(self):
+        self.routes = {}  # 'view method' -> stats list
+        self.statuses = {}  # 'view method status' -> count
+        self.caches = {}  # 'cache result' -> count
+
+
+class Registry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []  # (owning thread, shard)
+        self._retired = {'routes': {}, 'statuses': {}, 'caches': {}}  # Totals of exited threads
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._path = self._path_pid = None
+
+    def shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = Shard()
+            with self._lock:
+                self.retire_exited()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def retire_exited(self):
+        """Fold the shards of exited threads into the retired totals. Call with the lock held."""
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:  # It records nothing more, so its counts are final
+                merge(self._retired, shard_totals(shard))
+        self._shards = live
+
+    def record(self, view, method, status, duration, size, queries, query_seconds):
+        shard = self.shard()
+        key = f'{view} {method}'
+        stats = shard.routes.get(key)
+        if stats is None:
+            stats = shard.routes[key] = [0] * STATS_LENGTH
+        stats[COUNT] += 1
+        stats[DURATION_SUM] += duration
+        stats[DURATION_OFFSET + bucket_index(DURATION_BUCKETS, duration)] += 1
+        if size is not None:
+            stats[SIZE_COUNT] += 1
+            stats[SIZE_SUM] += size
+            stats[SIZE_OFFSET + bucket_index(SIZE_BUCKETS, size)] += 1
+        stats[QUERIES] += queries
+        stats[QUERY_SECONDS] += query_seconds
+        status_key = f'{key} {status}'
+        shard.statuses[status_key] = shard.statuses.get(status_key, 0) + 1
+
+    def record_cache(self, cache, hit):
+        caches = self.shard().caches
+        key = f'{cache} {"hit" if hit else "miss"}'
+        caches[key] = caches.get(key, 0) + 1
+
+    def snapshot(self):
+        """This process's totals as a JSON-able dict."""
+        totals = {'routes': {}, 'statuses': {}, 'caches': {}}
+        with self._lock:
+            self.retire_exited()
+            merge(totals, self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            merge(totals, shard_totals(shard))
+        return totals
+
+    def maybe_flush(self):
+        if METRICS_DIR and time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        if not METRICS_DIR:
+            return
+        self._last_flush = time.monotonic()
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = self.shard_path()
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(f'{path}.tmp', path)
+
+    def shard_path(self):
+        """This process's file in METRICS_DIR, named when it first flushes (in a forked child too)."""
+        pid = os.getpid()
+        if self._path_pid != pid:
+            self._path, self._path_pid = os.path.join(METRICS_DIR, f'{pid}-{time.time_ns()}.json'), pid
+        return self._path
+
+    def collect(self):
+        """Totals across every worker process (or just this one without METRICS_DIR)."""
+        if not METRICS_DIR:
+            return self.snapshot()
+        self.flush()
+        totals = {'routes': {}, 'statuses': {}, 'caches': {}}
+        for name in os.listdir(METRICS_DIR):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(METRICS_DIR, name)) as f:
+                    merge(totals, json.load(f))
+            except (OSError, ValueError):
+                continue  # Removed or replaced while we were reading it
+        return totals
+
+
+def shard_totals(shard):
+    return {'routes': dict(shard.routes), 'statuses': dict(shard.statuses), 'caches': dict(shard.caches)}
+
+
+def merge(totals, snapshot):
+    for key, stats in snapshot['routes'].items():
+        total = totals['routes'].setdefault(key, [0] * STATS_LENGTH)
+        for index, value in enumerate(stats):
+            total[index] += value
+    for section in ('statuses', 'caches'):
+        counts = totals[section]
+        for key, count in snapshot.get(section, {}).items():  # Files written before 'caches' existed lack it
+            counts[key] = counts.get(key, 0) + count
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+
+class QueryTimer:
+    """Statements run for one request, and their time."""
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+current_timer = ContextVar('metrics_query_timer', default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    timer = current_timer.get()
+    if timer is None:  # Outside a request: management commands, startup
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.count += 1
+        timer.seconds += time.perf_counter() - started
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        # At the front: execute_wrapper() blocks that are open right now pop from the end
+        connection.execute_wrappers.insert(0, time_query)
+
+
+def response_size(response):
+    if response.streaming:
+        length = response.get('Content-Length')  # Set by FileResponse; unknown for generators
+        return int(length) if length and length.isdigit() else None
+    return len(response.content)
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED
+    return match.view_name  # URL name (with namespace), or the view's dotted path if unnamed
+
+
+class MetricsMiddleware:
+    """Put it first in MIDDLEWARE so the timing covers the other middleware too."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        for connection in connections.all(initialized_only=True):  # Opened before this module loaded
+            if connection.connection is not None:
+                install_query_timer(None, connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer, started = QueryTimer(), time.perf_counter()
+        token = current_timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        self.record(request, response, timer, started)
+        return response
+
+    async def __acall__(self, request):
+        timer, started = QueryTimer(), time.perf_counter()
+        token = current_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        self.record(request, response, timer, started)
+        return response
+
+    def record(self, request, response, timer, started):
+        method = request.method if request.method in METHODS else 'OTHER'
+        registry.record(
+            view_label(request), method, response.status_code, time.perf_counter() - started,
+            response_size(response), timer.count, timer.seconds,
+        )
+        registry.maybe_flush()
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render(collected):
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    def histogram(name, buckets, offset, count_index, sum_index):
+        for key, stats in sorted(collected['routes'].items()):
+            view, method = key.rsplit(' ', 1)
+            labels = f'view="{escape(view)}",method="{method}"'
+            cumulative = 0
+            for index, bound in enumerate(buckets):
+                cumulative += stats[offset + index]
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {stats[count_index]}')
+            lines.append(f'{name}_sum{{{labels}}} {stats[sum_index]}')
+            lines.append(f'{name}_count{{{labels}}} {stats[count_index]}')
+
+    def counter(name, index):
+        for key, stats in sorted(collected['routes'].items()):
+            view, method = key.rsplit(' ', 1)
+            lines.append(f'{name}{{view="{escape(view)}",method="{method}"}} {stats[index]}')
+
+    family('http_request_duration_seconds', 'histogram', 'Time from the first middleware to the response, by view.')
+    histogram('http_request_duration_seconds', DURATION_BUCKETS, DURATION_OFFSET, COUNT, DURATION_SUM)
+    family('http_response_size_bytes', 'histogram', 'Response body size, for responses with a known length.')
+    histogram('http_response_size_bytes', SIZE_BUCKETS, SIZE_OFFSET, SIZE_COUNT, SIZE_SUM)
+    family('http_requests_total', 'counter', 'Requests by view, method and status code.')
+    for key, count in sorted(collected['statuses'].items()):
+        view, method, status = key.rsplit(' ', 2)
+        lines.append(f'http_requests_total{{view="{escape(view)}",method="{method}",status="{status}"}} {count}')
+    family('db_queries_total', 'counter', 'SQL statements run while handling requests, by view.')
+    counter('db_queries_total', QUERIES)
+    family('db_query_duration_seconds_total', 'counter', 'Time spent in SQL statements, by view.')
+    counter('db_query_duration_seconds_total', QUERY_SECONDS)
+    family('cache_requests_total', 'counter', 'Response cache lookups, by cache and result.')
+    for key, count in sorted(collected['caches'].items()):
+        cache, result = key.rsplit(' ', 1)
+        lines.append(f'cache_requests_total{{cache="{escape(cache)}",result="{result}"}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def allowed(request):
+    networks = getattr(settings, 'METRICS_ALLOWED_IPS', None)
+    if networks is None:
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network.strip(), strict=False)
+               for network in networks if network.strip())
+
+
+def metrics_view(request):
+    if not allowed(request):
+        return HttpResponseForbidden('Not allowed to scrape metrics from this address.\n', content_type='text/plain')
+    return HttpResponse(render(registry.collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
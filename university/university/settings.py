@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -51,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'university.metrics.MetricsMiddleware',  # First, so its timings include the other middleware
+    'university.db_router.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',        # Add This 
@@ -81,6 +84,22 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'university.wsgi.application'
 
+# Per-view latency/query metrics on /metrics (university/metrics.py). With several worker
+# processes, point METRICS_DIR at a directory they share so a scrape sees all of them.
+METRICS_DIR = os.environ.get('UNIVERSITY_METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 5  # seconds between a worker's snapshots to METRICS_DIR
+# Clients allowed to scrape /metrics: addresses or networks, matched against REMOTE_ADDR (so
+# behind a reverse proxy, the proxy's address). None leaves the endpoint open.
+METRICS_ALLOWED_IPS = os.environ.get('UNIVERSITY_METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+
+# List endpoints render .values() rows directly instead of through the serializers
+# (university/fastlist.py); the output is the same, so this is only a kill switch.
+FAST_LIST_RESPONSES = True
+
+# Serve catalog GETs from native async views (courses/async_views.py, academic/async_views.py).
+# university/asgi.py turns this on; under WSGI an async view would need an event loop per request.
+ASYNC_READ_VIEWS = os.environ.get('UNIVERSITY_ASYNC_READS') == '1'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -92,6 +111,48 @@ DATABASES = {
     }
 }
 
+# Production SQLite profile (UNIVERSITY_DB_PROFILE=production). WAL lets readers run while a
+# write is in progress; synchronous=NORMAL is durable across application crashes under WAL
+# (a power loss can drop the last commits). IMMEDIATE transactions take the write lock up
+# front instead of failing with "database is locked" when a read lock cannot be upgraded.
+# Connections are kept open between requests, except under ASGI where Django advises
+# against persistent connections.
+if os.environ.get('UNIVERSITY_DB_PROFILE') == 'production':
+    DATABASES['default'].update({
+        'OPTIONS': {
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA cache_size=-65536;'  # KiB, i.e. 64 MiB of page cache per connection
+                'PRAGMA mmap_size=268435456;'  # 256 MiB of the file read through mmap
+                'PRAGMA temp_store=MEMORY;'
+            ),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,  # seconds to wait for the write lock
+        },
+        'CONN_MAX_AGE': 0 if ASYNC_READ_VIEWS else 600,
+        'CONN_HEALTH_CHECKS': True,
+    })
+
+# Read replica (UNIVERSITY_DB_REPLICA=<path to a SQLite file>). list/retrieve on courses,
+# syllabi and departments read from it (university/db_router.py); everything else, and
+# every read for DATABASE_REPLICA_PIN_SECONDS after the client's last write, uses default.
+# Locally a copy of db.sqlite3 stands in for the replica: `manage.py sync_replica` refreshes it.
+if os.environ.get('UNIVERSITY_DB_REPLICA'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['UNIVERSITY_DB_REPLICA'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASES['replica']['OPTIONS'] = {
+        **DATABASES['default'].get('OPTIONS', {}),
+        'init_command': DATABASES['default'].get('OPTIONS', {}).get('init_command', '') + 'PRAGMA query_only=1;',
+        'transaction_mode': None,  # Never writes
+    }
+DATABASE_READ_REPLICA = 'replica' if 'replica' in DATABASES else None
+DATABASE_REPLICA_PIN_SECONDS = 5  # Longer than the replica is expected to lag
+DATABASE_ROUTERS = ['university.db_router.ReadReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -139,6 +200,20 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Syllabus downloads (courses/downloads.py). None streams the file from Django;
+# 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache) hand the transfer to the web server.
+SYLLABUS_DOWNLOAD_OFFLOAD = None
+SYLLABUS_DOWNLOAD_ACCEL_PREFIX = '/protected-media/'  # nginx `internal` location aliasing MEDIA_ROOT
+
+# Syllabus upload limits: single multipart requests vs. chunked uploads (courses/uploads.py)
+SYLLABUS_MAX_FILE_SIZE = 5 * 1024 * 1024
+SYLLABUS_CHUNKED_MAX_SIZE = 100 * 1024 * 1024
+
+# Syllabus post-processing queue (courses/processing.py, `manage.py process_syllabi`). A job
+# still PROCESSING after the timeout is assumed lost and queued again, up to MAX_ATTEMPTS times.
+SYLLABUS_PROCESSING_TIMEOUT = 600  # seconds
+SYLLABUS_PROCESSING_MAX_ATTEMPTS = 3
+
 AUTH_USER_MODEL = 'account.CustomUser'  # Tell Django to use this custom user model
 
 # REST Framework settings
@@ -167,6 +242,43 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),  # Ignored with our custom auth
+    # Stock serializers plus a check against account.revocation (logged-out tokens)
+    'TOKEN_REFRESH_SERIALIZER': 'account.serializers.RevocationCheckingTokenRefreshSerializer',
+    'TOKEN_VERIFY_SERIALIZER': 'account.serializers.RevocationCheckingTokenVerifySerializer',
+}
+
+# Logged-out token ids, mirrored into an in-process bloom filter (account/revocation.py).
+# New revocations reach other processes within the sync interval; expired ones are pruned
+# on each rebuild.
+TOKEN_REVOCATION_CAPACITY = 100000
+TOKEN_REVOCATION_ERROR_RATE = 0.01
+TOKEN_REVOCATION_SYNC_INTERVAL = 10  # seconds
+TOKEN_REVOCATION_REBUILD_INTERVAL = 3600  # seconds
+
+# In-process cache of users resolved by account.auth.CookieJWTAuthentication
+# (0 disables it). Entries also expire with their access token. A user saved in another
+# process is served stale for up to the sync interval.
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_USER_CACHE_TTL = 60  # seconds
+AUTH_USER_CACHE_SYNC_INTERVAL = 5  # seconds
+
+# Course autocomplete index, one per process (courses/typeahead.py). Writes made by other
+# processes reach it within the sync interval.
+COURSE_TYPEAHEAD_SYNC_INTERVAL = 5  # seconds
+
+# Rendered course list pages (courses/pagecache.py). Keys embed the catalog change counters,
+# so entries never go stale and need no timeout; past COURSE_PAGE_CACHE_ENTRIES the least
+# recently used page is dropped (CULL_FREQUENCY = MAX_ENTRIES culls exactly one).
+COURSE_PAGE_CACHE = 'pages'  # Cache alias, or None to turn the page cache off
+COURSE_PAGE_CACHE_ENTRIES = 1000
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'course-pages',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': COURSE_PAGE_CACHE_ENTRIES, 'CULL_FREQUENCY': COURSE_PAGE_CACHE_ENTRIES},
+    },
 }
 
 # Djoser settings
@@ -0,0 +1,38 @@
+from .settings import *  # noqa: F401,F403
+
+"""
+API worker profile: DJANGO_SETTINGS_MODULE=university.settings_api, with the same
+university/wsgi.py, university/asgi.py or manage.py entry points. It keeps only what the
+/api/ routes use. The admin is not installed, so it is never autodiscovered. That also
+means no app's admin.py runs, and with it import_export. Sessions and messages go too,
+along with their middleware: API authentication is the JWT cookie (account/auth.py), which
+DRF resolves itself, so Django's AuthenticationMiddleware goes as well. djoser stays, since
+it serves /api/auth/.
+Editors use the admin on workers running the full university.settings. `manage.py
+bench_startup` compares the two profiles' cold start.
+"""
+
+API_EXCLUDED_APPS = {
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'import_export',
+}
+API_EXCLUDED_MIDDLEWARE = {
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',  # Requires sessions
+    'django.contrib.messages.middleware.MessageMiddleware',
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_EXCLUDED_APPS]
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in API_EXCLUDED_MIDDLEWARE]
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'context_processors': [
+            processor for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            if processor != 'django.contrib.messages.context_processors.messages'
+        ],
+    },
+}]
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+from django.test import TestCase, override_settings
+from . import metrics
+
+
+class MetricsTests(TestCase):
+    def test_allowed_addresses_only(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)  # The test client is 127.0.0.1
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.7').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.7',
+                                         HTTP_X_FORWARDED_FOR='127.0.0.1').status_code, 403)
+        with override_settings(METRICS_ALLOWED_IPS=['10.0.0.1', '203.0.113.0/24']):
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.7').status_code, 200)
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with override_settings(METRICS_ALLOWED_IPS=None):
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.7').status_code, 200)
+
+    def test_reused_pid_keeps_its_own_shard(self):
+        with mock.patch('university.metrics.METRICS_DIR', tempfile.mkdtemp()):
+            exited, current = metrics.Registry(), metrics.Registry()  # Two processes given the same pid
+            exited.record_cache('pages', hit=True)
+            exited.flush()
+            current.record_cache('pages', hit=True)
+            current.flush()
+            current.flush()  # Rewrites its own file
+            self.assertEqual(len(os.listdir(metrics.METRICS_DIR)), 2)
+            self.assertTrue(all(name.startswith(f'{os.getpid()}-') for name in os.listdir(metrics.METRICS_DIR)))
+            self.assertEqual(current.collect()['caches'], {'pages hit': 2})
+
+    def test_exited_threads_fold_into_retired_totals(self):
+        registry = metrics.Registry()
+        for _ in range(3):
+            thread = threading.Thread(target=registry.record_cache, args=('pages',), kwargs={'hit': True})
+            thread.start()
+            thread.join()
+        registry.record_cache('pages', hit=False)
+        self.assertEqual(len(registry._shards), 1)  # Only this thread's
+        self.assertEqual(registry.snapshot()['caches'], {'pages hit': 3, 'pages miss': 1})
@@ -1,12 +1,21 @@
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .metrics import metrics_view
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/', include('account.urls')),
     path('api/academic/', include('academic.urls')),
     path('api/courses/', include('courses.urls')),
+    path('metrics', metrics_view, name='metrics'),  # Prometheus scrape target
 
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if apps.is_installed('django.contrib.admin'):
+    # Not installed in the API worker profile (university/settings_api.py): no admin URLs, no
+    # autodiscovery of the apps' admin.py, so import_export is never loaded. django.contrib.admin
+    # itself is still imported there, by DRF's schema generator.
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))